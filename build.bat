@@ -7,6 +7,7 @@ set EXT_DIR=%CUR_DIR%\external
 
 cd external
 
+@REM Also builds tof_list.dll into external\lib
 make clean
 make
 
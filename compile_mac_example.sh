@@ -44,7 +44,8 @@ pyenv global 3.6.10
 # Add data files required by Jibal
 curl http://users.jyu.fi/~jaakjuli/jibal/data/data.tar.gz -o data.tar.gz && tar -xvf data.tar.gz -C external/share/jibal
 
-# Create the Potku bundle
+# Create the Potku bundle. This also compiles the C programs and the
+# libtof_list.dylib library with build.sh.
 # First run does not install dependencies for some reason
 pipenv run ./create_bundle.sh
 pipenv run ./create_bundle.sh
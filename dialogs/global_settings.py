@@ -79,6 +79,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
     cross_section = bnd.bind("cross_section_radios")
 
     save_window_geometries = bnd.bind("window_geom_chkbox")
+    binary_cut_files = bnd.bind("binary_cut_chkbox")
 
     settings_updated = QtCore.pyqtSignal(GlobalSettings)
 
@@ -178,6 +179,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
             BaseTab.SAVE_WINDOW_GEOM_KEY, True
         )
         self.color_scheme = self.settings.get_tofe_color()
+        self.binary_cut_files = self.settings.get_binary_cut_files()
 
     @staticmethod
     def __create_spinbox(default):
@@ -222,6 +224,7 @@ class GlobalSettingsDialog(QtWidgets.QDialog):
         self.settings.set_min_simulation_ions(self.sim_ions)
         self.settings.set_ion_division(self.ion_division)
         self.settings.set_minimum_concentration(self.min_concentration)
+        self.settings.set_binary_cut_files(self.binary_cut_files)
 
         gutils.set_potku_setting(
             BaseTab.SAVE_WINDOW_GEOM_KEY, self.save_window_geometries)
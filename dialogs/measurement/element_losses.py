@@ -222,7 +222,8 @@ class ElementLossesWidget(QtWidgets.QWidget):
                 self.measurement.get_composition_changes_dir(),
                 self.reference_cut_file,
                 self.checked_cuts,
-                self.partition_count)
+                self.partition_count,
+                cut_index=self.measurement.get_cut_event_index())
 
             if progress is not None:
                 sub_progress = progress.get_sub_reporter(
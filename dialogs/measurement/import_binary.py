@@ -28,9 +28,6 @@ __author__ = "Timo Konu \n Severi Jääskeläinen \n Samuel Kaiponen \n Heta " \
              "Rekilä \n Sinikka Siironen"
 __version__ = "2.0"
 
-import numpy
-import struct
-
 import dialogs.dialog_functions as df
 import widgets.gui_utils as gutils
 import dialogs.file_dialogs as fdialogs
@@ -38,6 +35,7 @@ import dialogs.file_dialogs as fdialogs
 from widgets.gui_utils import StatusBarHandler
 from widgets.icon_manager import IconManager
 
+from modules import binary_import
 from modules.request import Request
 
 from PyQt5 import QtCore
@@ -91,28 +89,6 @@ class ImportDialogBinary(QtWidgets.QDialog):
         root = self.treeWidget.invisibleRootItem()
         self.button_import.setEnabled(root.childCount() > 0)
 
-    @staticmethod
-    def __convert_file(input_file, output_file):
-        """Convert binary file into ascii file.
-        
-        Args:
-            input_file: A string representing input binary file.
-            output_file: A string representing output ascii file.
-        """
-        data = []
-        with open(input_file, "rb") as f:
-            byte = f.read(4)
-            while byte:
-                # Second column is actually unsigned, but Python is broken
-                # in regard to unpacking it properly (treats it as signed 
-                # regardless) therefore we've to manually "make" it unsigned.
-                cols = struct.unpack("<hh", byte)
-                row = [cols[0], cols[1] - 8192]
-                data.append(row)
-                byte = f.read(4)
-        numpy_array = numpy.array(data)
-        numpy.savetxt(output_file, numpy_array, delimiter=" ", fmt="%d %d")  
-
     def __import_files(self):
         """Import binary files.
         """
@@ -128,7 +104,8 @@ class ImportDialogBinary(QtWidgets.QDialog):
 
             output_file = df.import_new_measurement(
                 self.request, self.parent, item)
-            self.__convert_file(input_file, output_file)
+            binary_import.convert_lst_file(
+                input_file, output_file, write_event_cache=True)
 
             sbh.reporter.report(10 + (i + 1 / root_child_count) * 90)
 
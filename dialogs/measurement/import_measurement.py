@@ -31,9 +31,9 @@ __version__ = "2.0"
 import logging
 import os
 import re
+import threading
 
 import dialogs.dialog_functions as df
-import modules.general_functions as gf
 import widgets.gui_utils as gutils
 
 from collections import OrderedDict
@@ -43,6 +43,8 @@ from widgets.gui_utils import StatusBarHandler
 from dialogs.measurement.import_timing_graph import ImportTimingGraphDialog
 from dialogs.file_dialogs import open_files_dialog
 
+from modules import coincidence
+from modules.concurrency import CancellationToken
 from modules.request import Request
 from widgets.icon_manager import IconManager
 
@@ -57,6 +59,9 @@ class ImportMeasurementsDialog(QtWidgets.QDialog):
     """Measurement importing class. Used to import measurement data
     from detecting unit into potku.
     """
+    # Emitted in the import thread when all files have been imported
+    import_finished = QtCore.pyqtSignal(object)
+
     def __init__(self, request: Request, icon_manager: IconManager,
                  statusbar: QtWidgets.QStatusBar, parent: "Potku"):
         """Init measurement import dialog.
@@ -81,10 +86,12 @@ class ImportMeasurementsDialog(QtWidgets.QDialog):
         self.__import_row_count = 0  # Placeholder for adding/removing rows
         self.__initiated_columns = False
         self.imported = False
+        self.__ct = None  # CancellationToken of a running import
         
         self.__add_timing_labels()
 
         self.button_import.clicked.connect(self.__import_files) 
+        self.import_finished.connect(self.__import_finished)
         self.button_cancel.clicked.connect(self.__close) 
         self.button_addimport.clicked.connect(self.__add_file)
         self.button_coinc.clicked.connect(self.__coinc_calc)
@@ -174,42 +181,102 @@ class ImportMeasurementsDialog(QtWidgets.QDialog):
         sbh.reporter.report(10)
         
         filename_list = []
+        files = []
         for i in range(root_child_count):
             item = root.child(i)
             filename_list.append(item.filename)
 
             output_file = df.import_new_measurement(
                 self.request, self.parent, item)
-            gf.coinc(Path(item.file),
-                     output_file=output_file,
-                     skip_lines=self.spin_skiplines.value(),
-                     tablesize=10,
-                     trigger=self.spin_adctrigger.value(),
-                     adc_count=self.spin_adccount.value(),
-                     timing=timing,
-                     columns=string_column,
-                     nevents=self.spin_eventcount.value())
-
-            sbh.reporter.report(10 + (i + 1) / root_child_count * 90)
-
-        filenames = ", ".join(filename_list)
-        elapsed = timer() - start_time
-        log = "Imported measurements to request: {0}".format(filenames)
+            files.append((Path(item.file), output_file))
+
+        kwargs = {
+            "skip_lines": self.spin_skiplines.value(),
+            "tablesize": 10,
+            "trigger": self.spin_adctrigger.value(),
+            "adc_count": self.spin_adccount.value(),
+            "timing": timing,
+            "nevents": self.spin_eventcount.value()
+        }
         log_var = "Variables used: {0} {1} {2} {3} {4}".format(
             "Skip lines: " + str(self.spin_skiplines.value()),
             "ADC trigger: " + str(self.spin_adctrigger.value()),
             "ADC count: " + str(self.spin_adccount.value()),
             "Timing: " + str(timing),
             "Event count: " + str(self.spin_eventcount.value()))
-        log_elapsed = "Importing finished {0} seconds".format(int(elapsed))
-        logging.getLogger("request").info(log)
-        logging.getLogger("request").info(log_var)
-        logging.getLogger("request").info(log_elapsed)
 
-        sbh.reporter.report(100)
+        # Files are imported in a separate thread so that the GUI stays
+        # responsive. Closing the dialog cancels the import.
+        self.__ct = CancellationToken()
+        self.button_import.setEnabled(False)
+        self.button_addimport.setEnabled(False)
+
+        def import_files():
+            try:
+                errors = coincidence.import_files(
+                    files, string_column,
+                    progress=sbh.reporter.get_sub_reporter(
+                        lambda x: 10 + 0.9 * x),
+                    ct=self.__ct, **kwargs)
+            except Exception as e:
+                errors = {"files": e}
+            self.import_finished.emit({
+                "errors": errors,
+                "filenames": ", ".join(filename_list),
+                "log_var": log_var,
+                "elapsed": timer() - start_time,
+                "reporter": sbh.reporter
+            })
+
+        import_thread = threading.Thread(target=import_files)
+        import_thread.daemon = True
+        import_thread.start()
+
+    def __import_finished(self, result: dict):
+        """Logs the results of the import and closes the dialog.
+
+        Args:
+            result: dictionary of results emitted by the import thread
+        """
+        for input_file, error in result["errors"].items():
+            logging.getLogger("request").error(
+                f"Could not import {input_file}: {error}")
+
+        if self.__ct.is_cancellation_requested():
+            logging.getLogger("request").info(
+                "Importing measurements was cancelled.")
+        else:
+            log = "Imported measurements to request: {0}".format(
+                result["filenames"])
+            log_elapsed = "Importing finished {0} seconds".format(
+                int(result["elapsed"]))
+            logging.getLogger("request").info(log)
+            logging.getLogger("request").info(result["log_var"])
+            logging.getLogger("request").info(log_elapsed)
+
+        result["reporter"].report(100)
+        self.__ct = None
         self.imported = True
         self.close()
 
+    def closeEvent(self, event):
+        """Cancels a running import instead of closing the dialog. The
+        dialog is closed once the import has stopped.
+        """
+        if self.__ct is not None:
+            self.__ct.request_cancellation()
+            event.ignore()
+            return
+        super().closeEvent(event)
+
+    def reject(self):
+        """Cancels a running import instead of rejecting the dialog.
+        """
+        if self.__ct is not None:
+            self.__ct.request_cancellation()
+            return
+        super().reject()
+
     def __insert_import_timings(self):
         """Insert column selection for import to QTableWidget.
         """
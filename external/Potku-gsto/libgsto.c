@@ -69,8 +69,8 @@ int gsto_add_file(gsto_table_t *table, char *name, char *filename, int Z1_min, i
 #endif
     table->files = realloc(table->files, sizeof(gsto_file_t)*(table->n_files+1));
     gsto_file_t *new_file=&table->files[table->n_files];
-    new_file->name = calloc(strlen(name), sizeof(char));
-    new_file->filename = calloc(strlen(filename), sizeof(char));
+    new_file->name = calloc(strlen(name)+1, sizeof(char));
+    new_file->filename = calloc(strlen(filename)+1, sizeof(char));
     strcpy(new_file->name, name);
     strcpy(new_file->filename, filename);    
     for(i=GSTO_N_STOPPING_TYPES-1; i >=0; i--) {
@@ -125,21 +125,26 @@ gsto_table_t *gsto_allocate(int Z1_max, int Z2_max) {
 }
 
 int gsto_deallocate(gsto_table_t *table) {
-    int Z1, i;
+    int Z1, Z2, i;
     gsto_file_t *file;
     if(!table) {
         return 0;
     }
     for(i=0; i<table->n_files; i++) {
         file=&table->files[i];
-        /*free(file->filename);
-        free(file->name);*/
+        free(file->filename);
+        free(file->name);
     }
-    /*free(table->files);*/
+    free(table->files);
     for(Z1=0; Z1<=table->Z1_max; Z1++) {
+        for(Z2=0; Z2<=table->Z2_max; Z2++) {
+            free(table->ele[Z1][Z2]);
+        }
         free(table->assigned_files[Z1]);
         free(table->ele[Z1]);
     }
+    free(table->assigned_files);
+    free(table->ele);
     free(table);
     return 1;
 }
@@ -158,7 +163,7 @@ int gsto_load_binary_file(gsto_table_t *table, gsto_file_t *file) {
         for (Z2=file->Z2_min; Z2<=file->Z2_max; Z2++) {
             if (table->assigned_files[Z1][Z2] == file) {
                 table->ele[Z1][Z2] = malloc(sizeof(double)*file->xpoints);
-                fread(&table->ele[Z1][Z2], sizeof(double), file->xpoints, file->fp);
+                fread(table->ele[Z1][Z2], sizeof(double), file->xpoints, file->fp);
             } else {
                 fseek(file->fp, sizeof(double)*file->xpoints, SEEK_CUR);
             }
@@ -446,6 +451,7 @@ gsto_table_t *gsto_init(int Z_max, char *stoppings_file_name) {
     } else {
         fprintf(stderr, "GSTO: Could not open settings file! No stopping files added.\n");
     }
+    free(line);
     return table;
 }
 
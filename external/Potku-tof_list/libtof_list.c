@@ -0,0 +1,625 @@
+/* Conversion of cut file events into energies. The functions are shared by
+   the tof_list program and the tof_list shared library. */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <ctype.h>
+#include <math.h>
+#include <stdarg.h>
+
+#include <libgsto.h>
+#include <gsto_masses.h>
+
+#include "tof_list.h"
+
+struct tof_list_config {
+   Input input;
+   gsto_table_t *table;
+   char mass_file[EFF_DIR_LENGTH];
+};
+
+struct tof_list_cut {
+   tof_list_config *config;
+   Cut cut;
+};
+
+int tof_list_verbose = TRUE;
+
+static void message(const char *, ...);
+static double as_printed(const char *, double);
+
+static void message(const char *format, ...)
+{
+   va_list args;
+
+   if(!tof_list_verbose) return;
+   va_start(args, format);
+   vfprintf(stderr, format, args);
+   va_end(args);
+}
+
+static double as_printed(const char *format, double value)
+{
+   /* Values are rounded the same way as in the output of tof_list */
+   char buffer[64];
+
+   snprintf(buffer, sizeof(buffer), format, value);
+   return(strtod(buffer, NULL));
+}
+
+double **set_sto(gsto_table_t *table, double z, double m, double e)
+{
+    int i,n;
+    double **sto;
+    double E, S;
+    message("set_sto(%p, z=%g, m=%g u, e=%g keV)\n", table, z, m/C_U, e/C_KEV);
+    n=(int) (e/(STOPSTEP*C_MEV))+1;
+    sto = malloc(sizeof(double *)*2);
+    sto[0]=calloc(n, sizeof(double));
+    sto[1]=calloc(n, sizeof(double));
+    for(i=0; i<n; i++){
+        E=i*STOPSTEP*C_MEV;
+        S=gsto_sto_v(table, z, 6, velocity(E, m));
+        sto[0][i] = E;
+        sto[1][i] = S*C_MEVCM2_UG*C_MEV*P_NA/M_C;
+    }
+
+   return(sto);
+
+}
+
+double **set_weight(char *symbol, int z, Input *input)
+{
+   FILE *fp;
+   char *file,*tmp,*yx,*kax,*name;
+   int i=0,multp=EFF_FRAC;
+   double energy=0.0,pct=0.0,multe=EFF_MEV,**ret;
+
+   name = tmp = file = (char *) malloc(sizeof(char)*WORD_LENGTH);
+   yx = (char *) malloc(sizeof(char)*WORD_LENGTH);
+   kax = (char *) malloc(sizeof(char)*WORD_LENGTH);
+   ret = (double **) malloc(sizeof(double *)*2);
+   message("set_weight(%s, %i, %p)\n", symbol, z, input);
+   if(z){
+      for(i=1; z/(i*10)>0; i*=10);
+      for(; i>0; i/=10){
+         *file++ = z/i + '0';
+         z %= i;
+      }
+   }
+   while((*file++ = *symbol++));
+   file = strcat(tmp,".eff");
+   //message("Directory: %s\n", input->eff_dir);
+	if (strlen(input->eff_dir) > 0) {
+		tmp = (char *) malloc(sizeof(char)*EFF_DIR_LENGTH+strlen(file)+2);
+		strcpy(tmp, input->eff_dir);
+		strcat(tmp, "/");
+		strcat(tmp, file);
+		file = tmp;
+	}
+   fp = fopen(file, "r");
+   if(fp != NULL){
+    message("Used efficiency file: %s\n", file);
+      fscanf(fp,"%s %s",yx,kax);
+      if(!strcmp(yx,"keV")) multe = EFF_KEV;
+      else if(!strcmp(yx,"MeV")) multe = EFF_MEV;
+      if(!strcmp(kax,"frac")) multp = EFF_FRAC;
+      else if(!strcmp(kax,"pct")) multp = EFF_PCT;
+      for(i=(isdigit(*yx)?1:0); fscanf(fp,"%lf %lf",&energy,&pct) == 2; i++);
+      fclose(fp);
+      ret[0] = (double *) malloc(sizeof(double)*(i+1));
+      ret[1] = (double *) malloc(sizeof(double)*(i+1));
+      fp = fopen(file,"r");
+      if(!isdigit(*yx)) fscanf(fp,"%s %s",yx,kax);
+      for(i=0; fscanf(fp,"%lf %lf",&energy,&pct) == 2; i++){
+         ret[0][i] = energy*multe;
+         ret[1][i] = (multp?1.0:100.0)/pct;
+      }
+      message("Got %i points from efficiency file. Highest energy %g MeV\n",i, ret[0][i-1]/C_MEV);
+      fclose(fp);
+   } else {
+      ret[0] = (double *) malloc(sizeof(double)*2);
+      ret[1] = (double *) malloc(sizeof(double)*2);
+      ret[0][0] = 0.0;
+      ret[0][1] = 10.0;
+      ret[1][0] = ret[1][1] = 1.0;
+   }
+   if(file != name) free(file);
+   free(name);
+   free(yx);
+   free(kax);
+
+   return(ret);
+
+}
+
+double get_weight(double **table, double e)
+{
+   int i;
+   double ret;
+
+   for(i=0; table[0][i]<e && table[0][i]; i++);
+
+   i -= (table[0][i]?1:2);
+   i = max(0,i);
+   ret = table[1][i]+(table[1][i+1]-table[1][i])*(e-table[0][i])/(table[0][i+1]-table[0][i]);
+
+   return(ret);
+
+}
+
+int lookup_mass(const char *mass_file, const char *symbol, int *z, double *mass) /* The second parameter (int *z) is actually mass number A as an input (with *z==0 we assume natural isotopic distribution) and simultaneously this function stores the proton number (Z) into z. The mass is stored into mass and zero is returned on success. So the same variable acts both as an input and an output and has different meanings. Whoever programmed this will be first against the wall when the revolution comes. */
+{
+   FILE *fp;
+   char S[3];
+   int A,N,Z;
+   double C,M,MC=0.0,MM=0.0;
+   message("Trying to find mass for \"%s\" (mass number A is %i)\n", symbol, *z);
+
+   fp = fopen(mass_file,"r");
+   if(fp == NULL){
+      message("Could not open element mass file %s\n",mass_file);
+      return(4);
+   }
+
+   if(*z == 0){
+      while(fscanf(fp,"%i %i %i %s %lf %lf\n",&N,&Z,&A,S,&M,&C) == 6){
+         if(strcmp(symbol,S) == 0){
+            MM += M*C;
+            if(C>MC){
+               MC = C;
+               *z = Z;
+            }
+         }
+      }
+      MM /= 100.0;
+      if((int)(MM)){
+         fclose(fp);
+         *mass = MM*C_U/1.0e6;
+         return(0);
+      }
+   } else
+	  //printf("else osa");
+	  //printf("%i", *z);
+      while(fscanf(fp,"%i %i %i %s %lf %lf\n",&N,&Z,&A,S,&M,&C) == 6)
+         if(strcmp(symbol,S) == 0 && *z == A){
+            fclose(fp);
+			//printf("%i", *z);
+            *z = Z;
+            *mass = M*C_U/1.0e6;
+            return(0);
+         }
+
+   fclose(fp);
+   message("Could not find element %s\n",symbol);
+   return(5);
+
+}
+
+double get_energy(double s, double t, double m)
+{
+   double v,ret;
+
+   v = s/t;
+   ret = 0.5*m*v*v;
+
+   return(ret);
+
+}
+
+double get_eloss(double e, double **sto)
+{
+   double s;
+   int i;
+
+   i = (int) (e/(STOPSTEP*C_MEV));
+
+   i = max(0,i);
+
+   if(e < sto[0][i])
+      i--;
+
+   if(e >= sto[0][i+1])
+      i++;
+
+   s = sto[1][i] + (sto[1][i+1] - sto[1][i])*(e - sto[0][i])/(sto[0][i+1] - sto[0][i]);
+
+   if(s < 0 || s > e) s = -1.0;
+
+   return(s);
+
+}
+
+
+/*
+
+int get_step(double e, double **sto)
+{
+   int i=2,j;
+   double esect,next,prev;
+
+   prev = get_eloss(e,sto); next = prev*2;
+   while(((next>prev)?next/prev:prev/next)>1.0+CAL_ACC){
+      next = 0.0; esect = e;
+      for(j=0; j<i; j++){
+         next += get_eloss(esect,sto)/i;
+         esect = e + prev/i;
+      }
+      i *= 2;
+   }
+
+   return(i);
+
+}
+
+*/
+
+int read_input(const char *input_file, Input *input)
+{
+   FILE *fp;
+   char *read,*read_orig;
+   int Z=0,status=0;
+
+   fp = fopen(input_file, "r");
+   if(fp == NULL){
+      message("Could not open input file %s\n", input_file);
+      return(6);
+   }
+    char *line = (char *) malloc(sizeof(char)*WORD_LENGTH);
+   read_orig = read = (char *) malloc(sizeof(char)*WORD_LENGTH);
+
+    input->acalib1=0.0;
+    input->acalib2=0.0;
+
+    while(fgets(line, WORD_LENGTH, fp)) {
+        sscanf(line, "Angle calibration: %lf %lf", &input->acalib1, &input->acalib2);
+    }
+    fclose(fp);
+
+    fp = fopen(input_file, "r");
+   /* The loop here (word by word) is rediculous. I'm not going to touch it. */
+   while(fscanf(fp, "%s", read)==1) {
+      if(!strcmp(read,"Beam:")){
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         while(isdigit(*read)) Z = Z*10 + *read++ - '0';
+         sscanf(read,"%s",input->beam);
+         input->beamZ = Z;
+      }
+      else if(!strcmp(read,"Energy:")){
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->beamE = atof(read)*C_MEV;
+      }
+      else if(!strcmp(read,"Detector")){
+         if(fscanf(fp,"%s",read) == 0 && strcmp(read,"angle:")){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->theta = atof(read);
+      }
+      else if(!strcmp(read,"Target")){
+         if(fscanf(fp,"%s",read) == 0 && strcmp(read,"angle:")){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->target_angle = atof(read);
+      }
+      else if(!strcmp(read,"Toflen:")){
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->tof = atof(read);
+      }
+      else if(!strcmp(read,"Carbon")){
+         if(fscanf(fp,"%s",read) == 0 && strcmp(read,"foil")){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         if(fscanf(fp,"%s",read) == 0 && strcmp(read,"thickness")){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->foil_thick = atof(read);
+      }
+      else if(!strcmp(read,"TOF")){
+         if(fscanf(fp,"%s",read) == 0 && strcmp(read,"calibration:")){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->calib1 = atof(read);
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         input->calib2 = atof(read);
+      }
+      else if(!strcmp(read,"Efficiency")){
+         if(fscanf(fp,"%s",read) == 0 && strcmp(read,"directory:")){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+         if(fscanf(fp,"%s",read) == 0){
+            message("Faulty input file %s\n",input_file);
+            status = 7;
+            break;
+         }
+		 sscanf(read,"%s",input->eff_dir);
+      }
+   }
+   fclose(fp);
+   free(line);
+   free(read_orig);
+   return(status);
+}
+
+
+double ipow(double b, int e)
+{
+   double ret=1.0;
+
+   while(e-->0) ret *= b;
+
+   return (ret);
+}
+
+int set_cut(gsto_table_t *table, const char *element, Input *input,
+            const char *mass_file, Cut *cut)
+{
+   /* Element is given as in cut file names, e.g. 35Cl or O. Stopping and
+      efficiency are looked up with the mass number if it is given. */
+   const char *element_orig = element;
+   int A=0,ZZ,status;
+   char *symbol;
+
+   memset(cut, 0, sizeof(Cut));
+   while(isdigit(*element)) A = A*10 + *element++ - '0';
+   for(symbol = cut->symbol; isalpha(*element) &&
+       symbol < cut->symbol + WORD_LENGTH - 1; *symbol++ = *element++);
+   *symbol = '\0';
+   while(symbol > cut->symbol && !isupper(*--symbol));
+   if(!isupper(*symbol)) {
+      message("Could not parse element %s\n", element_orig);
+      return(5);
+   }
+   memmove(cut->symbol, symbol, strlen(symbol) + 1);
+
+   ZZ = A;
+   if((status = lookup_mass(mass_file, cut->symbol, &ZZ, &cut->M)))
+      return(status);
+   cut->M2 = 0;
+   cut->emax = input->beamE;
+   cut->sto = set_sto(table, (A)?A:ZZ, cut->M, cut->emax*MAX_FACTOR);
+   cut->weight = set_weight(cut->symbol, A, input);
+   cut->Z = ZZ;
+   cut->tech = ERD;
+   cut->user_weight = 1.0;
+   cut->ecalib = 0.0;
+   return(0);
+}
+
+int set_scatter(Cut *cut, const char *scatter, const char *mass_file)
+{
+   /* Scatter element of RBS is given with or without the mass number,
+      e.g. 55Mn */
+   char symbol[WORD_LENGTH];
+   int isotope=0,status;
+
+   while(isdigit(*scatter)) isotope = isotope*10 + *scatter++ - '0';
+   if(sscanf(scatter, "%5s", symbol) != 1) {
+      message("Could not parse scatter element\n");
+      return(5);
+   }
+   message("Scatter element: %s\n", symbol);
+   message("Scatter isotope: %i\n", isotope);
+   if((status = lookup_mass(mass_file, symbol, &isotope, &cut->M2)))
+      return(status);
+   message("Scatter isotope mass: %8.4f\n", cut->M2/C_U);
+   cut->Z = isotope;  /* here isotope is proton number, not isotope number A */
+   return(0);
+}
+
+void free_cut(Cut *cut)
+{
+   int i;
+
+   for(i=0; i<2; i++) {
+      if(cut->sto) free(cut->sto[i]);
+      if(cut->weight) free(cut->weight[i]);
+   }
+   free(cut->sto);
+   free(cut->weight);
+   cut->sto = cut->weight = NULL;
+}
+
+int convert_event(const Input *input, const Cut *cut, int tof, int e,
+                  double *result)
+{
+   /* Stores the energy of the event in result. Returns TRUE if the energy is
+      within the limits. */
+   double energy,tmpd;
+
+   if(e <= 0) return(FALSE);
+   if(tof == 0){
+      energy  = e + ((double)(rand())/RAND_MAX) - 0.5;
+      energy *= cut->ecalib;
+      energy *= C_MEV;
+   } else {
+      energy = tof +  ((double)(rand())/RAND_MAX) - 0.5;
+      energy = get_energy(input->tof,energy*input->calib1 + input->calib2,cut->M);
+   }
+   tmpd = get_eloss(energy,cut->sto);
+   energy = (tmpd > -0.1)?energy + tmpd*input->foil_thick:-1.0;
+   *result = energy;
+   return(energy > -0.1 && energy < cut->emax*MAX_FACTOR);
+}
+
+tof_list_config *tof_list_config_new(const char *tof_in_file,
+                                     const char *stoppings_file,
+                                     const char *mass_file)
+{
+   tof_list_config *config;
+   double beamM;
+   int beamZ;
+
+   config = calloc(1, sizeof(tof_list_config));
+   if(!config) return(NULL);
+   if(strlen(mass_file) >= sizeof(config->mass_file) ||
+      read_input(tof_in_file, &config->input)) {
+      free(config);
+      return(NULL);
+   }
+   strcpy(config->mass_file, mass_file);
+   beamZ = config->input.beamZ;
+   if(lookup_mass(config->mass_file, config->input.beam, &beamZ, &beamM)) {
+      free(config);
+      return(NULL);
+   }
+   config->table = gsto_init(MAXELEMENTS, (char *) stoppings_file);
+   if(!config->table) {
+      message("Could not init stopping table.\n");
+      free(config);
+      return(NULL);
+   }
+   gsto_auto_assign_range(config->table, 1, MAXELEMENTS, 6, 6);
+   if(!gsto_load(config->table)) {
+      message("Error in loading stopping.\n");
+      tof_list_config_free(config);
+      return(NULL);
+   }
+   return(config);
+}
+
+void tof_list_config_free(tof_list_config *config)
+{
+   if(!config) return;
+   if(config->table) gsto_deallocate(config->table);
+   free(config);
+}
+
+void tof_list_set_verbose(int value)
+{
+   tof_list_verbose = value;
+}
+
+tof_list_cut *tof_list_cut_new(tof_list_config *config, const char *element,
+                               const char *type, const char *weight_factor,
+                               const char *scatter_element)
+{
+   /* Arguments are the element in the cut file name and the values of the
+      Type, Weight Factor and Scatter Element lines of the cut file header.
+      Weight factor and scatter element may be NULL. */
+   tof_list_cut *cut;
+   char scatter[WORD_LENGTH];
+
+   cut = calloc(1, sizeof(tof_list_cut));
+   if(!cut) return(NULL);
+   cut->config = config;
+   if(set_cut(config->table, element, &config->input, config->mass_file,
+              &cut->cut)) {
+      tof_list_cut_free(cut);
+      return(NULL);
+   }
+   if(type && strcmp(type, "RBS") == 0) cut->cut.tech = RBS;
+   if(weight_factor) sscanf(weight_factor, "%f", &cut->cut.user_weight);
+   if(cut->cut.tech == RBS) {
+      if(!scatter_element ||
+         sscanf(scatter_element, "%255s", scatter) != 1 ||
+         set_scatter(&cut->cut, scatter, config->mass_file)) {
+         tof_list_cut_free(cut);
+         return(NULL);
+      }
+   }
+   return(cut);
+}
+
+void tof_list_cut_free(tof_list_cut *cut)
+{
+   if(!cut) return;
+   free_cut(&cut->cut);
+   free(cut);
+}
+
+int tof_list_cut_z(const tof_list_cut *cut)
+{
+   return(cut->cut.Z);
+}
+
+double tof_list_cut_mass(const tof_list_cut *cut)
+{
+   const Cut *c = &cut->cut;
+
+   return(as_printed("%8.4f", ((c->tech == RBS)?c->M2:c->M)/C_U));
+}
+
+int tof_list_cut_is_erd(const tof_list_cut *cut)
+{
+   return(cut->cut.tech == ERD);
+}
+
+long tof_list_convert(tof_list_cut *cut, const int *events, long n,
+                      int columns, double *angles, double *energies,
+                      double *weights, int *event_numbers)
+{
+   /* Converts n events, given as rows of ToF, energy, (angle) and event
+      number, and stores the accepted ones in the output arrays that must
+      have room for n values. Random numbers are seeded as in a new tof_list
+      process, so this is not thread safe. Returns the number of accepted
+      events or -1 if the arguments are invalid. */
+   const Input *input = &cut->config->input;
+   const int *event;
+   double energy,angle1;
+   long i,count=0;
+
+   if(columns != 3 && columns != 4) return(-1);
+   srand(1);
+   for(i=0; i<n; i++) {
+      event = events + i*columns;
+      angle1 = (columns == 4)?event[2]*input->acalib1+input->acalib2:0.0;
+      if(convert_event(input, &cut->cut, event[0], event[1], &energy)) {
+         angles[count] = as_printed("%e", angle1);
+         energies[count] = as_printed("%10.5lf", energy/C_MEV);
+         weights[count] = as_printed("%6.3f",
+            get_weight(cut->cut.weight,energy)*cut->cut.user_weight);
+         event_numbers[count] = event[columns - 1];
+         count++;
+      }
+   }
+   return(count);
+}
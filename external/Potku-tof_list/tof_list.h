@@ -0,0 +1,168 @@
+#ifndef TOF_LIST_H
+#define TOF_LIST_H
+
+#include <stddef.h>
+
+/* libgsto.h must be included before this header */
+
+
+/*      Fundamental Physical Constants in SI-units      */
+
+#define P_NA     6.0221367e23
+#define P_ABOHR  0.529177249e-10
+#define P_C      299792458
+#define P_E      1.60217733e-19
+#define P_EPS0   8.85419e-12
+
+#ifndef PI
+#ifdef M_PI
+#define PI M_PI
+#else
+#define PI 3.14159265358979323846
+#endif
+#endif
+
+/*      Conversion factors from non-SI units to SI-units        */
+/*      Underline (_) in the constant name means division (/)   */
+
+#define C_KEV_NM 1.6021773e-7   /* KeV/nm to J/m  */
+#define C_U      1.6605402e-27  /* Atomic mass to kilograms */
+#define C_V0     2187691.42     /* Bohr velocity to m/s */
+#define C_EV     P_E            /* eV to J */
+#define C_DEG    (PI/180.0)       /* degrees to radians */
+
+/*      Dimensions of physical constants */
+
+#define C_ANGSTROM  1.0e-10
+#define C_NM        1.0e-9
+#define C_UM        1.0e-6
+#define C_MM        1.0e-3
+#define C_CM        1.0e-2
+#define C_FS        1.0e-15
+#define C_PS        1.0e-12
+#define C_NS        1.0e-09
+#define C_KEV       (1000.0*C_EV)
+#define C_MEV       (1000000.0*C_EV)
+#define C_CM2       0.0001
+#define C_CM3       0.000001
+
+#define C_EVCM2_1E15ATOMS (C_EV*C_CM2/1.0e15) /* eVcm2/1e15 at. to Jm2/at. */
+
+#define C_G_CM3     1000.0
+
+#define C_BARN      1.0e-28
+
+#define C_DEFAULT   1.0
+
+#define ANGLE1      0.0
+#define ANGLE2      0.0
+
+#define C_MEVCM2_UG 1.0e-27
+
+#define Z_C         6
+#define M_C         12.0
+
+#define ERD         1
+#define RBS         0
+
+#define TRUE        1
+#define FALSE       0
+
+#define STOPSTEP    0.1
+#define CAL_ACC     0.02
+#define MAX_FACTOR  1.2
+
+#define EFF_MEV     C_MEV
+#define EFF_KEV     C_KEV
+#define EFF_FRAC    1
+#define EFF_PCT     0
+
+#define MAXELEMENTS 100
+
+#define MASS_FILE   DATAPATH/masses.dat
+#define STOP_DATA   DATAPATH/stopping.bin
+
+#define WORD_LENGTH 256
+#define EFF_DIR_LENGTH 1024
+
+#define max(A,B)  ((A) > (B)) ? (A) : (B)
+#define min(A,B)  ((A) < (B)) ? (A) : (B)
+
+#define XSTR(x) STR(x)
+#define STR(x) #x
+
+typedef struct {
+   char beam[3];
+   double beamZ;
+   double beamE;
+   double theta;
+   double target_angle;
+   double tof;
+   double foil_thick;
+   double calib1;
+   double calib2;
+    double acalib1;
+    double acalib2;
+   double *ecalib;
+   char eff_dir[EFF_DIR_LENGTH];
+} Input;
+
+/* Conversion settings of the events of a single cut file */
+typedef struct {
+   char symbol[WORD_LENGTH];
+   int Z;           /* proton number written to the output */
+   int tech;        /* ERD or RBS */
+   float user_weight;
+   double M;        /* mass of the recoil */
+   double M2;       /* mass of the scatter element (RBS) */
+   double emax;
+   double ecalib;
+   double **sto;
+   double **weight;
+} Cut;
+
+double **set_sto(gsto_table_t *, double, double, double);
+double **set_weight(char *,int,Input *);
+double get_weight(double **,double);
+int lookup_mass(const char *, const char *, int *, double *);
+double get_energy(double,double,double);
+double get_eloss(double,double **);
+int read_input(const char *, Input *);
+double ipow(double,int);
+
+extern int tof_list_verbose;
+
+int set_cut(gsto_table_t *, const char *, Input *, const char *, Cut *);
+int set_scatter(Cut *, const char *, const char *);
+void free_cut(Cut *);
+int convert_event(const Input *, const Cut *, int, int, double *);
+
+/* Shared library interface.
+
+   Configuration is read from a tof.in file and stopping is loaded once when
+   the configuration is created. Each cut file is then set up with
+   tof_list_cut_new and its events are converted with tof_list_convert. The
+   results are identical to the values printed by the tof_list program. */
+
+typedef struct tof_list_config tof_list_config;
+typedef struct tof_list_cut tof_list_cut;
+
+tof_list_config *tof_list_config_new(const char *tof_in_file,
+                                     const char *stoppings_file,
+                                     const char *mass_file);
+void tof_list_config_free(tof_list_config *config);
+void tof_list_set_verbose(int value);
+
+tof_list_cut *tof_list_cut_new(tof_list_config *config, const char *element,
+                               const char *type, const char *weight_factor,
+                               const char *scatter_element);
+void tof_list_cut_free(tof_list_cut *cut);
+int tof_list_cut_z(const tof_list_cut *cut);
+double tof_list_cut_mass(const tof_list_cut *cut);
+int tof_list_cut_is_erd(const tof_list_cut *cut);
+
+long tof_list_convert(tof_list_cut *cut, const int *events, long n,
+                      int columns, double *angles, double *energies,
+                      double *weights, int *event_numbers);
+
+#endif
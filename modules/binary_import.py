@@ -0,0 +1,137 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+Conversion of binary list mode (.lst) measurement files into the .asc format
+used by Potku.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import contextlib
+import logging
+
+import numpy as np
+
+from . import event_store
+
+from .event_store import EVENT_DTYPE
+from .observing import ProgressReporter
+
+from pathlib import Path
+from typing import Optional
+
+# Each event in a .lst file is a pair of little-endian 16-bit integers
+LST_DTYPE = np.dtype([("tof", "<i2"), ("energy", "<i2")])
+
+# Energy values are stored with this offset
+ENERGY_OFFSET = 8192
+
+# Number of events read and written at once
+_CHUNK_SIZE = 1 << 20
+
+# Lookup tables from int16 values to their string representations in the
+# .asc file. These are built on first use.
+_TOF_STRINGS = None
+_ENERGY_STRINGS = None
+
+
+def convert_lst_file(input_file: Path, output_file: Path,
+                     write_event_cache: bool = False,
+                     chunk_size: int = _CHUNK_SIZE,
+                     progress: Optional[ProgressReporter] = None) -> int:
+    """Converts a binary .lst file into an .asc file.
+
+    File is processed in chunks, so memory usage does not depend on the size
+    of the file. Trailing bytes that do not form a complete event are
+    ignored.
+
+    Args:
+        input_file: path to the .lst file
+        output_file: path to the .asc file that will be written
+        write_event_cache: whether the binary event cache of the .asc file
+            is written at the same time so that the .asc file does not have
+            to be parsed when the measurement is opened
+        chunk_size: number of events processed at once
+        progress: optional ProgressReporter
+
+    Return:
+        number of converted events
+    """
+    input_file = Path(input_file)
+    output_file = Path(output_file)
+    file_size = input_file.stat().st_size
+    event_count, extra_bytes = divmod(file_size, LST_DTYPE.itemsize)
+    if extra_bytes:
+        logging.getLogger("request").warning(
+            f"{input_file} ends with an incomplete event. The last "
+            f"{extra_bytes} byte(s) were ignored.")
+
+    with contextlib.ExitStack() as stack:
+        # Cache writer is entered first so that it is closed after the .asc
+        # file has been completely written.
+        if write_event_cache:
+            cache_writer = stack.enter_context(
+                event_store.CacheWriter(output_file, event_count))
+        else:
+            cache_writer = None
+        in_file = stack.enter_context(input_file.open("rb"))
+        out_file = stack.enter_context(output_file.open("wb"))
+
+        converted = 0
+        while converted < event_count:
+            count = min(chunk_size, event_count - converted)
+            events = np.fromfile(in_file, dtype=LST_DTYPE, count=count)
+            if len(events) != count:
+                raise OSError(f"Could not read {input_file}.")
+            tof = events["tof"].astype(EVENT_DTYPE)
+            energy = events["energy"].astype(EVENT_DTYPE) - ENERGY_OFFSET
+            out_file.write(_format_events(tof, energy))
+
+            if cache_writer is not None:
+                event_number = np.arange(
+                    converted + 1, converted + count + 1, dtype=EVENT_DTYPE)
+                cache_writer.write(tof, energy, event_number)
+            converted += count
+            if progress is not None:
+                progress.report(converted / event_count * 100)
+
+    if progress is not None:
+        progress.report(100)
+    return event_count
+
+
+def _format_events(tof: np.ndarray, energy: np.ndarray) -> bytes:
+    """Formats events as lines of 'tof energy'.
+
+    Values are looked up from precomputed tables, which is several times
+    faster than formatting each row with numpy.savetxt.
+    """
+    global _TOF_STRINGS, _ENERGY_STRINGS
+    if _TOF_STRINGS is None:
+        values = range(-2 ** 15, 2 ** 15)
+        _TOF_STRINGS = np.array([f"{v} " for v in values], dtype=object)
+        _ENERGY_STRINGS = np.array(
+            [f"{v - ENERGY_OFFSET}\n" for v in values], dtype=object)
+    lines = _TOF_STRINGS[tof + 2 ** 15] + \
+        _ENERGY_STRINGS[energy + ENERGY_OFFSET + 2 ** 15]
+    return "".join(lines.tolist()).encode()
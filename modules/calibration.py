@@ -32,6 +32,7 @@ import collections
 import scipy.optimize as optimize
 
 from . import general_functions as gf
+from . import histogram
 
 from numpy import array
 from numpy import linspace
@@ -60,11 +61,11 @@ class TOFCalibrationHistogram:
         self.cut = cut
         self.bin_width = bin_width
         self.use_column = use_column
-        histed_file = gf.hist(
-            self.cut.data, width=self.bin_width, col=self.use_column)
+        positions, sums = histogram.calculate(
+            self.cut.data[:, self.use_column], width=self.bin_width)
 
-        self.histogram_x = [float(pair[0]) for pair in histed_file]
-        self.histogram_y = [float(pair[1]) for pair in histed_file]
+        self.histogram_x = positions.tolist()
+        self.histogram_y = sums.tolist()
 
     def get_error_function_parameters(self, end_of_front_edge,
                                       start_of_front_edge=0):
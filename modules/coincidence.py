@@ -0,0 +1,718 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+In-process implementation of the coinc program that finds coincident
+events from raw list mode ADC data.
+
+Input file contains one event per line as 'adc channel timestamp'. Events
+are examined with a moving coincidence table of tablesize events that is
+centered on the current event. Whenever the current event comes from the
+trigger ADC, the events of other ADCs whose time difference to the trigger
+event is within the ADC's timing window are in coincidence with it.
+
+The results are the same as coinc produces, including the way the table is
+filled and emptied at the beginning and end of the file.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import concurrent.futures
+import multiprocessing
+import os
+import re
+
+import numpy as np
+
+from . import event_store
+
+from .concurrency import CancellationToken
+from .observing import ProgressReporter
+from concurrent.futures import ProcessPoolExecutor
+
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+# Maximum number of ADCs supported by coinc. The last one is reserved for
+# marking empty slots in the coincidence table.
+N_ADCS_MAX = 128
+_BLANK_ADC = N_ADCS_MAX - 1
+_BLANK_CHANNEL = 2 ** 32 - 1
+
+# coinc reads the skipped lines into a buffer of this size
+_LINE_BUFFER_SIZE = 100
+
+# Number of bytes read from the input file at once
+_CHUNK_SIZE = 2 ** 22
+
+# Seconds between progress updates when importing multiple files
+_PROGRESS_INTERVAL = 0.1
+
+_UINT_MASK = 2 ** 32 - 1
+_ULONG_MAX = 2 ** 64 - 1
+_INTEGER_PREFIX = re.compile(rb"[+-]?\d+")
+
+# Classification of bytes for validating input before it is parsed in bulk
+_DIGIT, _SPACE, _OTHER = 0, 1, 2
+_BYTE_CLASSES = np.full(256, _OTHER, dtype=np.uint8)
+_BYTE_CLASSES[np.frombuffer(b"0123456789", dtype=np.uint8)] = _DIGIT
+_BYTE_CLASSES[np.frombuffer(b" \t\n\r\v\f", dtype=np.uint8)] = _SPACE
+# Integers with fewer digits always fit into 64 bits
+_MAX_DIGITS = 19
+_COLUMN = re.compile(r"\$(\d+)")
+
+
+def find_coincidences(input_file: Path, skip_lines: int, tablesize: int,
+                      trigger: int, adc_count: int,
+                      timing: Dict[str, Tuple[int, int]], nevents: int = 0,
+                      timediff: bool = True,
+                      chunk_size: int = _CHUNK_SIZE,
+                      progress: Optional[ProgressReporter] = None,
+                      ct: Optional[CancellationToken] = None) -> np.ndarray:
+    """Finds coincident events from a raw list mode file.
+
+    Args:
+        input_file: Path to input file.
+        skip_lines: An integer representing how many lines from the beginning
+            of the file is skipped. Like coinc, one more line is skipped
+            than what is given.
+        tablesize: An integer representing how large table is used to
+            calculate coincidences.
+        trigger: An integer representing trigger ADC.
+        adc_count: An integer representing the count of ADCs.
+        timing: A dict consisting of (min, max) representing different ADC
+            timings.
+        nevents: An integer representing limit of how many events will the
+            program look for. 0 means no limit.
+        timediff: Whether the time difference to the trigger event is output
+            after each channel.
+        chunk_size: number of bytes read from the input file at once.
+        progress: optional ProgressReporter
+        ct: optional CancellationToken. If cancellation is requested, the
+            coincidences found so far are returned.
+
+    Return:
+        integer array that has a row for each coincidence. Row has a channel
+        column (and a time difference column if timediff is True) for each
+        ADC. ADCs that were not in the coincidence have zero values.
+    """
+    if not 1 < adc_count < N_ADCS_MAX - 1:
+        raise ValueError(
+            f"Number of ADCs must be higher than 1 but lower than "
+            f"{N_ADCS_MAX - 1}.")
+    if tablesize <= 1:
+        raise ValueError("Coincidence table size must be larger than 1.")
+    if not 0 <= trigger < adc_count:
+        raise ValueError(
+            "Number of ADCs set too low or trigger ADC number is too high.")
+
+    low = np.zeros(N_ADCS_MAX, dtype=np.int64)
+    high = np.zeros(N_ADCS_MAX, dtype=np.int64)
+    for key, (low_value, high_value) in timing.items():
+        adc = int(key)
+        if not 0 <= adc < N_ADCS_MAX:
+            raise ValueError(f"Timing window given for invalid ADC {adc}.")
+        low[adc], high[adc] = low_value, high_value
+
+    table = _CoincidenceTable(
+        tablesize, trigger, adc_count, low, high, timediff, nevents)
+    input_file = Path(input_file)
+    file_size = max(input_file.stat().st_size, 1)
+    with input_file.open("rb") as file:
+        for _ in range(skip_lines + 1):
+            if not file.readline(_LINE_BUFFER_SIZE - 1):
+                # Can't skip more lines than there are in the input
+                return table.get_results()
+        for events, stale in _read_events(file, adc_count, chunk_size):
+            table.add_events(*events)
+            if stale is not None:
+                table.finish(stale)
+            if table.is_full():
+                break
+            if ct is not None and ct.is_cancellation_requested():
+                break
+            if progress is not None:
+                progress.report(file.tell() / file_size * 100)
+    if progress is not None:
+        progress.report(100)
+    return table.get_results()
+
+
+def parse_columns(columns: str) -> List[int]:
+    """Parses awk style column selection, such as '$3,$5', into a list of
+    zero based column indices.
+    """
+    indices = []
+    for column in columns.split(","):
+        match = _COLUMN.fullmatch(column.strip())
+        if match is None or int(match.group(1)) < 1:
+            raise ValueError(f"Invalid column: '{column}'.")
+        indices.append(int(match.group(1)) - 1)
+    return indices
+
+
+def select_columns(coincidences: np.ndarray,
+                   columns: Sequence[int]) -> np.ndarray:
+    """Returns the given columns of the coincidences. Columns that are out
+    of range are returned as None values.
+    """
+    width = coincidences.shape[1]
+    return np.column_stack([
+        coincidences[:, i] if i < width else
+        np.full(len(coincidences), None, dtype=object)
+        for i in columns
+    ]) if columns else np.empty((len(coincidences), 0), dtype=np.int64)
+
+
+def format_lines(coincidences: np.ndarray,
+                 columns: Sequence[int]) -> List[str]:
+    """Formats the selected columns as lines of space separated values,
+    like awk prints them.
+    """
+    width = coincidences.shape[1]
+    fmt = " ".join("%d" if i < width else "" for i in columns) + "\n"
+    used = [i for i in columns if i < width]
+    return [fmt % tuple(row) for row in coincidences[:, used].tolist()]
+
+
+def import_coincidences(input_file: Path, output_file: Path, columns: str,
+                        write_event_cache: bool = True,
+                        **kwargs) -> np.ndarray:
+    """Finds the coincidences of a raw list mode file and writes the
+    selected columns into an .asc file.
+
+    Args:
+        input_file: path to the raw list mode file
+        output_file: path to the .asc file
+        columns: awk style column selection, such as '$3,$5'
+        write_event_cache: whether the events are also written straight
+            into the binary event cache of the .asc file
+        kwargs: keyword arguments passed down to find_coincidences
+
+    Return:
+        selected columns of the coincidences. Nothing is written and an
+        empty array is returned if the import is cancelled.
+    """
+    indices = parse_columns(columns)
+    coincidences = find_coincidences(input_file, **kwargs)
+    ct = kwargs.get("ct")
+    if ct is not None and ct.is_cancellation_requested():
+        return select_columns(coincidences[:0], indices)
+    lines = format_lines(coincidences, indices)
+    with Path(output_file).open("w") as file:
+        file.writelines(lines)
+
+    selected = select_columns(coincidences, indices)
+    if write_event_cache and selected.dtype != object and \
+            selected.shape[1] in (2, 3):
+        cols = selected.astype(event_store.EVENT_DTYPE).T
+        store = event_store.EventStore(
+            cols[0], cols[1], third=cols[2] if len(cols) == 3 else None)
+        event_store.write_cache(store, output_file)
+    return selected
+
+
+def import_files(files: Iterable[Tuple[Path, Path]], columns: str,
+                 max_workers: Optional[int] = None,
+                 progress: Optional[ProgressReporter] = None,
+                 ct: Optional[CancellationToken] = None,
+                 **kwargs) -> Dict[Path, Exception]:
+    """Imports multiple raw list mode files in parallel processes.
+
+    Args:
+        files: pairs of (input file, output .asc file)
+        columns: awk style column selection, such as '$3,$5'
+        max_workers: maximum number of processes. Defaults to the number
+            of processors.
+        progress: optional ProgressReporter that reports the combined
+            progress of all files
+        ct: optional CancellationToken. Files that have not been
+            completely imported when cancellation is requested are left
+            unwritten.
+        kwargs: keyword arguments passed down to import_coincidences
+
+    Return:
+        errors raised when importing files by input file
+    """
+    files = list(files)
+    errors = {}
+    if not files:
+        return errors
+    workers = min(len(files), max_workers or os.cpu_count() or 1)
+    file_progress = [0.0] * len(files)
+
+    with multiprocessing.Manager() as manager, \
+            ProcessPoolExecutor(workers) as executor:
+        progress_queue = manager.Queue()
+        cancel_event = manager.Event()
+        if ct is not None and ct.is_cancellation_requested():
+            cancel_event.set()
+        futures = {
+            executor.submit(
+                _import_file, i, input_file, output_file, columns, kwargs,
+                progress_queue, cancel_event): i
+            for i, (input_file, output_file) in enumerate(files)
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, timeout=_PROGRESS_INTERVAL)
+            while not progress_queue.empty():
+                i, value = progress_queue.get()
+                file_progress[i] = value
+            for future in done:
+                i = futures[future]
+                file_progress[i] = 100
+                if not future.cancelled() and future.exception() is not None:
+                    errors[files[i][0]] = future.exception()
+            if progress is not None:
+                progress.report(sum(file_progress) / len(files))
+            if ct is not None and ct.is_cancellation_requested() and \
+                    not cancel_event.is_set():
+                cancel_event.set()
+                for future in pending:
+                    future.cancel()
+    return errors
+
+
+def _import_file(index: int, input_file: Path, output_file: Path,
+                 columns: str, kwargs: dict, progress_queue, cancel_event):
+    """Imports a single file in a worker process of import_files.
+    """
+    ct = _EventCancellationToken(cancel_event)
+    if ct.is_cancellation_requested():
+        return
+    progress = ProgressReporter(
+        lambda value: progress_queue.put((index, value)))
+    import_coincidences(
+        input_file, output_file, columns, progress=progress, ct=ct, **kwargs)
+
+
+class _EventCancellationToken(CancellationToken):
+    """CancellationToken that is shared between processes through a
+    multiprocessing Event.
+    """
+    def __init__(self, event):
+        super().__init__()
+        self.__event = event
+
+    def request_cancellation(self):
+        self.__event.set()
+
+    def is_cancellation_requested(self):
+        return self.__event.is_set()
+
+
+class _CoincidenceTable:
+    """Equivalent of coinc's coincidence table.
+
+    coinc keeps the events in a ring buffer of tablesize slots. On each
+    iteration the event in the current slot is processed and the slot half a
+    table ahead is replaced with the next event from the input. The first
+    and last iterations are simulated slot by slot as coinc does them. In
+    between, the contents of the table follow a regular pattern: the event
+    at position x is compared to the events at positions x + 1 ... x + half -
+    1 and then x - (tablesize - half) ... x - 1. These iterations are
+    processed in batches with NumPy.
+    """
+    __slots__ = "size", "half", "trigger", "adc_count", "low", "high", \
+                "timediff", "nevents", "__adc", "__channel", "__timestamp", \
+                "__base", "__stale", "__failed_reads", "__table", \
+                "__table_size", "__slot", "__iteration", "__next_read", \
+                "__endgame", "__count", "__results", "__finished"
+
+    def __init__(self, size, trigger, adc_count, low, high, timediff,
+                 nevents):
+        self.size = size
+        self.half = size // 2
+        self.trigger = trigger
+        self.adc_count = adc_count
+        self.low = low
+        self.high = high
+        self.timediff = timediff
+        self.nevents = nevents
+        # Buffered events. First event is at position self.__base.
+        self.__adc = np.empty(0, dtype=np.int64)
+        self.__channel = np.empty(0, dtype=np.int64)
+        self.__timestamp = np.empty(0, dtype=np.uint64)
+        self.__base = 0
+        # Values of the event that could not be read once input has ended
+        self.__stale = None
+        self.__failed_reads = 0
+        # State of the ring buffer
+        self.__table = None
+        self.__table_size = size
+        self.__slot = 0
+        self.__iteration = 0
+        self.__next_read = 0
+        self.__endgame = 0
+        self.__count = 0
+        self.__results = []
+        self.__finished = False
+
+    def add_events(self, adc, channel, timestamp):
+        """Adds events to the end of the input and processes as many
+        iterations as possible.
+        """
+        self.__adc = np.concatenate((self.__adc, adc.astype(np.int64)))
+        self.__channel = np.concatenate(
+            (self.__channel, channel.astype(np.int64)))
+        self.__timestamp = np.concatenate(
+            (self.__timestamp, timestamp.astype(np.uint64)))
+        self.__run()
+
+    def finish(self, stale: Tuple[Optional[int], ...]):
+        """Processes remaining iterations after the input has ended.
+
+        Args:
+            stale: values (adc, channel, timestamp) that were read of the
+                event that could not be read. Values that were not read are
+                None.
+        """
+        self.__stale = stale
+        self.__run()
+
+    def is_full(self) -> bool:
+        """Whether all coincidences have been found.
+        """
+        return self.__finished or 0 < self.nevents <= self.__count
+
+    def get_results(self) -> np.ndarray:
+        """Returns the coincidences found so far.
+        """
+        width = self.adc_count * (2 if self.timediff else 1)
+        if not self.__results:
+            return np.empty((0, width), dtype=np.int64)
+        results = np.concatenate(self.__results)
+        if self.nevents > 0:
+            results = results[:self.nevents]
+        return results
+
+    def __available(self) -> int:
+        """Returns the number of events read from the input so far.
+        """
+        return self.__base + len(self.__adc)
+
+    def __get_event(self, position):
+        i = position - self.__base
+        return (int(self.__adc[i]), int(self.__channel[i]),
+                int(self.__timestamp[i]))
+
+    def __read(self):
+        """Reads the next event like coinc does.
+
+        Return:
+            event as a tuple or None if the input has ended. None is also
+            returned if more events are needed before continuing.
+        """
+        if self.__next_read < self.__available():
+            event = self.__get_event(self.__next_read)
+            self.__next_read += 1
+            return event
+        return None
+
+    def __apply_failed_read(self, old):
+        """Returns the contents of a slot after reading into it failed.
+        """
+        self.__failed_reads += 1
+        if self.__failed_reads > 1:
+            return old
+        return tuple(o if s is None else s for o, s in zip(old, self.__stale))
+
+    def __can_read(self) -> bool:
+        return self.__next_read < self.__available() or \
+            self.__stale is not None
+
+    def __run(self):
+        """Processes iterations until more input is needed.
+        """
+        if self.__table is None and not self.__fill_table():
+            return
+        while not self.is_full():
+            steady_end = self.__available() - self.size + self.half
+            if self.__table_size == self.size and not self.__endgame and \
+                    self.__iteration >= self.size and \
+                    steady_end > self.__iteration:
+                self.__process_batch(steady_end)
+            elif self.__endgame or self.__can_read():
+                self.__step()
+            else:
+                break
+        self.__discard()
+
+    def __fill_table(self) -> bool:
+        """Fills the table before the first iteration.
+
+        Return:
+            whether the table was filled.
+        """
+        if self.__available() < self.size - self.half and \
+                self.__stale is None:
+            return False
+        blank = (_BLANK_ADC, _BLANK_CHANNEL, 0)
+        table = [blank] * self.half
+        for _ in range(self.half, self.size):
+            event = self.__read()
+            if event is None:
+                # coinc shrinks the table to the events read. The values that
+                # were read of the incomplete event are discarded with the
+                # slot.
+                self.__failed_reads += 1
+                break
+            table.append(event)
+        self.__table = table
+        self.__table_size = len(table)
+        self.__slot = self.__table_size // 2
+        if self.__table_size <= 1:
+            self.__finished = True
+        return True
+
+    def __step(self):
+        """Literal translation of a single iteration of coinc's main loop.
+        """
+        table, size = self.__table, self.__table_size
+        row = self.__process_slot(table, self.__slot)
+        if row is not None:
+            self.__results.append(np.array([row], dtype=np.int64))
+            self.__count += 1
+            if self.__count == self.nevents:
+                self.__finished = True
+                return
+
+        target = (self.__slot + size // 2) % size
+        if self.__endgame:
+            if self.__endgame == size:
+                self.__finished = True
+                return
+            self.__endgame += 1
+            table[target] = (_BLANK_ADC, _BLANK_CHANNEL, 0)
+        else:
+            event = self.__read()
+            if event is None:
+                table[target] = self.__apply_failed_read(table[target])
+                self.__endgame = 1
+            else:
+                table[target] = event
+        self.__slot = (self.__slot + 1) % size
+        self.__iteration += 1
+
+    def __process_batch(self, end):
+        """Processes iterations from the current one up to end at once.
+        """
+        start = self.__iteration
+        shift = self.size - 2 * self.half
+        positions = np.arange(start + shift, end + shift) - self.__base
+        triggers = positions[self.__adc[positions] == self.trigger]
+
+        # Events are compared in the same order as in coinc and the last
+        # match of each ADC is used.
+        offsets = [*range(1, self.half), *range(self.half - self.size, 0)]
+        if triggers.size:
+            self.__find_coincidences(triggers, offsets)
+
+        # Rebuild the ring buffer as it would be at the end
+        self.__iteration = end
+        self.__next_read = self.size - self.half + end
+        self.__slot = (self.half + end) % self.size
+        table = []
+        for slot in range(self.size):
+            written = end - 1 - (end - 1 - slot + 2 * self.half) % self.size
+            table.append(self.__get_event(self.size - self.half + written))
+        self.__table = table
+
+    def __find_coincidences(self, triggers, offsets):
+        adc, timestamp = self.__adc, self.__timestamp
+        chosen = np.full((self.adc_count, len(triggers)), -1, dtype=np.int64)
+        for offset in offsets:
+            others = triggers + offset
+            other_adc = adc[others]
+            diff = (timestamp[others] - timestamp[triggers]).view(np.int64)
+            window = np.minimum(other_adc, N_ADCS_MAX - 1)
+            match = np.flatnonzero(
+                (other_adc != self.trigger) &
+                (other_adc < self.adc_count) &
+                (diff >= self.low[window]) &
+                (diff <= self.high[window]))
+            chosen[other_adc[match], match] = others[match]
+
+        found = (chosen >= 0).any(axis=0)
+        if not found.any():
+            return
+        chosen = chosen[:, found]
+        triggers = triggers[found]
+        chosen[self.trigger] = triggers
+        missing = chosen < 0
+        channels = np.where(missing, 0, self.__channel[chosen])
+        if self.timediff:
+            diffs = (timestamp[chosen] - timestamp[triggers]).astype(
+                np.int64).astype(np.int32)
+            diffs[missing] = 0
+            rows = np.empty((2 * self.adc_count, len(triggers)),
+                            dtype=np.int64)
+            rows[0::2] = channels
+            rows[1::2] = diffs
+        else:
+            rows = channels
+        self.__results.append(rows.T)
+        self.__count += len(triggers)
+
+    def __discard(self):
+        """Discards buffered events that are no longer needed.
+        """
+        keep_from = max(self.__iteration - self.size, self.__base)
+        if self.__table is None:
+            keep_from = self.__base
+        i = keep_from - self.__base
+        self.__adc = self.__adc[i:]
+        self.__channel = self.__channel[i:]
+        self.__timestamp = self.__timestamp[i:]
+        self.__base = keep_from
+
+    def __process_slot(self, table, i) -> Optional[List[int]]:
+        """Literal translation of coinc's handling of a single table slot.
+        """
+        adc, _, timestamp = table[i]
+        if adc != self.trigger:
+            return None
+        size = len(table)
+        chosen = [None] * self.adc_count
+        chosen[self.trigger] = i
+        for j in range(1, size):
+            k = (i + j) % size
+            other_adc = table[k][0]
+            diff = _to_signed(table[k][2] - timestamp, 64)
+            if other_adc != self.trigger and other_adc < self.adc_count and \
+                    self.low[other_adc] <= diff <= self.high[other_adc]:
+                chosen[other_adc] = k
+        if sum(c is not None for c in chosen) < 2:
+            return None
+        row = []
+        for k in chosen:
+            if k is None:
+                row.extend((0, 0) if self.timediff else (0,))
+                continue
+            row.append(table[k][1])
+            if self.timediff:
+                row.append(_to_signed(table[k][2] - timestamp, 32))
+        return row
+
+
+def _to_signed(value: int, bits: int) -> int:
+    """Converts an integer into a signed integer of the given size the same
+    way C casts do.
+    """
+    value &= 2 ** bits - 1
+    return value - 2 ** bits if value >= 2 ** (bits - 1) else value
+
+
+def _read_events(file, adc_count: int, chunk_size: int):
+    """Reads events from the file in chunks.
+
+    Reading stops at the first value that is not an integer or at an event
+    whose ADC is not lower than adc_count, just like in coinc.
+
+    Yield:
+        ((adc, channel, timestamp), stale) where stale is None until reading
+        has stopped. Then it contains the values that were read of the event
+        that could not be read as a tuple of (adc, channel, timestamp) where
+        the values that were not read are None.
+    """
+    leftover = b""
+    values = np.empty(0, dtype=np.uint64)
+    while True:
+        data = file.read(chunk_size)
+        at_end = not data
+        data = leftover + data
+        if not at_end:
+            # Last token may continue in the next chunk
+            cut = max(data.rfind(s) for s in b" \t\n\r\v\f") + 1
+            data, leftover = data[:cut], data[cut:]
+        parsed, failed = _parse_values(data)
+        values = np.concatenate((values, parsed))
+
+        count = len(values) // 3
+        events = values[:count * 3].reshape(count, 3).T
+        adc = events[0] & _UINT_MASK
+        bad_adc = np.flatnonzero(adc >= adc_count)
+        if bad_adc.size:
+            count = bad_adc[0]
+        good = (adc[:count], events[1, :count] & _UINT_MASK,
+                events[2, :count])
+
+        if bad_adc.size:
+            yield good, (int(adc[count]), int(events[1, count]) & _UINT_MASK,
+                         int(events[2, count]))
+            return
+        values = values[count * 3:]
+        if failed or at_end:
+            stale = [None, None, None]
+            for i, value in enumerate(values.tolist()):
+                stale[i] = value & _UINT_MASK if i < 2 else value
+            yield good, tuple(stale)
+            return
+        yield good, None
+
+
+def _parse_values(data: bytes) -> Tuple[np.ndarray, bool]:
+    """Parses whitespace separated unsigned integers the way scanf does.
+
+    Return:
+        parsed values and whether parsing stopped at something that was not
+        an integer.
+    """
+    if _is_plain_integers(data):
+        if not data.strip():
+            return np.empty(0, dtype=np.uint64), False
+        return np.fromstring(data, dtype=np.uint64, sep=" "), False
+
+    # Slow path for signs, overflows and invalid values
+    values = []
+    for token in data.split():
+        while token:
+            match = _INTEGER_PREFIX.match(token)
+            if match is None:
+                return np.array(values, dtype=np.uint64), True
+            value = int(match.group())
+            if abs(value) > _ULONG_MAX:
+                value = _ULONG_MAX
+            elif value < 0:
+                value += _ULONG_MAX + 1
+            values.append(value)
+            token = token[match.end():]
+    return np.array(values, dtype=np.uint64), False
+
+
+def _is_plain_integers(data: bytes) -> bool:
+    """Checks that data only contains unsigned integers that fit into 64
+    bits and whitespace.
+    """
+    classes = _BYTE_CLASSES[np.frombuffer(data, dtype=np.uint8)]
+    if (classes == _OTHER).any():
+        return False
+    spaces = np.flatnonzero(classes)
+    bounds = np.concatenate(([-1], spaces, [len(classes)]))
+    return bool(np.diff(bounds).max() - 1 <= _MAX_DIGITS)
@@ -30,16 +30,33 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen " \
 __version__ = "2.0"
 
 import itertools
+import json
+import tempfile
+import warnings
 
+import numpy as np
+
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
-from typing import Any
+from typing import Tuple
 
 from .element import Element
+from .event_store import EVENT_DTYPE
 from . import file_paths as fp
 
+# Binary cut files start with this so that they can be told apart from text
+# cut files. Both use the same .cut file names.
+BINARY_MAGIC = b"POTKUCUT"
+_BINARY_VERSION = 1
+
+# Number of lines in the header of a text cut file
+_HEADER_LINES = 10
+
 
 class CutFile:
     """
@@ -47,7 +64,7 @@ class CutFile:
     """
     def __init__(self, directory: Optional[Path] = None, elem_loss=False,
                  weight_factor=1.0, split_number=0, split_count=1,
-                 cut_file_path: Optional[Path] = None):
+                 cut_file_path: Optional[Path] = None, binary=False):
         """Inits CutFile object.
         
         Args:
@@ -59,6 +76,8 @@ class CutFile:
                 overwrite splits.
             split_count: Integer. Required for Elemental Losses, total count of 
                 splits.
+            cut_file_path: path to a cut file to load.
+            binary: whether the cut file is saved in the binary format.
         """
         self.directory = directory
         self.element = None  # If RBS, this holds beam ion
@@ -71,20 +90,21 @@ class CutFile:
         self.weight_factor = weight_factor
         self.energy = None
         self.detector_angle = None
-        self.data = []
+        self.data = np.empty((0, 3), dtype=EVENT_DTYPE)
         self.element_number = None
+        self.binary = binary
 
         if cut_file_path is not None:
             self.load_file(cut_file_path)
     
-    def set_info(self, selection, data: List[Any]):
+    def set_info(self, selection, data: np.ndarray):
         """Set selection information and data into CutFile.
         
         Args:
             selection: Selection class object.
-            data: Lists of data points.
+            data: 2D array of data points, one row per event.
         """
-        self.data = data
+        self.data = np.asarray(data, dtype=EVENT_DTYPE)
         self.element = selection.element
         self.element_scatter = selection.element_scatter
         self.count = len(data)
@@ -116,33 +136,27 @@ class CutFile:
 
         self.element = Element.from_string(element_information)
 
-        # print("Load cut: {0} {1}".format(self.element, self.isotope))
-        with file.open("r") as cut_file:
-            for i, line in enumerate(cut_file):
-                if i < 10:  # Probably not the best way.
-                    line_split = line.strip().split(':')
-                    if len(line_split) > 1: 
-                        key = line_split[0].strip()
-                        value = line_split[1].strip()
-                        if key == "Count":
-                            self.count = int(value)
-                        elif key == "Type":
-                            self.type = value
-                        elif key == "Weight Factor":
-                            self.weight_factor = float(value)
-                        elif key == "Energy":
-                            self.energy = float(value)
-                        elif key == "Detector Angle":
-                            self.detector_angle = int(value)
-                        elif key == "Scatter Element":
-                            self.element_scatter = Element(value)
-                        elif key == "Element losses":
-                            self.is_elem_loss = value == "True"
-                        elif key == "Split count":
-                            self.split_count = int(value)
-                else:
-                    self.data.append([int(i) for i in line.split()])
-    
+        self.binary = is_binary(file)
+        header, self.data = read_file(file)
+
+        for key, value in header.items():
+            if key == "Count":
+                self.count = int(value)
+            elif key == "Type":
+                self.type = value
+            elif key == "Weight Factor":
+                self.weight_factor = float(value)
+            elif key == "Energy":
+                self.energy = float(value)
+            elif key == "Detector Angle":
+                self.detector_angle = int(value)
+            elif key == "Scatter Element":
+                self.element_scatter = Element(value)
+            elif key == "Element losses":
+                self.is_elem_loss = value == "True"
+            elif key == "Split count":
+                self.split_count = int(value)
+
     def save(self, element_count=0):
         """Save cut file_path.
         
@@ -155,14 +169,14 @@ class CutFile:
             2H selection.
         """
         element = self.element
-        if element and self.directory and self.data:
+        if element and self.directory and len(self.data):
             measurement_name_with_prefix = self.directory.parents[1]
             # First "-" is in sample name, second in measurement name
             # NOT IF THERE ARE - IN NAME PART!!
             name_with_number = measurement_name_with_prefix.name.split(
                 "Measurement_")[1]
             measurement_name = name_with_number.split('-', 1)[1]
-            if element is not "":
+            if element != "":
                 element = str(element)
             if self.type == "RBS":
                 suffix = f"RBS_{self.element_scatter}"
@@ -180,25 +194,30 @@ class CutFile:
             else:
                 file = self._find_available_cut_file_name(
                     measurement_name, element, suffix, element_count)
-            if self.element_scatter is not "":
-                element_scatter = str(self.element_scatter)
+            if self.binary:
+                _write_binary(file, self.get_header(), self.data)
             else:
-                element_scatter = ""
-            with file.open("w") as my_file:
-                my_file.write(f"Count: {self.count}\n")
-                my_file.write(f"Type: {self.type}\n")
-                my_file.write(f"Weight Factor: {self.weight_factor}\n")
-                my_file.write("Energy: 0\n")
-                my_file.write("Detector Angle: 0\n")
-                my_file.write(f"Scatter Element: {element_scatter}\n")
-                my_file.write(f"Element losses: {self.is_elem_loss}\n")
-                my_file.write(f"Split count: {self.split_count}\n")
-                my_file.write("\n")
-                my_file.write("ToF, Energy, Event number\n")
-                for p in self.data:  # Write all points
-                    my_file.write(" ".join(map(str, p)))
-                    my_file.write("\n")
-         
+                _write_text(file, self.get_header(), self.data)
+
+    def get_header(self) -> Dict[str, str]:
+        """Returns the meta information that is saved into the header of the
+        cut file.
+        """
+        if self.element_scatter != "":
+            element_scatter = str(self.element_scatter)
+        else:
+            element_scatter = ""
+        return {
+            "Count": str(self.count),
+            "Type": str(self.type),
+            "Weight Factor": str(self.weight_factor),
+            "Energy": "0",
+            "Detector Angle": "0",
+            "Scatter Element": element_scatter,
+            "Element losses": str(self.is_elem_loss),
+            "Split count": str(self.split_count),
+        }
+
     def split(self, reference_cut, splits=10, save=True):
         """Splits cut file into X splits based on reference cut.
         
@@ -208,25 +227,33 @@ class CutFile:
             save: Boolean deciding whether or not to save splits.
             
         Return:
-            Returns a list containing lists of the cut's splits' values.
+            Returns a list containing arrays of the cut's splits' values.
         """
-        # Cast to int to cut decimals.
-        split_size = int(len(reference_cut.data) / splits)  
-        self_size = len(self.data)
-        row_index, split = 0, 0
-        cut_splits = [[] for _ in range(splits)]
-        while split < splits and row_index < self_size:
-            # Get last event number in first split
-            max_event = reference_cut.data[((split + 1) * split_size) - 1][-1]  
-            while row_index < self_size and \
-                    self.data[row_index][-1] <= max_event:
-                cut_splits[split].append(self.data[row_index])
-                row_index += 1
-            split += 1
+        ends = self.get_split_ends(reference_cut, splits)
+        starts = np.concatenate(([0], ends[:-1]))
+        cut_splits = [self.data[start:end] for start, end in zip(starts, ends)]
         if save:
             self.__save_splits(splits, cut_splits)
         return cut_splits
 
+    def get_split_ends(self, reference_cut, splits=10) -> np.ndarray:
+        """Returns the index of the first row after each split.
+
+        Reference cut is divided into splits of equal size and each split
+        of this cut ends after the last event number of the corresponding
+        split of the reference cut. Events after the last split are left
+        out.
+
+        Args:
+            reference_cut: Cut file (of heavy element) which is used split.
+            splits: Integer determining how many splits is cut splitted to.
+
+        Return:
+            array of row indices, one for each split
+        """
+        return get_split_ends(
+            self.data[:, -1], reference_cut.data[:, -1], splits)
+
     def _find_available_cut_file_name(self, measurement_name, element, suffix,
                                       elem_count: int) -> Path:
         """Helper function for finding available file name.
@@ -250,7 +277,7 @@ class CutFile:
             new_cut = CutFile(elem_loss=True,
                               split_number=split_number,
                               split_count=splits)
-            new_cut.copy_info(self, split, splits)
+            new_cut.copy_info(self, self.directory, split, splits)
             new_cut.save(self.element_number)
             split_number += 1
 
@@ -260,11 +287,11 @@ class CutFile:
         Args:
             cut_file: CutFile class object.
             new_dir: New directory for cut file.
-            data: List of data points.
+            data: 2D array of data points.
             additional_weight_factor: Float
         """
         self.directory = new_dir
-        self.data = data
+        self.data = np.asarray(data, dtype=EVENT_DTYPE)
         self.element = cut_file.element
         self.count = len(data)
         self.type = cut_file.type
@@ -272,6 +299,67 @@ class CutFile:
         self.energy = cut_file.energy
         self.detector_angle = cut_file.detector_angle
         self.element_scatter = cut_file.element_scatter
+        self.binary = cut_file.binary
+
+
+def get_split_ends(events: np.ndarray, reference_events: np.ndarray,
+                   splits: int, events_sorted: Optional[bool] = None) -> \
+        np.ndarray:
+    """Returns the index of the first event after each split when events are
+    split by the event numbers of a reference cut.
+
+    Reference events are divided into splits of equal size and splits are
+    filled in order with events up to the last event number of the
+    corresponding reference split.
+
+    Args:
+        events: event numbers of the split cut
+        reference_events: event numbers of the reference cut
+        splits: number of splits
+        events_sorted: whether events are in ascending order. Checked if None.
+
+    Return:
+        array of event indices, one for each split
+    """
+    if not len(events):
+        return np.zeros(splits, dtype=np.intp)
+    # Cast to int to cut decimals.
+    split_size = int(len(reference_events) / splits)
+    max_events = reference_events[np.arange(1, splits + 1) * split_size - 1]
+
+    if events_sorted is None:
+        events_sorted = bool(np.all(events[:-1] <= events[1:]))
+    if events_sorted:
+        # Number of events up to each maximum event number. A split never
+        # ends before the previous one.
+        return np.maximum.accumulate(
+            np.searchsorted(events, max_events, side="right"))
+    # Unsorted event numbers end the split at the first bigger event number
+    ends = np.empty(splits, dtype=np.intp)
+    end = 0
+    for i, max_event in enumerate(max_events):
+        bigger = np.flatnonzero(events[end:] > max_event)
+        end = end + bigger[0] if bigger.size else len(events)
+        ends[i] = end
+    return ends
+
+
+def _read_data(file) -> np.ndarray:
+    """Reads the data rows of a cut file into a 2D array.
+
+    Args:
+        file: file object whose header lines have already been read
+
+    Return:
+        array with one row per event
+    """
+    with warnings.catch_warnings():
+        # Cut file without any events is not worth a warning
+        warnings.simplefilter("ignore", UserWarning)
+        data = np.loadtxt(file, dtype=EVENT_DTYPE, ndmin=2, comments=None)
+    if data.size == 0:
+        return np.empty((0, 3), dtype=EVENT_DTYPE)
+    return data
 
 
 def is_rbs(file: Path) -> bool:
@@ -283,16 +371,7 @@ def is_rbs(file: Path) -> bool:
     Return:
         Returns True if cut file is RBS and False if not.
     """
-    with file.open("r") as cut_file:
-        for i, line in enumerate(cut_file):
-            if i >= 10:
-                return False
-            line_split = line.strip().split(':')
-            if len(line_split) > 1: 
-                key = line_split[0].strip()
-                value = line_split[1].strip()
-                if key == "Type":
-                    return value == "RBS"
+    return read_header(file).get("Type") == "RBS"
 
 
 def get_scatter_element(file: Path) -> Optional[Element]:
@@ -305,16 +384,161 @@ def get_scatter_element(file: Path) -> Optional[Element]:
         Returns an Element class object of scatter element. Returns an empty 
         Element class object if there is no scatter element (in case of ERD).
     """
+    value = read_header(file).get("Scatter Element")
+    if value is None:
+        return None
+    return Element.from_string(value)
+
+
+def is_binary(file: Path) -> bool:
+    """Checks if the cut file is in the binary format.
+    """
+    with file.open("rb") as cut_file:
+        return cut_file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def read_header(file: Path) -> Dict[str, str]:
+    """Reads the header of a text or binary cut file.
+
+    Args:
+        file: path to a cut file
+
+    Return:
+        dictionary of header keys and values as strings
+    """
+    if is_binary(file):
+        with file.open("rb") as cut_file:
+            return _read_binary_header(cut_file)
     with file.open("r") as cut_file:
-        for i, line in enumerate(cut_file):
-            if i >= 10:
-                return None
-            line_split = line.strip().split(':')
-            if len(line_split) > 1: 
-                key = line_split[0].strip()
-                value = line_split[1].strip()
-                if key == "Scatter Element":
-                    return Element.from_string(value)
+        return _read_text_header(cut_file)
+
+
+def read_file(file: Path) -> Tuple[Dict[str, str], np.ndarray]:
+    """Reads the header and the events of a text or binary cut file.
+
+    Args:
+        file: path to a cut file
+
+    Return:
+        dictionary of header keys and values as strings and an array with
+        one row per event
+    """
+    if is_binary(file):
+        with file.open("rb") as cut_file:
+            header = _read_binary_header(cut_file)
+            return header, _read_binary_data(cut_file)
+    with file.open("r") as cut_file:
+        header = _read_text_header(cut_file)
+        return header, _read_data(cut_file)
+
+
+def export_legacy(file: Path, output_file: Path):
+    """Writes a cut file into the text format that external programs can
+    read.
+
+    Args:
+        file: path to a text or binary cut file
+        output_file: path to the text file to write
+    """
+    with file.open("rb") as cut_file:
+        if cut_file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{file} is not a binary cut file.")
+        header = _read_binary_header(cut_file)
+        data = _read_binary_data(cut_file)
+    _write_text(output_file, header, data)
+
+
+@contextmanager
+def legacy_cut_files(files: Iterable[Path]) -> Iterator[List[Path]]:
+    """Context manager that provides the given cut files in the text format.
+
+    Text cut files are provided as is. Binary cut files are exported into a
+    temporary directory with the same file name and the exported files are
+    removed when the context exits.
+
+    Args:
+        files: paths to text or binary cut files
+
+    Yield:
+        paths to text cut files in the same order as the given files
+    """
+    files = list(files)
+    binary_files = [f for f in files if is_binary(f)]
+    if not binary_files:
+        yield files
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_files = []
+        for i, file in enumerate(files):
+            if file in binary_files:
+                # Files from different directories may have the same name
+                output_file = Path(tmp_dir, str(i), file.name)
+                output_file.parent.mkdir()
+                export_legacy(file, output_file)
+                legacy_files.append(output_file)
+            else:
+                legacy_files.append(file)
+        yield legacy_files
+
+
+def _read_text_header(file) -> Dict[str, str]:
+    """Reads the header lines of a text cut file.
+
+    Args:
+        file: file object opened in text mode at the start of the file
+    """
+    header = {}
+    for line in itertools.islice(file, _HEADER_LINES):
+        line_split = line.strip().split(':')
+        if len(line_split) > 1:
+            header[line_split[0].strip()] = line_split[1].strip()
+    return header
+
+
+def _read_binary_header(file) -> Dict[str, str]:
+    """Reads the header of a binary cut file.
+
+    Args:
+        file: file object opened in binary mode right after the magic bytes
+    """
+    file.seek(len(BINARY_MAGIC))
+    info = json.loads(file.readline())
+    if info.get("version") != _BINARY_VERSION:
+        raise ValueError(
+            f"Unsupported binary cut file version: {info.get('version')}.")
+    return info["header"]
+
+
+def _read_binary_data(file) -> np.ndarray:
+    """Reads the data rows of a binary cut file whose header has already been
+    read.
+    """
+    return np.lib.format.read_array(file, allow_pickle=False)
+
+
+def _write_text(file: Path, header: Dict[str, str], data: np.ndarray):
+    """Writes a cut file in the text format.
+    """
+    with file.open("w") as cut_file:
+        for key, value in header.items():
+            cut_file.write(f"{key}: {value}\n")
+        cut_file.write("\n")
+        cut_file.write("ToF, Energy, Event number\n")
+        np.savetxt(cut_file, data, fmt="%d", delimiter=" ")
+
+
+def _write_binary(file: Path, header: Dict[str, str], data: np.ndarray):
+    """Writes a cut file in the binary format. The format consists of the
+    magic bytes, a single line of JSON containing the header and the data in
+    the .npy format.
+    """
+    info = {"version": _BINARY_VERSION, "header": header}
+    with file.open("wb") as cut_file:
+        cut_file.write(BINARY_MAGIC)
+        cut_file.write(json.dumps(info).encode("utf-8") + b"\n")
+        np.lib.format.write_array(
+            cut_file, np.ascontiguousarray(data, dtype=EVENT_DTYPE),
+            allow_pickle=False)
 
 
 def get_rbs_selections(cut_files: List[Path]) -> Dict[str, Element]:
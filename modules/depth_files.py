@@ -26,6 +26,7 @@ along with this program (file named 'LICENCE').
 
 depth_files.py contains classes to deal with depth files:
     DepthFileGenerator runs c-components to generate the files
+    DepthFileCache stores generated files so that they can be reused
     DepthProfile reads and calculates statistics from the files
     DepthProfileHandler manages multiple DepthProfiles
 """
@@ -38,20 +39,29 @@ __version__ = "2.0"
 import math
 import os
 import platform
+import shutil
 import subprocess
 import logging
 import functools
+import hashlib
+import tempfile
+import threading
+
+import numpy as np
 
 from pathlib import Path
 from typing import Optional
+from typing import Dict
 from typing import List
 
-from . import math_functions as mf
 from . import comparison as comp
 from . import general_functions as gf
+from . import cut_file as cf
 from .element import Element
 from .parsing import CSVParser
 from .measurement import Measurement
+from .energy_spectrum import ToFListCache
+from .global_settings import GlobalSettings
 from .observing import ProgressReporter
 from .enums import DepthProfileUnit
 
@@ -79,9 +89,15 @@ class DepthFileGenerator:
         else:
             self._tof_in_file = tof_in_file
 
-    def get_command(self):
+    def get_command(self, cut_files: Optional[List[Path]] = None):
         """Returns the command(s) used to run both tof_list and erd_depth.
+
+        Args:
+            cut_files: cut files given to tof_list. Defaults to the cut files
+                of this DepthFiles.
         """
+        if cut_files is None:
+            cut_files = self._cut_files
         if platform.system() == "Windows":
             tof_bin = str(gf.get_bin_dir() / "tof_list.exe")
             erd_bin = str(gf.get_bin_dir() / "erd_depth.exe")
@@ -90,29 +106,175 @@ class DepthFileGenerator:
             erd_bin = "./erd_depth"
 
         return (tof_bin, str(self._tof_in_file),
-                *(str(f) for f in self._cut_files)), \
+                *(str(f) for f in cut_files)), \
                (erd_bin, str(self._output_path), str(self._tof_in_file))
 
-    def run(self):
+    def run(self) -> int:
         """Generate the files necessary for drawing the depth profile.
+
+        Return:
+            return code of the pipeline
         """
         bin_dir = gf.get_bin_dir()
-        tof, erd = self.get_command()
-        # Pipe the output from tof_list to erd_depth
-        tof_process = subprocess.Popen(tof, cwd=bin_dir, stdout=subprocess.PIPE)
-        ret = subprocess.run(
-            erd, cwd=bin_dir, stdin=tof_process.stdout).returncode
+        # tof_list can only read text cut files
+        with cf.legacy_cut_files(self._cut_files) as cut_files:
+            tof, erd = self.get_command(cut_files)
+            # Pipe the output from tof_list to erd_depth
+            tof_process = subprocess.Popen(
+                tof, cwd=bin_dir, stdout=subprocess.PIPE)
+            ret = subprocess.run(
+                erd, cwd=bin_dir, stdin=tof_process.stdout).returncode
         if ret != 0:
             print(f"tof_list|erd_depth pipeline returned an error code: {ret}")
+        return ret
+
+
+class DepthFileCache:
+    """Cache of the depth files that tof_list and erd_depth generate.
+
+    Entries are keyed by the contents of the cut files, the tof.in file and
+    the efficiency files it refers to and the elements of the cut files.
+    Each entry is a directory that holds copies of the depth files. Least
+    recently used entries are removed when the entries take more space than
+    allowed.
+    """
+    __slots__ = "directory", "max_size", "__lock"
+
+    def __init__(self, directory: Path, max_size: int):
+        """Initializes a new DepthFileCache.
+
+        Args:
+            directory: directory where the entries are stored
+            max_size: maximum total size of the entries in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: GlobalSettings) -> \
+            Optional["DepthFileCache"]:
+        """Returns a cache that uses the location and the size given in
+        settings or None if the cache is disabled.
+        """
+        max_size = settings.get_depth_cache_size() * 2 ** 20
+        if max_size <= 0:
+            return None
+        return cls(settings.get_depth_cache_directory(), max_size)
+
+    @staticmethod
+    def get_key(cut_files: List[Path], tof_in: Path) -> str:
+        """Returns the cache key for generating depth files from the given
+        cut files.
+        """
+        elements = sorted({
+            str(Element.from_string(cut_file.name.split(".")[1]))
+            for cut_file in cut_files
+        })
+        sha = hashlib.sha256()
+        sha.update(" ".join(elements).encode("utf-8"))
+        for cut_file in cut_files:
+            sha.update(ToFListCache.get_key(
+                cut_file, tof_in, no_foil=False).encode("utf-8"))
+        return sha.hexdigest()
+
+    def get(self, key: str, output_dir: Path) -> bool:
+        """Copies the cached depth files into output directory.
+
+        Args:
+            key: cache key
+            output_dir: directory where the depth files are copied to
+
+        Return:
+            True if the depth files were found in the cache, False otherwise
+        """
+        entry = Path(self.directory, key)
+        with self.__lock:
+            try:
+                for file in entry.iterdir():
+                    shutil.copyfile(file, output_dir / file.name)
+                # Modification time of the entry tells when it was used
+                os.utime(entry)
+            except OSError:
+                return False
+        return True
+
+    def put(self, key: str, output_dir: Path):
+        """Adds the depth files in the output directory to the cache.
+
+        Args:
+            key: cache key
+            output_dir: directory where the depth files were generated
+        """
+        files = [
+            file for file in output_dir.iterdir()
+            if _is_depth_file(file.name) and file.is_file()
+        ]
+        if not files:
+            return
+        entry = Path(self.directory, key)
+        with self.__lock:
+            if entry.exists():
+                return
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Entry is completed in a temporary directory so that
+                # incomplete entries are never read
+                with tempfile.TemporaryDirectory(dir=self.directory) as tmp:
+                    tmp_dir = Path(tmp, key)
+                    tmp_dir.mkdir()
+                    for file in files:
+                        shutil.copyfile(file, tmp_dir / file.name)
+                    os.replace(tmp_dir, entry)
+            except OSError as e:
+                logging.getLogger("request").warning(
+                    f"Could not write depth file cache: {e}")
+                return
+            self.__evict(key)
+
+    def clear(self):
+        """Removes all entries from the cache.
+        """
+        with self.__lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __evict(self, key: str):
+        """Removes the least recently used entries, except the given one,
+        until the entries fit in the maximum size.
+        """
+        entries = []
+        total_size = 0
+        for entry in self.directory.iterdir():
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime_ns, size, entry))
+            except OSError:
+                continue
+            total_size += size
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if entry.name != key:
+                shutil.rmtree(entry, ignore_errors=True)
+                total_size -= size
+
+
+def _is_depth_file(file_name: str) -> bool:
+    """Returns True if the file name is the name of a depth file.
+    """
+    return Path(file_name).stem == DepthFileGenerator.DEPTH_PREFIX
 
 
 def generate_depth_files(cut_files: List[Path], output_dir: Path,
                          measurement: Measurement, tof_in_dir: Optional[Path]
-                         = None, progress: Optional[ProgressReporter] = None):
+                         = None, progress: Optional[ProgressReporter] = None,
+                         cache: Optional[DepthFileCache] = None):
     """Generates depth files from given cut files and writes them to output
     directory.
 
-    Deletes any previous depth files in the given directory
+    Deletes any previous depth files in the given directory. Depth files
+    that have already been generated from the same cut files and settings
+    are copied from the cache instead of running tof_list and erd_depth.
 
     Args:
         cut_files: list of file paths to .cut files
@@ -120,6 +282,8 @@ def generate_depth_files(cut_files: List[Path], output_dir: Path,
         measurement: Measurement object to generate tof.in
         tof_in_dir: directory in which the tof.in is to be generated.
         progress: a ProgressReporter object
+        cache: cache of depth files. Defaults to the cache given in the
+            global settings of the measurement's request.
     """
     # TODO this could be a method of Measurement
     tof_in_file = measurement.generate_tof_in(directory=tof_in_dir)
@@ -128,22 +292,110 @@ def generate_depth_files(cut_files: List[Path], output_dir: Path,
 
     # Delete previous depth files to avoid mixup when assigning the
     # result files back to their cut files
-    gf.remove_matching_files(
-        output_dir,
-        filter_func=lambda fn: Path(fn).stem == DepthFileGenerator.DEPTH_PREFIX)
+    gf.remove_matching_files(output_dir, filter_func=_is_depth_file)
+
+    if cache is None:
+        cache = DepthFileCache.from_settings(
+            measurement.request.global_settings)
+    key = None
+    if cache is not None:
+        try:
+            key = DepthFileCache.get_key(cut_files, tof_in_file)
+        except OSError:
+            pass
+        else:
+            if cache.get(key, output_dir):
+                if progress is not None:
+                    progress.report(100)
+                return
 
     if progress is not None:
         progress.report(30)
 
     dp = DepthFileGenerator(cut_files, output_dir, tof_in_file=tof_in_file)
-    dp.run()
+    if dp.run() == 0 and key is not None:
+        cache.put(key, output_dir)
 
     if progress is not None:
         progress.report(100)
 
 
+def _to_array(values, dtype) -> np.ndarray:
+    """Returns the values as a read-only array of given type. Read-only
+    arrays of the same type are returned as is so that profiles can share
+    them.
+    """
+    if isinstance(values, np.ndarray) and values.dtype == dtype and \
+            not values.flags.writeable and values.ndim == 1:
+        return values
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+def _get_range(depths: np.ndarray, a=-math.inf, b=math.inf) -> slice:
+    """Returns the slice of depths that are between a and b, and the first
+    depth after b, just like math_functions.get_elements_in_range.
+
+    Depths are assumed to be in ascending order.
+    """
+    if a > b:
+        return slice(0, 0)
+    start = int(np.searchsorted(depths, a, side="left"))
+    stop = int(np.searchsorted(depths, b, side="right")) + 1
+    return slice(start, stop)
+
+
+def _sum_running_avgs(values: np.ndarray) -> np.ndarray:
+    """Sums 2-step running averages along the last axis. The value before
+    the first one is taken to be 0.
+    """
+    return (values.sum(axis=-1) + values[..., :-1].sum(axis=-1)) / 2
+
+
+def _integrate(depths: np.ndarray, values: np.ndarray, a=-math.inf,
+               b=math.inf) -> np.ndarray:
+    """Integrates values along the last axis over depths that are between a
+    and b, assuming constant step between depths.
+    """
+    if len(depths) == 0:
+        return values.sum(axis=-1) * 0.0
+    if len(depths) == 1:
+        raise ValueError("Need at least two x values to calculate step size")
+    step_size = depths[1] - depths[0]
+    return values[..., _get_range(depths, a, b)].sum(axis=-1) * step_size
+
+
+def _get_relative(concentrations: np.ndarray,
+                  total: np.ndarray) -> np.ndarray:
+    """Returns concentrations as percentages of the total concentrations.
+    Concentration is 0 where total is 0.
+    """
+    relative = np.zeros(np.broadcast(concentrations, total).shape)
+    np.divide(concentrations, total, out=relative, where=total != 0)
+    return relative * 100
+
+
+def _get_margins_of_error(systematic_error, event_counts,
+                          sums_of_running_avgs) -> np.ndarray:
+    """Returns the margins of error for the given event counts and sums of
+    running averages.
+    """
+    event_counts = np.asarray(event_counts)
+    sra = np.asarray(sums_of_running_avgs, dtype=float)
+    stat_err = np.zeros(sra.shape)
+    np.divide(sra, np.sqrt(event_counts), out=stat_err,
+              where=event_counts > 0)
+    syst_err = (systematic_error / 100) * sra
+    return np.sqrt(stat_err * stat_err + syst_err * syst_err)
+
+
 class DepthProfile:
-    """Class used in depth profile analysis and graph plotting."""
+    """Class used in depth profile analysis and graph plotting.
+
+    Depths and concentrations are stored in read-only float arrays and event
+    counts in a read-only integer array.
+    """
     def __init__(self, depths, concentrations, events=None, element=None):
         """Inits a new DepthProfile object.
 
@@ -183,11 +435,11 @@ class DepthProfile:
                 raise ValueError("DepthProfile must have same number of depths "
                                  "and concentrations")
 
-        self.depths = tuple(depths)
-        self.concentrations = tuple(concentrations)
+        self.depths = _to_array(depths, np.float64)
+        self.concentrations = _to_array(concentrations, np.float64)
 
         if events is not None:
-            events = tuple(events)
+            events = _to_array(events, np.int64)
         self.events = events
         self.element = element
 
@@ -199,12 +451,13 @@ class DepthProfile:
             concentration and event count at that depth.
         """
         if self.element is None:
-            for d, c in zip(self.depths, self.concentrations):
+            for d, c in zip(self.depths.tolist(),
+                            self.concentrations.tolist()):
                 # For total type profiles, event count is always 0
                 yield d, c, 0
         else:
-            for d, c, e in zip(self.depths, self.concentrations, self.events):
-                yield d, c, e
+            yield from zip(self.depths.tolist(), self.concentrations.tolist(),
+                           self.events.tolist())
 
     def __add__(self, other):
         """Adds concentrations of another depth profile to self concentrations
@@ -222,10 +475,8 @@ class DepthProfile:
         if len(self) != len(other):
             raise ValueError("DepthProfile lengths must match when adding")
 
-        conc = tuple(c1 + c2 for (_, c1, _), (_, c2, _)
-                     in zip(self, other))
-
-        return DepthProfile(self.depths, conc)
+        return DepthProfile(
+            self.depths, self.concentrations + other.concentrations)
 
     def __sub__(self, other):
         """Subtracts concentrations of other DepthProfile from
@@ -243,10 +494,8 @@ class DepthProfile:
         if len(self) != len(other):
             raise ValueError("DepthProfile lengths must match when subtracting")
 
-        conc = tuple(c1 - c2 for (_, c1, _), (_, c2, _)
-                     in zip(self, other))
-
-        return DepthProfile(self.depths, conc)
+        return DepthProfile(
+            self.depths, self.concentrations - other.concentrations)
 
     def __len__(self):
         """Lengths of the DepthProfile is the length of its
@@ -309,7 +558,7 @@ class DepthProfile:
         """
         if len(self.depths) == 0:
             return None, None
-        return self.depths[0], self.depths[-1]
+        return float(self.depths[0]), float(self.depths[-1])
 
     def integrate_concentrations(self, depth_a=-math.inf, depth_b=math.inf):
         """Returns sum of concentrations between depths a and b.
@@ -322,8 +571,8 @@ class DepthProfile:
             concentration per cm^2 as a float.
         """
         # Multiply by 0.01 to get concentration per cm^2
-        return mf.integrate_bins(
-            self.depths, self.concentrations, a=depth_a, b=depth_b) * 0.01
+        return float(_integrate(
+            self.depths, self.concentrations, depth_a, depth_b) * 0.01)
 
     def sum_running_avgs(self, depth_a=-math.inf, depth_b=math.inf):
         """Returns the sum of running concentration averages between
@@ -336,8 +585,8 @@ class DepthProfile:
         Return:
             sum of running concentration averages as a float.
         """
-        return mf.sum_running_avgs(
-            self.depths, self.concentrations, a=depth_a, b=depth_b)
+        return float(_sum_running_avgs(
+            self.concentrations[_get_range(self.depths, depth_a, depth_b)]))
 
     def sum_events(self, depth_a=-math.inf, depth_b=math.inf):
         """Returns the sum of events between depths a and b.
@@ -349,8 +598,8 @@ class DepthProfile:
         Return:
             sum of events as int.
         """
-        return int(mf.sum_y_values(
-            self.depths, self.events, a=depth_a, b=depth_b))
+        return int(
+            self.events[_get_range(self.depths, depth_a, depth_b)].sum())
 
     def get_relative_concentrations(self, other):
         """Calculates the concentrations relative to another DepthProfile
@@ -368,8 +617,7 @@ class DepthProfile:
             raise ValueError("DepthProfile lengths must match when "
                              "calculating relative concentrations")
 
-        conc = tuple(c1 / c2 * 100 if c2 != 0 else 0.0
-                     for (_, c1, _), (_, c2, _) in zip(self, other))
+        conc = _get_relative(self.concentrations, other.concentrations)
 
         return DepthProfile(
             self.depths, conc, events=self.events, element=self.element)
@@ -397,9 +645,8 @@ class DepthProfile:
         if len(self) != len(other):
             raise ValueError("DepthProfile lengths must match when merging")
 
-        conc = tuple(c2 if depth_a <= d <= depth_b else c1
-                     for (d, c1, _), (_, c2, _)
-                     in zip(self, other))
+        in_range = (depth_a <= self.depths) & (self.depths <= depth_b)
+        conc = np.where(in_range, other.concentrations, self.concentrations)
 
         if self.element and self.element == other.element:
             events = self.events
@@ -432,13 +679,8 @@ class DepthProfile:
         else:
             sra = sum_of_running_avgs
 
-        if event_count > 0:
-            stat_err = (1 / math.sqrt(event_count)) * sra
-        else:
-            stat_err = 0.0
-
-        syst_err = (systematic_error / 100) * sra
-        return math.sqrt(stat_err * stat_err + syst_err * syst_err)
+        return float(
+            _get_margins_of_error(systematic_error, event_count, sra))
 
 
 def validate_depth_file_names(file_names):
@@ -505,6 +747,121 @@ def get_depth_files(elements, dir_depth):
     return depth_files
 
 
+class _ProfileStack:
+    """Element profiles that have the same depths as the total profile,
+    stacked into 2D arrays so that calculations are done for all of them
+    at once.
+    """
+    __slots__ = "profiles", "total", "concentrations", "relative", "events"
+
+    def __init__(self, profiles: Dict[str, DepthProfile]):
+        """Inits a new _ProfileStack.
+
+        Args:
+            profiles: absolute profiles that include the total profile. Use
+                is_stackable to check that the profiles can be stacked.
+        """
+        self.total = profiles["total"]
+        self.profiles = {
+            name: profile for name, profile in profiles.items()
+            if name != "total"
+        }
+        shape = len(self.profiles), len(self.total)
+        self.concentrations = np.array([
+            p.concentrations for p in self.profiles.values()
+        ]).reshape(shape)
+        self.events = np.array([
+            p.events for p in self.profiles.values()
+        ], dtype=np.int64).reshape(shape)
+        self.relative = _get_relative(
+            self.concentrations, self.total.concentrations)
+
+    @staticmethod
+    def is_stackable(profiles: Dict[str, DepthProfile]) -> bool:
+        """Checks that there is a total profile and that all element profiles
+        have its depths.
+        """
+        total = profiles.get("total")
+        if total is None:
+            return False
+        return all(
+            p.events is not None and np.array_equal(p.depths, total.depths)
+            for name, p in profiles.items() if name != "total"
+        )
+
+    def get_relative_profiles(self) -> Dict[str, DepthProfile]:
+        """Returns the element profiles relative to the total profile.
+        """
+        return self.__to_profiles(self.relative)
+
+    def merge(self, depth_a, depth_b, method) -> Dict[str, DepthProfile]:
+        """Merges absolute and relative profiles. See
+        DepthProfileHandler.merge_profiles.
+        """
+        depths = self.total.depths
+        in_range = (depth_a <= depths) & (depths <= depth_b)
+        if method == "abs_rel_abs":
+            return self.__to_profiles(
+                np.where(in_range, self.relative, self.concentrations))
+        if method == "rel_abs_rel":
+            return self.__to_profiles(
+                np.where(in_range, self.concentrations, self.relative))
+        raise ValueError("Unknown merge method")
+
+    def calculate_ratios(self, ignored, depth_a, depth_b, systematic_error):
+        """Calculates the ratios and margins of error. See
+        DepthProfileHandler.calculate_ratios.
+        """
+        in_range = _get_range(self.total.depths, depth_a, depth_b)
+        sums = _sum_running_avgs(self.concentrations[:, in_range])
+        is_ignored = np.array(
+            [name in ignored for name in self.profiles], dtype=bool)
+
+        total_sum = float(
+            _sum_running_avgs(self.total.concentrations[in_range]))
+        total_sum -= float(sums[is_ignored].sum())
+
+        if total_sum == 0:
+            ratios = np.zeros(len(self.profiles))
+        else:
+            ratios = sums / total_sum * 100
+        moes = _get_margins_of_error(
+            systematic_error, self.events[:, in_range].sum(axis=-1), ratios)
+
+        percentages = {}
+        margins = {}
+        for i, name in enumerate(self.profiles):
+            if is_ignored[i]:
+                percentages[name] = None
+                margins[name] = None
+            else:
+                percentages[name] = float(ratios[i])
+                margins[name] = float(moes[i])
+        return percentages, margins
+
+    def integrate_concentrations(self, depth_a, depth_b) -> Dict[str, float]:
+        """Integrates the concentrations of all element profiles.
+        """
+        # Multiply by 0.01 to get concentration per cm^2
+        integrals = _integrate(
+            self.total.depths, self.concentrations, depth_a, depth_b) * 0.01
+        return {
+            name: float(integral)
+            for name, integral in zip(self.profiles, integrals)
+        }
+
+    def __to_profiles(self, concentrations) -> Dict[str, DepthProfile]:
+        """Returns DepthProfiles that have the given concentrations.
+        """
+        return {
+            name: DepthProfile(
+                self.total.depths, conc, events=profile.events,
+                element=profile.element)
+            for (name, profile), conc in zip(
+                self.profiles.items(), concentrations)
+        }
+
+
 class DepthProfileHandler:
     """Handles multiple DepthProfiles. Keeps a dictionary of absolute
     and corresponding relative DepthProfiles."""
@@ -513,6 +870,7 @@ class DepthProfileHandler:
         """
         self.__absolute_profiles = {}
         self.__relative_profiles = {}
+        self.__stack = None
 
     def read_directory(
             self,
@@ -557,6 +915,7 @@ class DepthProfileHandler:
         self.merge_profiles.cache_clear()
         self.__absolute_profiles.clear()
         self.__relative_profiles.clear()
+        self.__stack = None
 
         # Depth files are named as 'depth.[name of the element]'
         elem_strs = (f.name.split(".")[-1] for f in file_paths)
@@ -580,6 +939,10 @@ class DepthProfileHandler:
                     logging.getLogger(logger_name).info(
                         f"Could not create depth profiled .depth file: {e}")
 
+        # Profiles that share the same depths are processed all at once
+        if _ProfileStack.is_stackable(self.__absolute_profiles):
+            self.__stack = _ProfileStack(self.__absolute_profiles)
+
     def get_depth_range(self):
         """Returns the minimum and maximum depth values in the total depth
         profile.
@@ -610,7 +973,10 @@ class DepthProfileHandler:
         """
         # If relative profiles have not yet been calculated, they are now
         if not self.__relative_profiles:
-            if "total" in self.__absolute_profiles:
+            if self.__stack is not None:
+                self.__relative_profiles = \
+                    self.__stack.get_relative_profiles()
+            elif "total" in self.__absolute_profiles:
                 # Relative profiles are created in relation to the total
                 # profile
                 total_profile = self.__absolute_profiles["total"]
@@ -645,6 +1011,9 @@ class DepthProfileHandler:
             dictionary where keys are the names of the DepthProfiles
             and values are DepthProfiles.
         """
+        if self.__stack is not None:
+            return self.__stack.merge(depth_a, depth_b, method)
+
         # Do this to calculate the relative profiles first
         rel = self.get_relative_profiles()
 
@@ -686,6 +1055,10 @@ class DepthProfileHandler:
             contains the margins of error at given systematic error
             for each ratio calculation.
         """
+        if self.__stack is not None:
+            return self.__stack.calculate_ratios(
+                ignored, depth_a, depth_b, systematic_error)
+
         if "total" in self.__absolute_profiles:
             total_profile = self.__absolute_profiles["total"]
         else:
@@ -742,6 +1115,9 @@ class DepthProfileHandler:
             dictionary where keys are the names of the DepthProfiles and
             values are integrals of their concentrations.
         """
+        if self.__stack is not None:
+            return self.__stack.integrate_concentrations(depth_a, depth_b)
+
         return {
             p: self.__absolute_profiles[p].integrate_concentrations(
                 depth_a, depth_b)
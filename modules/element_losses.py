@@ -31,7 +31,12 @@ __version__ = "2.0"
 
 import os
 
+import numpy as np
+
 from pathlib import Path
+from typing import Optional
+
+from . import cut_file as cf
 from .cut_file import CutFile
 from .element import Element
 
@@ -41,10 +46,11 @@ class ElementLosses:
     """
     __slots__ = "directory_cuts", "directory_composition_changes", \
                 "partition_count", "checked_cuts", "reference_cut_file", \
-                "reference_key", "cut_splits"
+                "reference_key", "cut_splits", "cut_index"
 
     def __init__(self, directory_cuts, directory_composition_changes,
-                 reference_cut_file, checked_cuts, partition_count):
+                 reference_cut_file, checked_cuts, partition_count,
+                 cut_index: Optional["CutEventIndex"] = None):
         """Inits Element Losses class.
 
         Args:
@@ -54,6 +60,8 @@ class ElementLosses:
             reference_cut_file: String representing reference cut file.
             checked_cuts: String list of cut files to be graphed.
             partition_count: Integer representing split count.
+            cut_index: CutEventIndex that holds the loaded cut files. Sharing
+                an index between ElementLosses avoids reloading the cut files.
         """
         self.directory_cuts = directory_cuts
         self.directory_composition_changes = directory_composition_changes
@@ -73,6 +81,10 @@ class ElementLosses:
         #      split twice
         self.reference_key = "{0}.{1}".format(element, filename_split[1])
         self.cut_splits = ElementLossesSplitHolder()
+        if cut_index is None:
+            self.cut_index = CutEventIndex()
+        else:
+            self.cut_index = cut_index
 
     def count_element_cuts(self, save_splits=False, progress=None):
         """Count data points in splits based on reference file.
@@ -85,8 +97,10 @@ class ElementLosses:
         Return:
             Returns dictionary of elements and their counts within splits.
         """
-        self.__load_cut_splits(save=save_splits, progress=progress)
+        self.__load_cut_splits(progress=progress)
         split_counts = self.__count_element_cuts(progress=progress)
+        if save_splits:
+            self.save_splits()
         return split_counts
 
     def save_splits(self, progress=None):
@@ -122,34 +136,21 @@ class ElementLosses:
                         (split_number / split_count))
             dirtyinteger += 1
 
-    def __load_cut_splits(self, save=False, progress=None):
-        """Loads the checked cut files and splits them in smaller cuts.
+    def __load_cut_splits(self, progress=None):
+        """Splits the checked cut files in smaller cuts. Cut files are loaded
+        through the cut index so they are only read if they have changed.
 
         Args:
-            save: Boolean representing whether we save splits or not.
             progress: ABCProgressReporter
         """
-        reference_cut = CutFile()
-        reference_cut.load_file(self.reference_cut_file)
-
-        # Remove old (element losses) cut files
-        if save:
-            self.__element_losses_folder_clean_up()
-
+        reference_file = Path(self.reference_cut_file)
         dirtyinteger = 0
         count = len(self.checked_cuts)
         for file in self.checked_cuts:
             if progress is not None:
                 progress.report((dirtyinteger / count) * 80)
-            cut = CutFile()
-            cut.load_file(file)
-
-            if isinstance(file, Path):
-                filename = file.name
-            else:
-                filename = os.path.basename(file)
-
-            filename_split = filename.split('.')
+            file = Path(file)
+            filename_split = file.name.split('.')
             element = filename_split[1] + "." + filename_split[2]
             if len(filename_split) == 4:
                 # This is a patch to make the sample files on jyu website to
@@ -164,10 +165,10 @@ class ElementLosses:
                 key = "{0}.{1}.{2}".format(element,
                                            filename_split[3],
                                            filename_split[4])
-            self.cut_splits.add_splits(key, cut,
-                                       cut.split(reference_cut,
-                                                 self.partition_count,
-                                                 save=save))
+            self.cut_splits.add_splits(
+                key, self.cut_index.get_cut(file),
+                self.cut_index.get_split_ends(
+                    file, reference_file, self.partition_count))
             dirtyinteger += 1
 
     def __element_losses_folder_clean_up(self):
@@ -207,13 +208,76 @@ class ElementLosses:
 
             # Reference cut is not counted, excluded from graph.
             if key != self.reference_key:
-                split_counts_dict[key] = [len(split)
-                                          for split
-                                          in self.cut_splits.get_splits(key)]
+                split_counts_dict[key] = \
+                    self.cut_splits.get_split_counts(key).tolist()
             dirtyinteger += 1
         return split_counts_dict
 
 
+class CutEventIndex:
+    """Index of the event numbers of cut files.
+
+    Each cut file is loaded once and its event numbers are kept in a
+    contiguous array together with the information whether they are sorted.
+    The number of events up to any event number is then a binary search away,
+    so splits can be counted for any reference cut and partition count
+    without reading the cut files again. A cut file is reloaded if it has
+    changed on disk.
+    """
+    __slots__ = "__cuts"
+
+    def __init__(self):
+        """Inits a new CutEventIndex.
+        """
+        # Cut file path -> (stat info, CutFile, event numbers, sorted)
+        self.__cuts = {}
+
+    def get_cut(self, file: Path) -> CutFile:
+        """Returns the CutFile loaded from the given file.
+        """
+        return self.__get_entry(file)[1]
+
+    def get_events(self, file: Path) -> np.ndarray:
+        """Returns the event numbers of the given cut file.
+        """
+        return self.__get_entry(file)[2]
+
+    def get_split_ends(self, file: Path, reference_file: Path,
+                       partition_count: int) -> np.ndarray:
+        """Returns the index of the first event after each split when the
+        cut file is split by the reference cut file.
+
+        Args:
+            file: path to the cut file that is split
+            reference_file: path to the reference cut file
+            partition_count: number of splits
+
+        Return:
+            array of event indices, one for each split
+        """
+        _, _, events, events_sorted = self.__get_entry(file)
+        return cf.get_split_ends(
+            events, self.get_events(reference_file), partition_count,
+            events_sorted=events_sorted)
+
+    def __get_entry(self, file: Path):
+        """Returns the cached entry of a cut file, loading the file if it is
+        not cached or it has changed.
+        """
+        file = Path(file)
+        stat = file.stat()
+        stat_info = stat.st_mtime_ns, stat.st_size, stat.st_ino
+        entry = self.__cuts.get(file)
+        if entry is None or entry[0] != stat_info:
+            cut = CutFile()
+            cut.load_file(file)
+            events = np.ascontiguousarray(cut.data[:, -1])
+            entry = stat_info, cut, events, \
+                bool(np.all(events[:-1] <= events[1:]))
+            self.__cuts[file] = entry
+        return entry
+
+
 class ElementLossesSplitHolder:
     """Element Losses Split Holder class to hold information of cuts' splits.
     """
@@ -222,6 +286,7 @@ class ElementLossesSplitHolder:
         """Inits the class
         """
         self.__cut_mains = {}  # Might be unnecessary.
+        # Splits are stored as the row index where each split ends
         self.__splits = {}
 
     def count(self):
@@ -252,11 +317,25 @@ class ElementLossesSplitHolder:
         """
         if key not in self.__splits:
             return []
-        return self.__splits[key]
+        data = self.__cut_mains[key].data
+        ends = self.__splits[key]
+        starts = np.concatenate(([0], ends[:-1]))
+        return [data[start:end] for start, end in zip(starts, ends)]
+
+    def get_split_counts(self, key) -> np.ndarray:
+        """Get the number of events in each split of a cut file.
+        """
+        if key not in self.__splits:
+            return np.empty(0, dtype=np.intp)
+        return np.diff(self.__splits[key], prepend=0)
 
-    def add_splits(self, key, cut, splits):
+    def add_splits(self, key, cut, split_ends):
         """Add splits to a cut file
+
+        Args:
+            key: key of the cut file
+            cut: CutFile that is split
+            split_ends: index of the first row after each split
         """
-        if key not in self.__cut_mains:
-            self.__cut_mains[key] = cut
-        self.__splits[key] = splits
+        self.__cut_mains[key] = cut
+        self.__splits[key] = split_ends
@@ -57,6 +57,7 @@ from .base import AdjustableSettings
 from .base import MCERDParameterContainer
 from .get_espe import GetEspe
 from .mcerd import MCERD
+from .mcerd_scheduler import JobPriority
 from .observing import Observable
 from .recoil_element import RecoilElement
 from .enums import OptimizationType
@@ -570,7 +571,7 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
               use_old_erd_files=True, optimization_type=None,
               ion_division=IonDivision.NONE,
               ct: Optional[CancellationToken] = None,
-              start_interval=5, status_check_interval=1,
+              status_check_interval=1,
               **kwargs) -> Optional[rx.Observable]:
         """
         Start the simulation.
@@ -582,12 +583,10 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
                 files or not
             optimization_type: either recoil, fluence or None
             ion_division: ion division mode that determines how ions are
-                divided per process
+                divided per process and whether processes share the same
+                presimulation
             ct: CancellationToken that can be used to stop
                 the start process
-            start_interval: seconds between the start of each simulation
-                (ensures that MCERD's startup files are not being
-                overwritten by later processes)
             status_check_interval: seconds between each observed atoms count.
             kwargs: keyword arguments passed down to MCERD's run method
 
@@ -645,18 +644,18 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
 
         self._cts.add(ct)
 
-        # New MCERD process is started every five seconds until number of
-        # processes is reached or cancellation has been requested.
-        # Seed is incremented for each new process.
-        return rx.timer(0, start_interval).pipe(
-            ops.take_while(
-                lambda _: not ct.is_cancellation_requested()),
-            ops.take(number_of_processes),
-            ops.scan(lambda acc, _: acc + 1, seed=seed_number - 1),
-            ops.map(lambda next_seed: self._start(
-                recoil, next_seed, optimization_type, dict(settings),
-                ct, **kwargs)),
-            ops.flat_map(lambda x: x),
+        if ion_division is IonDivision.SHARED:
+            processes = self._start_with_shared_presimulation(
+                recoil, seed_number, number_of_processes, optimization_type,
+                settings, ct, **kwargs)
+        else:
+            processes = rx.timer(0).pipe(ops.flat_map(
+                lambda _: self._start_processes(
+                    recoil, range(seed_number,
+                                  seed_number + number_of_processes),
+                    optimization_type, settings, ct, **kwargs)))
+
+        return processes.pipe(
             ops.scan(lambda acc, x: {
                 **x,
                 ElementSimulation.TOTAL: number_of_processes,
@@ -682,9 +681,84 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             )
         )
 
+    def _start_processes(self, recoil, seeds: Iterable[int],
+                         optimization_type, settings, ct,
+                         **kwargs) -> rx.Observable:
+        """Starts an MCERD process for each seed at once. Each MCERD process
+        has its own working directory so they do not interfere with each
+        other.
+
+        Returns the merged output of the processes.
+        """
+        return rx.from_iterable(seeds).pipe(
+            ops.take_while(
+                lambda _: not ct.is_cancellation_requested()),
+            ops.map(lambda next_seed: self._start(
+                recoil, next_seed, optimization_type, dict(settings),
+                ct, **kwargs)),
+            ops.flat_map(lambda x: x)
+        )
+
+    def _start_with_shared_presimulation(
+            self, recoil, seed_number, number_of_processes,
+            optimization_type, settings, ct, **kwargs) -> rx.Observable:
+        """Starts MCERD processes that share the results of a single
+        presimulation.
+
+        If a presimulation has already been run with the same settings, its
+        results are used by all processes. Otherwise the first process runs
+        the presimulation and the rest are started once it has finished.
+
+        Returns the merged output of the processes.
+        """
+        mcerd = MCERD(
+            seed_number, settings, self.get_full_name(),
+            optimize_fluence=optimization_type is OptimizationType.FLUENCE)
+        presimulation_file = mcerd.get_shared_presimulation_file()
+        shared_settings = {
+            **settings,
+            "number_of_ions_in_presimu": 0,
+            "presimulation_file": presimulation_file
+        }
+        seeds = range(seed_number, seed_number + number_of_processes)
+
+        if presimulation_file.exists():
+            return rx.timer(0).pipe(ops.flat_map(
+                lambda _: self._start_processes(
+                    recoil, seeds, optimization_type, shared_settings, ct,
+                    **kwargs)))
+
+        def start_rest(_):
+            if not mcerd.share_presimulation():
+                # Remaining processes run their own presimulations
+                return self._start_processes(
+                    recoil, seeds[1:], optimization_type, settings, ct,
+                    **kwargs)
+            return self._start_processes(
+                recoil, seeds[1:], optimization_type, shared_settings, ct,
+                **kwargs)
+
+        first = rx.timer(0).pipe(
+            ops.take_while(
+                lambda _: not ct.is_cancellation_requested()),
+            ops.flat_map(lambda _: self._start(
+                recoil, seed_number, optimization_type, dict(settings), ct,
+                **kwargs)),
+            ops.share()
+        )
+        rest = first.pipe(
+            ops.filter(lambda x: not x[MCERD.PRESIM]),
+            ops.take(1),
+            ops.flat_map(start_rest)
+        )
+        return rx.merge(first, rest)
+
     def _start(self, recoil, seed_number, optimization_type, settings, ct,
                **kwargs) -> rx.Observable:
-        """Inner method that creates an MCERD instance and runs it.
+        """Inner method that creates an MCERD instance and submits it to the
+        scheduler of the request. Optimization processes are started before
+        simulation processes. The processes are run by the executor of the
+        request.
 
         Returns an observable stream of MCERD output.
         """
@@ -705,7 +779,13 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
             seed_number, settings, self.get_full_name(),
             optimize_fluence=optimization_type is OptimizationType.FLUENCE)
 
-        return mcerd.run(ct=ct, **kwargs)
+        if optimization_type is None:
+            priority = JobPriority.SIMULATION
+        else:
+            priority = JobPriority.OPTIMIZATION
+        return self.request.scheduler.submit(
+            mcerd, ct=ct, priority=priority,
+            executor=self.request.get_mcerd_executor(), **kwargs)
 
     def _set_flags(self, b: bool, optim_mode=None):
         """Sets the boolean flags that indicate the state of
@@ -1012,7 +1092,8 @@ class ElementSimulation(Observable, Serializable, AdjustableSettings,
         self.reset(remove_result_files=True)
         # FIXME also removes files that have the same prefix
         gf.remove_matching_files(
-            self.directory, exts={".mcsimu", ".rec", ".profile", ".sct"},
+            self.directory,
+            exts={".mcsimu", ".rec", ".profile", ".sct", ".pre"},
             filter_func=lambda fn: fn.startswith(self.name_prefix)
         )
 
@@ -30,14 +30,19 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen " \
              "Juhani Sundell"
 __version__ = "2.0"
 
+import hashlib
+import json
 import logging
+import os
 import subprocess
 import platform
+import threading
 
 import numpy as np
 
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from pathlib import Path
-from typing import List
 from typing import Tuple
 from typing import Optional
 from typing import Sequence
@@ -45,13 +50,320 @@ from typing import Dict
 
 from .observing import ProgressReporter
 from . import general_functions as gf
+from . import histogram
 from . import subprocess_utils as sutils
-from .parsing import ToFListParser
+from . import tof_list as tl
+from . import cut_file as cf
+from .parsing import ToFListArrayParser
 from .measurement import Measurement
 from .element import Element
+from .global_settings import GlobalSettings
 from .base import Espe
 
-TofListData = List[Tuple[float, float, float, int, float, str, float, int]]
+# Columns of tof_list output as arrays
+TofListData = Tuple[np.ndarray, ...]
+# Energies and efficiency weights of the events in tof_list output
+TofListArrays = Tuple[np.ndarray, np.ndarray]
+
+
+class ToFListCache:
+    """Cache of the event energies and efficiency weights that tof_list
+    calculated for cut files.
+
+    Entries are keyed by the contents of the cut file, the tof.in file and
+    the efficiency files it refers to and the no_foil flag. A spectrum of any
+    bin width, with or without efficiency, can then be histogrammed from a
+    cached entry without running tof_list again.
+
+    Entries are kept in memory and optionally written to a directory so that
+    they survive restarts. Least recently used files are removed from the
+    directory when it grows larger than its maximum size. Entries also
+    remember the .tof_list files that were written for them, as a hit is only
+    valid if that file is unchanged.
+    """
+    # Oldest entries are dropped from memory if the cached events exceed
+    # this
+    MAX_EVENTS = 20_000_000
+
+    __slots__ = "directory", "max_size", "__entries", "__lock"
+
+    def __init__(self, directory: Optional[Path] = None,
+                 max_size: Optional[int] = None):
+        """Initializes a new ToFListCache.
+
+        Args:
+            directory: directory where entries are also stored. If None,
+                entries are only kept in memory.
+            max_size: maximum total size of the stored entries in bytes.
+                If None, the size is not limited.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.__entries = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: GlobalSettings) -> "ToFListCache":
+        """Returns a cache that stores entries in the location and within
+        the size given in settings. Entries are only kept in memory if the
+        size is zero.
+        """
+        max_size = settings.get_tof_list_cache_size() * 2 ** 20
+        if max_size <= 0:
+            return cls()
+        return cls(settings.get_tof_list_cache_directory(), max_size)
+
+    @staticmethod
+    def get_key(cut_file: Path, tof_in: Path, no_foil: bool) -> str:
+        """Returns the cache key for running tof_list with the given input
+        files.
+        """
+        sha = hashlib.sha256()
+        sha.update(b"no_foil" if no_foil else b"foil")
+        files = [cut_file, tof_in]
+        with tof_in.open("r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() == "Efficiency directory":
+                    eff_dir = Path(value.strip())
+                    if eff_dir.is_dir():
+                        files.extend(sorted(
+                            f for f in eff_dir.iterdir() if f.is_file()))
+        for file in files:
+            contents = file.read_bytes()
+            sha.update(file.name.encode("utf-8"))
+            sha.update(len(contents).to_bytes(8, "little"))
+            sha.update(contents)
+        return sha.hexdigest()
+
+    def get(self, key: str, tof_list_file: Optional[Path] = None) -> \
+            Optional[TofListArrays]:
+        """Returns the cached energies and weights or None if there is no
+        valid entry.
+
+        Args:
+            key: cache key
+            tof_list_file: .tof_list file that must be unchanged since it
+                was written for this entry
+        """
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            if entry is None:
+                entry = self.__read_entry(key)
+            if entry is None:
+                return None
+            # Most recently used entry is kept last
+            self.__entries[key] = entry
+        energies, weights, written = entry
+        if tof_list_file is not None and \
+                written.get(str(tof_list_file)) != _get_stamp(tof_list_file):
+            return None
+        return energies, weights
+
+    def put(self, key: str, energies: np.ndarray, weights: np.ndarray,
+            tof_list_file: Optional[Path] = None):
+        """Adds an entry to the cache.
+
+        Args:
+            key: cache key
+            energies: energies of the events
+            weights: efficiency weights of the events
+            tof_list_file: .tof_list file that was written for the entry
+        """
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            written = entry[2] if entry is not None else {}
+            if tof_list_file is not None:
+                written[str(tof_list_file)] = _get_stamp(tof_list_file)
+            energies.flags.writeable = False
+            weights.flags.writeable = False
+            self.__entries[key] = energies, weights, written
+            self.__write_entry(key, energies, weights, written)
+
+            event_count = sum(e.size for e, *_ in self.__entries.values())
+            while len(self.__entries) > 1 and \
+                    event_count > self.MAX_EVENTS:
+                oldest = next(iter(self.__entries))
+                event_count -= self.__entries.pop(oldest)[0].size
+
+    def clear(self):
+        """Removes all entries from memory.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def __get_file(self, key: str) -> Path:
+        return Path(self.directory, f"{key}.tof_list.npz")
+
+    def __read_entry(self, key: str):
+        """Reads an entry from the cache directory.
+        """
+        if self.directory is None:
+            return None
+        file = self.__get_file(key)
+        try:
+            with np.load(file, allow_pickle=False) as npz:
+                written = {
+                    file: tuple(stamp) if stamp is not None else None
+                    for file, stamp in json.loads(str(npz["written"])).items()
+                }
+                entry = npz["energies"], npz["weights"], written
+            # Modification time of the file tells when it was used
+            os.utime(file)
+            return entry
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __write_entry(self, key: str, energies, weights, written):
+        """Writes an entry to the cache directory.
+        """
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.__get_file(key).with_suffix(".tmp.npz")
+            np.savez(tmp_file, energies=energies, weights=weights,
+                     written=np.array(json.dumps(written)))
+            os.replace(tmp_file, self.__get_file(key))
+        except OSError as e:
+            logging.getLogger("request").warning(
+                f"Could not write tof_list cache: {e}")
+            return
+        self.__evict(key)
+
+    def __evict(self, key: str):
+        """Removes the least recently used files, except the one of the
+        given key, until the stored entries fit in the maximum size.
+        """
+        if self.max_size is None:
+            return
+        files = []
+        total_size = 0
+        for file in self.directory.glob("*.tof_list.npz"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, file))
+            total_size += stat.st_size
+        keep = self.__get_file(key)
+        for _, size, file in sorted(files):
+            if total_size <= self.max_size:
+                break
+            if file != keep:
+                gf.remove_files(file)
+                total_size -= size
+
+
+class SpectrumCache:
+    """Cache of measured energy spectra.
+
+    Spectra are addressed by a hash of everything they are calculated from:
+    the tof_list inputs (see ToFListCache.get_key), the bin width and whether
+    efficiency is used. Cached spectra are returned without running any
+    external programs. The .hist file of a spectrum is only rewritten if it
+    has been changed or removed since it was last written.
+
+    Numbers of hits and misses are counted for diagnostics.
+    """
+    # Least recently used spectra are dropped if the cached bins exceed this
+    MAX_BINS = 2_000_000
+
+    __slots__ = "__entries", "__lock", "__hits", "__misses"
+
+    def __init__(self):
+        """Initializes a new SpectrumCache.
+        """
+        self.__entries = {}
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        """Number of spectra found in the cache.
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """Number of spectra not found in the cache.
+        """
+        return self.__misses
+
+    @staticmethod
+    def get_key(cut_file: Path, tof_in: Path, spectrum_width: float,
+                use_efficiency: bool, no_foil: bool) -> str:
+        """Returns the cache key for the spectrum of a cut file.
+        """
+        sha = hashlib.sha256(
+            ToFListCache.get_key(cut_file, tof_in, no_foil).encode("ascii"))
+        sha.update(repr(float(spectrum_width)).encode("ascii"))
+        sha.update(b"efficiency" if use_efficiency else b"no_efficiency")
+        return sha.hexdigest()
+
+    def get(self, key: str, hist_file: Optional[Path] = None) -> \
+            Optional[Espe]:
+        """Returns the cached spectrum or None if it is not cached.
+
+        Args:
+            key: cache key
+            hist_file: .hist file of the spectrum. File is rewritten if it
+                does not match the cached spectrum.
+        """
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+            # Most recently used entry is kept last
+            self.__entries[key] = entry
+            espe, written = entry
+            if hist_file is not None and espe and \
+                    written.get(str(hist_file)) != _get_stamp(hist_file):
+                EnergySpectrum.write_hist_file(hist_file, list(espe[1:-1]))
+                written[str(hist_file)] = _get_stamp(hist_file)
+        return list(espe)
+
+    def put(self, key: str, espe: Espe, hist_file: Optional[Path] = None):
+        """Adds a spectrum to the cache.
+
+        Args:
+            key: cache key
+            espe: spectrum
+            hist_file: .hist file that the spectrum was written to
+        """
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            written = entry[1] if entry is not None else {}
+            if hist_file is not None:
+                written[str(hist_file)] = _get_stamp(hist_file)
+            self.__entries[key] = tuple(espe), written
+
+            bin_count = sum(len(e) for e, _ in self.__entries.values())
+            while len(self.__entries) > 1 and bin_count > self.MAX_BINS:
+                oldest = next(iter(self.__entries))
+                bin_count -= len(self.__entries.pop(oldest)[0])
+
+    def clear(self):
+        """Removes all spectra and resets the counters.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+
+def _get_stamp(file: Path) -> Optional[Tuple[int, int]]:
+    """Returns the modification time and size of a file or None if it does
+    not exist.
+    """
+    try:
+        stat = file.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 
 # TODO rename and refactor functions
@@ -59,6 +371,12 @@ TofListData = List[Tuple[float, float, float, int, float, str, float, int]]
 class EnergySpectrum:
     """Class for energy spectrum.
     """
+    # Energies and weights calculated by tof_list are shared by all spectra.
+    # The cache is created from the global settings when it is first needed.
+    tof_list_cache: Optional[ToFListCache] = None
+    _tof_list_cache_lock = threading.Lock()
+    spectrum_cache = SpectrumCache()
+
     def __init__(
             self,
             measurement: Measurement,
@@ -97,6 +415,9 @@ class EnergySpectrum:
             verbose: bool = True) -> Dict[str, Espe]:
         """Calculates the measured energy spectra for the given .cut files.
 
+        Spectra that have been calculated before with the same inputs are
+        returned from spectrum_cache.
+
         Args:
             measurement: Measurement whose settings will be used when
                 calculating spectra
@@ -111,11 +432,57 @@ class EnergySpectrum:
         Returns:
             energy spectra as a dictionary
         """
+        cache = EnergySpectrum.spectrum_cache
+        directory_es = measurement.get_energy_spectra_dir()
+        try:
+            tof_in = measurement.generate_tof_in(no_foil=no_foil)
+            spectra = [
+                (cut_file, EnergySpectrum.get_spectrum_key(cut_file),
+                 cache.get_key(cut_file, tof_in, spectrum_width,
+                               use_efficiency, no_foil))
+                for cut_file in cut_files
+            ]
+        except Exception:
+            # EnergySpectrum reports the errors
+            spectra = [(cut_file, None, None) for cut_file in cut_files]
+
+        espes = {}
+        missing = []
+        for cut_file, key, cache_key in spectra:
+            espe = None
+            if cache_key is not None:
+                espe = cache.get(cache_key, EnergySpectrum.get_hist_file_name(
+                    directory_es, measurement.name, key, no_foil=no_foil))
+            if espe is None:
+                missing.append(cut_file)
+            espes[key] = espe
+
+        if not missing:
+            if progress is not None:
+                progress.report(100)
+            return espes
+
         es = EnergySpectrum(
-            measurement, cut_files, spectrum_width, progress=progress,
+            measurement, missing, spectrum_width, progress=progress,
             no_foil=no_foil, verbose=verbose)
-        return es.calculate_spectrum(
+        calculated = es.calculate_spectrum(
             use_efficiency=use_efficiency, no_foil=no_foil)
+        if None in espes:
+            return calculated
+
+        for cut_file, key, cache_key in spectra:
+            if espes[key] is not None:
+                continue
+            if key not in calculated:
+                del espes[key]
+                continue
+            espes[key] = calculated[key]
+            if not espes[key]:
+                # Failed runs of tof_list also produce empty spectra
+                continue
+            cache.put(cache_key, espes[key], EnergySpectrum.get_hist_file_name(
+                directory_es, measurement.name, key, no_foil=no_foil))
+        return espes
 
     def calculate_spectrum(
             self,
@@ -136,19 +503,34 @@ class EnergySpectrum:
             self._tof_listed_files, self._spectrum_width, self._measurement,
             self._directory_es, use_efficiency=use_efficiency, no_foil=no_foil)
 
+    @staticmethod
+    def get_tof_list_cache(settings: GlobalSettings) -> ToFListCache:
+        """Returns the cache of tof_list results that is shared by all
+        spectra. The cache is created from settings on the first call.
+        """
+        with EnergySpectrum._tof_list_cache_lock:
+            if EnergySpectrum.tof_list_cache is None:
+                EnergySpectrum.tof_list_cache = ToFListCache.from_settings(
+                    settings)
+            return EnergySpectrum.tof_list_cache
+
     def _load_cuts(
             self,
             no_foil: bool = False,
             progress: Optional[ProgressReporter] = None,
-            verbose: bool = True) -> Dict[str, TofListData]:
-        """Loads cut files through tof_list into list.
+            verbose: bool = True) -> Dict[str, TofListArrays]:
+        """Loads cut files through tof_list into arrays of energies and
+        efficiency weights.
+
+        Cut files that have already been run through tof_list with the same
+        settings are loaded from tof_list_cache instead.
 
         Args:
             no_foil: whether foil thickness is set to 0 when running tof_list
             progress: ProgressReporter object
 
         Return:
-            Returns list of cut files' tof_list results.
+            Returns the energies and weights of each cut file.
         """
         tof_in = self._measurement.generate_tof_in(no_foil=no_foil)
         cut_dict = {}
@@ -161,25 +543,63 @@ class EnergySpectrum:
             count = len(self._cut_files)
             
             self._directory_es.mkdir(exist_ok=True)
-            
-            for i, cut_file in enumerate(self._cut_files):
-                # TODO move cut file handling to cut_file module
-                filename_split = cut_file.name.split('.')
-                element = Element.from_string(filename_split[1])
-
-                if not (5 <= len(filename_split) <= 6):
-                    raise ValueError(
-                        f"Could not parse cut file name: {cut_file}")
 
-                key = ".".join([str(element), *filename_split[2:-1]])
+            keys = [
+                EnergySpectrum.get_spectrum_key(cut_file)
+                for cut_file in self._cut_files
+            ]
 
-                cut_dict[key] = EnergySpectrum.tof_list(
-                    cut_file, directory, no_foil=no_foil,
-                    logger_name=self._measurement.name,
-                    tof_in=tof_in, verbose=verbose)
-
-                if progress is not None:
-                    progress.report(i / count * 90)
+            cache = EnergySpectrum.get_tof_list_cache(self._global_settings)
+            results = [None] * count
+            cache_keys = [None] * count
+            tof_list_files = [None] * count
+            for i, cut_file in enumerate(self._cut_files):
+                if directory is not None:
+                    tof_list_files[i] = EnergySpectrum.get_tof_list_file_name(
+                        directory, cut_file, no_foil=no_foil)
+                cache_keys[i] = cache.get_key(cut_file, tof_in, no_foil)
+                results[i] = cache.get(cache_keys[i], tof_list_files[i])
+            missing = [i for i, result in enumerate(results) if result is None]
+
+            # tof.in and stopping data are loaded into the tof_list library
+            # once and used for all cut files
+            config = None
+            if missing:
+                config = EnergySpectrum.get_tof_list_config(
+                    tof_in, logger_name=self._measurement.name,
+                    verbose=verbose)
+
+            try:
+                # Each tof_list run is a separate process, so the runs and the
+                # parsing of their output are done in a pool of threads.
+                workers = min(len(missing), os.cpu_count() or 1)
+                with ThreadPoolExecutor(max(workers, 1)) as executor:
+                    futures = {
+                        executor.submit(
+                            EnergySpectrum._run_tof_list,
+                            self._cut_files[i], directory, no_foil=no_foil,
+                            logger_name=self._measurement.name,
+                            tof_in=tof_in, verbose=verbose,
+                            config=config): i
+                        for i in missing
+                    }
+                    completed = as_completed(futures)
+                    for i, future in enumerate(completed, start=1):
+                        j = futures[future]
+                        results[j] = future.result()
+                        if results[j][0].size:
+                            cache.put(cache_keys[j], *results[j],
+                                      tof_list_file=tof_list_files[j])
+                        if progress is not None:
+                            progress.report(i / len(missing) * 90)
+            finally:
+                if config is not None:
+                    config.close()
+
+            # Results are added in the order of the cut files regardless of
+            # which run finished first
+            for key, result in zip(keys, results):
+                cut_dict[key] = result
         except Exception as e:
             msg = f"Could not calculate Energy Spectrum: {e}."
             logging.getLogger(self._measurement.name).error(msg)
@@ -195,10 +615,14 @@ class EnergySpectrum:
             no_foil: bool = False,
             logger_name: Optional[str] = None,
             tof_in: Path = Path("tof.in"),
-            verbose: bool = True) -> TofListData:
+            verbose: bool = True,
+            config: Optional[tl.ToFListConfig] = None) -> TofListData:
         """ToF_list
 
-        Arstila's tof_list executables interface for Python.
+        Arstila's tof_list executables interface for Python. If a
+        configuration of the tof_list library is given, the cut file is
+        converted with the library and the executable is only used if
+        the conversion fails.
 
         Args:
             cut_file: A Path representing cut file to be ran through tof_list.
@@ -209,22 +633,42 @@ class EnergySpectrum:
             logger_name: name of a logging entity
             tof_in: path to tof_in_file
             verbose: whether tof_list's stderr is printed to console
+            config: configuration of the tof_list library created from
+                the same tof_in
 
         Returns:
-            Returns cut file as list transformed through Arstila's tof_list
-            program.
+            Returns the columns of cut file transformed through Arstila's
+            tof_list program as arrays.
         """
+        tof_parser = ToFListArrayParser()
         if not cut_file:
-            return []
+            return tof_parser.get_empty()
+
+        if config is not None:
+            try:
+                tof_list_data = config.convert(cut_file)
+            except (OSError, ValueError) as e:
+                logging.getLogger(logger_name).warning(
+                    f"tof_list library could not convert {cut_file.name}, "
+                    f"running tof_list instead: {e}")
+            else:
+                if directory is not None:
+                    directory.mkdir(exist_ok=True)
+                    tof_list_file = EnergySpectrum.get_tof_list_file_name(
+                        directory, cut_file, no_foil=no_foil)
+                    with tof_list_file.open("w") as file:
+                        file.write(tof_parser.to_text(tof_list_data))
+                return tof_list_data
 
-        tof_parser = ToFListParser()
-        cmd = EnergySpectrum.get_command(tof_in, cut_file)
         stderr = None if verbose else subprocess.DEVNULL
 
         try:
-            with subprocess.Popen(
-                    cmd, cwd=gf.get_bin_dir(), stdout=subprocess.PIPE,
-                    universal_newlines=True, stderr=stderr) as tof_list:
+            # tof_list can only read text cut files
+            with cf.legacy_cut_files([cut_file]) as (legacy_file,), \
+                    subprocess.Popen(
+                        EnergySpectrum.get_command(tof_in, legacy_file),
+                        cwd=gf.get_bin_dir(), stdout=subprocess.PIPE,
+                        universal_newlines=True, stderr=stderr) as tof_list:
 
                 if directory is not None:
                     directory.mkdir(exist_ok=True)
@@ -233,11 +677,14 @@ class EnergySpectrum:
                 else:
                     tof_list_file = None
 
+                # Output is parsed and written in blocks of lines
                 tof_list_data = sutils.process_output(
                     tof_list,
                     tof_parser.parse_str,
                     file=tof_list_file,
-                    text_func=lambda x: f"{' '.join(str(col) for col in x)}\n"
+                    text_func=tof_parser.to_text,
+                    output_func=tof_parser.concatenate,
+                    block_size=tof_parser.BLOCK_SIZE
                 )
                 return tof_list_data
         except Exception as e:
@@ -246,7 +693,44 @@ class EnergySpectrum:
                 logging.getLogger(logger_name).error(msg)
             else:
                 print(msg)
-            return []
+            return tof_parser.get_empty()
+
+    @staticmethod
+    def get_tof_list_config(
+            tof_in: Path,
+            logger_name: Optional[str] = None,
+            verbose: bool = True) -> Optional[tl.ToFListConfig]:
+        """Returns the configuration of the tof_list library for the given
+        tof.in file or None if the tof_list executable has to be used
+        instead.
+
+        Args:
+            tof_in: path to tof.in file
+            logger_name: name of a logging entity
+            verbose: whether the library prints messages to stderr
+        """
+        if not tl.is_available():
+            return None
+        try:
+            return tl.ToFListConfig(tof_in, verbose=verbose)
+        except (OSError, ValueError) as e:
+            logging.getLogger(logger_name).warning(
+                f"Could not load tof_list library configuration, running "
+                f"tof_list instead: {e}")
+            return None
+
+    @staticmethod
+    def _run_tof_list(cut_file: Path, *args, **kwargs) -> TofListArrays:
+        """Runs tof_list and returns the energies and efficiency weights of
+        the events.
+
+        Args:
+            cut_file: cut file to run through tof_list
+            *args: positional arguments passed down to tof_list
+            **kwargs: keyword arguments passed down to tof_list
+        """
+        tof_list_data = EnergySpectrum.tof_list(cut_file, *args, **kwargs)
+        return tof_list_data[2], tof_list_data[6]
 
     @staticmethod
     def get_command(tof_in: Path, cut_file: Path) -> Tuple[str, str, str]:
@@ -258,6 +742,20 @@ class EnergySpectrum:
             executable = "./tof_list"
         return executable, str(tof_in), str(cut_file)
 
+    @staticmethod
+    def get_spectrum_key(cut_file: Path) -> str:
+        """Returns the key of the cut file's spectrum, i.e. the name of the
+        cut file without the measurement name and the suffix.
+        """
+        # TODO move cut file handling to cut_file module
+        filename_split = cut_file.name.split('.')
+        element = Element.from_string(filename_split[1])
+
+        if not (5 <= len(filename_split) <= 6):
+            raise ValueError(f"Could not parse cut file name: {cut_file}")
+
+        return ".".join([str(element), *filename_split[2:-1]])
+
     @staticmethod
     def get_tof_list_file_name(
             directory: Path, cut_file: Path, no_foil: bool = False) -> Path:
@@ -275,6 +773,14 @@ class EnergySpectrum:
             directory,
             f"{measurement_name.name}.{key}{foil_txt}.hist")
 
+    @staticmethod
+    def write_hist_file(filename: Path, espe: Espe):
+        """Writes energy spectrum data to a .hist file.
+        """
+        numpy_array = np.array(
+            espe, dtype=[("float", float), ("int", int)])
+        np.savetxt(filename, numpy_array, delimiter=" ", fmt="%5.5f %6d")
+
     @staticmethod
     def pad_with_zeroes(espe: Espe, spectrum_width: float) -> Espe:
         """Returns energy spectrum data that has been padded with zeroes at
@@ -295,9 +801,12 @@ class EnergySpectrum:
         """Calculate energy spectrum data from .tof_list files and writes the
         results to .hist files.
 
+        Spectra are histogrammed from the energies and weights of the events,
+        so any bin width can be used without running tof_list again.
+
         Args:
-            tof_listed_files: contents of .tof_list files belonging to the
-                measurement as a dict.
+            tof_listed_files: energies and efficiency weights from .tof_list
+                files belonging to the measurement as a dict.
             spectrum_width: width of bins in the histogrammed spectra
             measurement: measurement which the .tof_list files belong to
             directory_es: directory
@@ -310,15 +819,11 @@ class EnergySpectrum:
             contents of .hist files as a dict
         """
         espes = {}
-        if use_efficiency:
-            y_col = 6
-        else:
-            y_col = None
-
-        for key, tof_list_data in tof_listed_files.items():
-            espe = gf.hist(
-                tof_list_data, col=2, weight_col=y_col,
+        for key, (energies, weights) in tof_listed_files.items():
+            positions, sums = histogram.calculate(
+                energies, weights if use_efficiency else None,
                 width=spectrum_width)
+            espe = list(zip(positions.tolist(), sums.tolist()))
 
             if not espe:
                 espes[key] = espe
@@ -328,9 +833,6 @@ class EnergySpectrum:
 
             filename = EnergySpectrum.get_hist_file_name(
                 directory_es, measurement.name, key, no_foil=no_foil)
-
-            numpy_array = np.array(
-                espe, dtype=[("float", float), ("int", int)])
-            np.savetxt(filename, numpy_array, delimiter=" ", fmt="%5.5f %6d")
+            EnergySpectrum.write_hist_file(filename, espe)
 
         return espes
@@ -96,11 +96,18 @@ class IonDivision(IntEnum):
     # Both simulation and pre-simulation ions are divided per process
     BOTH = 2
 
+    # Simulation ions are divided per process, a single pre-simulation is
+    # run and its results are shared by all processes
+    SHARED = 3
+
     def __str__(self):
         if self is IonDivision.NONE:
             return "Ions are not divided per process"
         if self is IonDivision.SIM:
             return "Simulation ions are divided per process"
+        if self is IonDivision.SHARED:
+            return "Simulation ions are divided per process, " \
+                   "pre-simulation is shared"
         return "Both pre-simulation and simulation ions are divided per process"
 
     def get_ion_counts(self, presim, sim, processes):
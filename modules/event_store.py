@@ -0,0 +1,724 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+Event store holds the events of a measurement as typed NumPy columns instead
+of a list of Python lists.
+
+Parsed .asc files are cached into a binary sidecar file next to the .asc file
+so that the text file does not have to be parsed again when the measurement
+is reopened.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import itertools
+import json
+import logging
+import os
+
+import numpy as np
+
+from . import general_functions as gf
+
+from pathlib import Path
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+# ADC channels and event numbers both fit comfortably into 32 bits. This keeps
+# the memory footprint at 12 bytes per event (16 with the third ADC).
+EVENT_DTYPE = np.int32
+
+# Number of lines parsed at once when reading .asc files
+_CHUNK_SIZE = 1_000_000
+
+# Version of the sidecar cache format. Increment this if the layout of the
+# cached data changes so that old caches are discarded.
+_CACHE_VERSION = 1
+_CACHE_DATA_SUFFIX = ".events.npy"
+_CACHE_INFO_SUFFIX = ".events.json"
+
+
+class EventStore:
+    """EventStore holds ToF, energy, an optional third ADC value and the
+    event number of each event in separate NumPy arrays.
+
+    Event numbers are 1-based line numbers of the source file, so lines that
+    could not be read as events leave gaps in the numbering.
+    """
+    __slots__ = "tof", "energy", "third", "event_number"
+
+    def __init__(self, tof: Optional[np.ndarray] = None,
+                 energy: Optional[np.ndarray] = None,
+                 event_number: Optional[np.ndarray] = None,
+                 third: Optional[np.ndarray] = None):
+        """Initializes a new EventStore.
+
+        Args:
+            tof: time of flight channels
+            energy: energy channels
+            event_number: event numbers. If None, events are numbered from 1
+                onwards.
+            third: values of the optional third ADC
+        """
+        self.tof = _as_column(tof)
+        self.energy = _as_column(energy)
+        if len(self.tof) != len(self.energy):
+            raise ValueError("ToF and energy columns must be of equal length.")
+        if event_number is None:
+            self.event_number = np.arange(
+                1, len(self.tof) + 1, dtype=EVENT_DTYPE)
+        else:
+            self.event_number = _as_column(event_number)
+        if third is None:
+            self.third = None
+        else:
+            self.third = _as_column(third)
+
+        for column in self.event_number, self.third:
+            if column is not None and len(column) != len(self.tof):
+                raise ValueError("All event columns must be of equal length.")
+
+    def __len__(self):
+        return len(self.tof)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def has_third(self) -> bool:
+        """Whether the events have a value for a third ADC.
+        """
+        return self.third is not None
+
+    def get_columns(self) -> Tuple[np.ndarray, ...]:
+        """Returns the columns in the order they are written to .cut files.
+        """
+        if self.has_third():
+            return self.tof, self.energy, self.third, self.event_number
+        return self.tof, self.energy, self.event_number
+
+    def get_rows(self, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns the events as a 2D array with one row per event.
+
+        Args:
+            indices: indices or boolean mask of the events to include.
+                If None, all events are returned.
+
+        Return:
+            integer array of shape (n, 3) or (n, 4) if third ADC is in use.
+        """
+        columns = self.get_columns()
+        if indices is not None:
+            columns = tuple(c[indices] for c in columns)
+        return np.column_stack(columns) if columns[0].size else \
+            np.empty((0, len(columns)), dtype=EVENT_DTYPE)
+
+    def nbytes(self) -> int:
+        """Returns the number of bytes used by the event columns.
+        """
+        return sum(c.nbytes for c in self.get_columns())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Iterable[int]]) -> "EventStore":
+        """Initializes an EventStore from rows of (tof, energy, [third],
+        event_number).
+        """
+        arr = np.asarray(rows, dtype=EVENT_DTYPE)
+        if arr.size == 0:
+            return cls()
+        if arr.ndim != 2 or arr.shape[1] not in (3, 4):
+            raise ValueError("Rows must have either 3 or 4 columns.")
+        if arr.shape[1] == 4:
+            return cls(arr[:, 0], arr[:, 1], arr[:, 3], third=arr[:, 2])
+        return cls(arr[:, 0], arr[:, 1], arr[:, 2])
+
+    @classmethod
+    def from_asc_file(cls, file_path: Path) -> "EventStore":
+        """Reads events from an .asc file.
+
+        Each line of the file contains either two (ToF, energy) or three (ToF,
+        energy, third ADC) integers. Lines in other formats are skipped but
+        they still increment the event number. If the file has both two and
+        three column lines, third ADC value of two column lines is 0.
+
+        Args:
+            file_path: path to an .asc file
+
+        Return:
+            EventStore
+        """
+        chunks = []
+        first_line = 1
+        with Path(file_path).open("r") as file:
+            while True:
+                lines = list(itertools.islice(file, _CHUNK_SIZE))
+                if not lines:
+                    break
+                chunks.append(_parse_asc_lines(lines, first_line))
+                first_line += len(lines)
+
+        return cls._concatenate(chunks)
+
+    @classmethod
+    def _concatenate(cls, chunks) -> "EventStore":
+        """Combines parsed chunks into a single EventStore.
+        """
+        if not chunks:
+            return cls()
+        has_third = any(third is not None for *_, third in chunks)
+
+        def combine(idx):
+            return np.concatenate([c[idx] for c in chunks])
+
+        if has_third:
+            third = np.concatenate([
+                c[3] if c[3] is not None else np.zeros_like(c[0])
+                for c in chunks])
+        else:
+            third = None
+        return cls(combine(0), combine(1), combine(2), third=third)
+
+
+class EventIndex:
+    """Index of an EventStore's events sorted by ToF and then by energy.
+
+    Events of each ToF channel form a contiguous run sorted by energy, so the
+    events inside a rectangle are found with two binary searches per ToF
+    channel without touching the events outside the rectangle.
+    """
+    __slots__ = "store", "__order", "__keys", "__x_min", "__x_max", \
+                "__y_min", "__y_span"
+
+    def __init__(self, store: EventStore):
+        """Initializes a new EventIndex.
+
+        Args:
+            store: indexed EventStore. The store is not expected to change
+                after the index has been created.
+        """
+        self.store = store
+        if len(store):
+            self.__x_min = int(store.tof.min())
+            self.__x_max = int(store.tof.max())
+            self.__y_min = int(store.energy.min())
+            self.__y_span = int(store.energy.max()) - self.__y_min + 1
+        else:
+            self.__x_min, self.__x_max, self.__y_min = 0, -1, 0
+            self.__y_span = 1
+        keys = self.__get_key(store.tof, store.energy)
+        self.__order = np.argsort(keys, kind="stable")
+        self.__keys = keys[self.__order]
+
+    def __get_key(self, x, y) -> np.ndarray:
+        """Combines ToF and energy channels into a single sort key.
+        """
+        x = np.asarray(x, dtype=np.int64) - self.__x_min
+        y = np.asarray(y, dtype=np.int64) - self.__y_min
+        return x * self.__y_span + y
+
+    def get_indices_in_box(self, x_min: int, x_max: int, y_min: int,
+                           y_max: int) -> np.ndarray:
+        """Returns the indices of the events whose ToF is within [x_min,
+        x_max] and energy within [y_min, y_max].
+
+        Return:
+            indices in ascending order
+        """
+        x_min = max(x_min, self.__x_min)
+        x_max = min(x_max, self.__x_max)
+        y_min = max(y_min, self.__y_min)
+        y_max = min(y_max, self.__y_min + self.__y_span - 1)
+        if x_min > x_max or y_min > y_max:
+            return np.empty(0, dtype=np.intp)
+
+        xs = np.arange(x_min, x_max + 1)
+        starts = np.searchsorted(
+            self.__keys, self.__get_key(xs, y_min), side="left")
+        ends = np.searchsorted(
+            self.__keys, self.__get_key(xs, y_max), side="right")
+
+        # Concatenate the ranges [start, end) of each ToF channel
+        lengths = ends - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(lengths.sum()) + np.repeat(
+            starts - offsets, lengths)
+        indices = self.__order[positions]
+        indices.sort()
+        return indices
+
+
+class EventHistogram:
+    """Cache of ToF-E histograms of an EventStore's events.
+
+    Histograms are binned like numpy.histogram2d and cached by their bin
+    counts and range. A histogram whose bin counts divide the bin counts of a
+    cached histogram is coarsened from the cached one instead of binning the
+    events again.
+    """
+    MAX_CACHED = 4
+    # Older histograms are dropped if the cached histograms have more bins
+    # than this in total. The latest histogram is always kept.
+    MAX_CACHED_BINS = 1 << 24
+    # Integer channels are binned through a lookup table if their span is
+    # at most this many channels.
+    MAX_LOOKUP_SIZE = 1 << 24
+
+    __slots__ = "store", "__limits", "__cache"
+
+    def __init__(self, store: EventStore):
+        """Initializes a new EventHistogram.
+
+        Args:
+            store: binned EventStore. The store is not expected to change
+                after the histogram has been created.
+        """
+        self.store = store
+        if len(store):
+            self.__limits = (
+                (store.tof.min().item(), store.tof.max().item()),
+                (store.energy.min().item(), store.energy.max().item()))
+        else:
+            self.__limits = None
+        self.__cache = {}
+
+    def get_data_limits(self):
+        """Returns the minimum and maximum ToF and energy as two [min, max]
+        lists. The lists are empty if there are no events.
+        """
+        if self.__limits is None:
+            return [[], []]
+        return [list(lim) for lim in self.__limits]
+
+    def get_histogram(self, bin_counts: Tuple[int, int],
+                      axes_range=None) -> \
+            Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the histogram of the events. ToF is on the first axis and
+        energy on the second.
+
+        Args:
+            bin_counts: number of ToF bins and number of energy bins
+            axes_range: ToF range and energy range as (min, max) pairs.
+                Defaults to the minimum and maximum values of the events.
+
+        Return:
+            counts as an array of shape bin_counts, ToF bin edges and energy
+            bin edges
+        """
+        bin_counts = tuple(int(n) for n in bin_counts)
+        if min(bin_counts) < 1:
+            raise ValueError("Bin counts must be positive.")
+        axes_range = self.__resolve_range(axes_range)
+        key = bin_counts, axes_range
+        try:
+            counts, x_edges, y_edges = self.__cache.pop(key)
+        except KeyError:
+            x_edges, y_edges = (
+                np.linspace(lo, hi, n + 1)
+                for n, (lo, hi) in zip(bin_counts, axes_range))
+            counts = self.__coarsen(bin_counts, axes_range, x_edges, y_edges)
+            if counts is None:
+                counts = self.__bin_events(bin_counts, x_edges, y_edges)
+            counts.flags.writeable = False
+        # Most recently used histogram is kept last
+        self.__cache[key] = counts, x_edges, y_edges
+        while len(self.__cache) > 1 and (
+                len(self.__cache) > self.MAX_CACHED or
+                sum(c.size for c, *_ in self.__cache.values()) >
+                self.MAX_CACHED_BINS):
+            del self.__cache[next(iter(self.__cache))]
+        return counts, x_edges, y_edges
+
+    def __resolve_range(self, axes_range):
+        """Returns the range of the histogram as a hashable tuple.
+        """
+        if axes_range is None:
+            axes_range = self.__limits or ((0, 1), (0, 1))
+        resolved = []
+        for lo, hi in axes_range:
+            lo, hi = float(lo), float(hi)
+            if lo > hi:
+                raise ValueError("Minimum of the range was bigger than "
+                                 "maximum.")
+            if lo == hi:
+                # Same expansion as numpy.histogram2d
+                lo, hi = lo - 0.5, hi + 0.5
+            resolved.append((lo, hi))
+        return tuple(resolved)
+
+    def __coarsen(self, bin_counts, axes_range, x_edges,
+                  y_edges) -> Optional[np.ndarray]:
+        """Sums the bins of a cached finer histogram into the given bins.
+        Returns None if no cached histogram has matching bin edges.
+        """
+        nx, ny = bin_counts
+        for (counts_key, range_key), (counts, fine_x, fine_y) in \
+                reversed(self.__cache.items()):
+            if range_key != axes_range:
+                continue
+            fx, fy = counts_key
+            if fx % nx or fy % ny:
+                continue
+            kx, ky = fx // nx, fy // ny
+            if self.__bins_match(self.store.tof, fine_x, kx, x_edges, 0) and \
+                    self.__bins_match(self.store.energy, fine_y, ky, y_edges,
+                                      1):
+                return counts.reshape(nx, kx, ny, ky).sum(axis=(1, 3))
+        return None
+
+    def __bins_match(self, values: np.ndarray, fine_edges: np.ndarray,
+                     factor: int, edges: np.ndarray, axis: int) -> bool:
+        """Checks if every value falls into the same bin when fine bins are
+        merged by the given factor.
+        """
+        if self.__limits is None:
+            return True
+        v_min, v_max = self.__limits[axis]
+        if np.issubdtype(values.dtype, np.integer) and \
+                v_max - v_min < self.MAX_LOOKUP_SIZE:
+            # Edges are computed with floating point arithmetic so merged fine
+            # edges may differ slightly from the coarse edges. This only
+            # matters if a channel ends up on the other side of an edge.
+            channels = np.arange(v_min, v_max + 1)
+            return np.array_equal(_search_bins(channels, fine_edges) // factor,
+                                  _search_bins(channels, edges))
+        return np.array_equal(fine_edges[::factor], edges)
+
+    def __bin_events(self, bin_counts, x_edges, y_edges) -> np.ndarray:
+        """Bins the events into a new histogram.
+        """
+        nx, ny = bin_counts
+        if self.__limits is None:
+            return np.zeros(bin_counts, dtype=np.int64)
+        x_bins = self.__get_bins(self.store.tof, x_edges, 0)
+        y_bins = self.__get_bins(self.store.energy, y_edges, 1)
+        # Events outside the range are counted into an extra bin at the end
+        # of each axis and then dropped.
+        counts = np.bincount(x_bins * (ny + 1) + y_bins,
+                             minlength=(nx + 1) * (ny + 1))
+        return counts.reshape(nx + 1, ny + 1)[:nx, :ny].copy()
+
+    def __get_bins(self, values: np.ndarray, edges: np.ndarray,
+                   axis: int) -> np.ndarray:
+        """Returns the bin index of each value. Values outside the edges get
+        the index of the bin after the last one.
+        """
+        v_min, v_max = self.__limits[axis]
+        if np.issubdtype(values.dtype, np.integer) and \
+                v_max - v_min < self.MAX_LOOKUP_SIZE:
+            # Bin each distinct channel once and look the events up
+            lookup = _search_bins(np.arange(v_min, v_max + 1), edges)
+            return lookup[np.subtract(values, v_min, dtype=np.intp)]
+        return _search_bins(values, edges)
+
+
+def _search_bins(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Returns the bin index of each value like numpy.histogram2d does.
+    Values outside the edges get the index of the bin after the last one.
+    """
+    n = len(edges) - 1
+    bins = np.searchsorted(edges, values, side="right") - 1
+    # The last bin includes its right edge
+    bins[values == edges[-1]] = n - 1
+    bins[bins < 0] = n
+    return bins
+
+
+def _as_column(values) -> np.ndarray:
+    """Returns the values as a 1-dimensional array of EVENT_DTYPE.
+    """
+    if values is None:
+        return np.empty(0, dtype=EVENT_DTYPE)
+    arr = np.asarray(values, dtype=EVENT_DTYPE)
+    if arr.ndim != 1:
+        raise ValueError("Event columns must be 1-dimensional.")
+    return arr
+
+
+def _parse_asc_lines(lines, first_line: int):
+    """Parses a chunk of lines from an .asc file.
+
+    Uniform chunks are parsed in bulk. If the chunk contains blank lines,
+    a varying number of columns or other irregularities, the chunk is parsed
+    line by line.
+
+    Args:
+        lines: list of strings
+        first_line: event number of the first line
+
+    Return:
+        tuple of (tof, energy, event_number, third) arrays. Third is None if
+        the chunk had no three column lines.
+    """
+    try:
+        arr = np.loadtxt(lines, dtype=np.int64, ndmin=2, comments=None)
+    except (ValueError, OverflowError):
+        arr = None
+    # loadtxt skips empty lines, which would shift the event numbers
+    if arr is not None and arr.shape[0] == len(lines) and \
+            arr.shape[1] in (2, 3):
+        info = np.iinfo(EVENT_DTYPE)
+        out_of_range = np.flatnonzero(
+            ((arr < info.min) | (arr > info.max)).any(axis=1))
+        if out_of_range.size:
+            _raise_out_of_range(first_line + out_of_range[0])
+        event_number = np.arange(
+            first_line, first_line + len(lines), dtype=EVENT_DTYPE)
+        third = arr[:, 2].astype(EVENT_DTYPE) if arr.shape[1] == 3 \
+            else None
+        return (arr[:, 0].astype(EVENT_DTYPE),
+                arr[:, 1].astype(EVENT_DTYPE),
+                event_number,
+                third)
+
+    info = np.iinfo(EVENT_DTYPE)
+    tof, energy, third, event_number = [], [], [], []
+    has_third = False
+    for n, line in enumerate(lines, start=first_line):
+        split = line.split()
+        split_len = len(split)
+        if split_len not in (2, 3):
+            continue
+        values = [int(x) for x in split]
+        if any(x < info.min or x > info.max for x in values):
+            _raise_out_of_range(n)
+        tof.append(values[0])
+        energy.append(values[1])
+        event_number.append(n)
+        if split_len == 3:
+            third.append(values[2])
+            has_third = True
+        else:
+            third.append(0)
+
+    return (np.array(tof, dtype=EVENT_DTYPE),
+            np.array(energy, dtype=EVENT_DTYPE),
+            np.array(event_number, dtype=EVENT_DTYPE),
+            np.array(third, dtype=EVENT_DTYPE) if has_third else None)
+
+
+def _raise_out_of_range(line_number: int):
+    """Raises a ValueError for a line whose values do not fit in
+    EVENT_DTYPE.
+    """
+    raise ValueError(
+        f"Line {line_number} contains a value that is out of the range of "
+        f"{np.dtype(EVENT_DTYPE).name}.")
+
+
+def get_cache_files(asc_file: Path) -> Tuple[Path, Path]:
+    """Returns the paths to the sidecar data and info files of an .asc file.
+    """
+    asc_file = Path(asc_file)
+    return (asc_file.with_name(f"{asc_file.stem}{_CACHE_DATA_SUFFIX}"),
+            asc_file.with_name(f"{asc_file.stem}{_CACHE_INFO_SUFFIX}"))
+
+
+def load_events(asc_file: Path, use_cache: bool = True) -> EventStore:
+    """Loads events of an .asc file.
+
+    If use_cache is True and the sidecar cache of the file is valid, events
+    are memory-mapped from the cache. Otherwise the .asc file is parsed and
+    a new cache is written.
+
+    Args:
+        asc_file: path to an .asc file
+        use_cache: whether sidecar cache is used
+
+    Return:
+        EventStore
+    """
+    if not use_cache:
+        return EventStore.from_asc_file(asc_file)
+
+    store = read_cache(asc_file)
+    if store is not None:
+        return store
+
+    # Source is identified before parsing so that changes made to the file
+    # during parsing invalidate the cache.
+    source_info = _get_source_info(Path(asc_file))
+    store = EventStore.from_asc_file(asc_file)
+    try:
+        write_cache(store, asc_file, source_info=source_info)
+    except OSError as e:
+        logging.getLogger("request").warning(
+            f"Could not write event cache for {asc_file}: {e}")
+    return store
+
+
+def _get_source_info(asc_file: Path, with_md5: bool = True):
+    """Returns a dictionary that identifies the contents of the .asc file.
+    """
+    stat = asc_file.stat()
+    info = {
+        "version": _CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    if with_md5:
+        with asc_file.open("r") as f:
+            info["md5"] = gf.md5_for_file(f).hex()
+    return info
+
+
+def read_cache(asc_file: Path) -> Optional[EventStore]:
+    """Returns the events from the sidecar cache of the .asc file or None if
+    there is no valid cache.
+
+    The cache is valid if the size and modification time of the .asc file
+    match the ones stored in the cache. If only the modification time
+    differs, the MD5 checksum of the file is compared instead.
+    """
+    asc_file = Path(asc_file)
+    data_file, info_file = get_cache_files(asc_file)
+    try:
+        with info_file.open("r") as f:
+            cached_info = json.load(f)
+        source_info = _get_source_info(asc_file, with_md5=False)
+        if cached_info["version"] != source_info["version"] or \
+                cached_info["size"] != source_info["size"]:
+            return None
+        if cached_info["mtime_ns"] != source_info["mtime_ns"]:
+            source_info = _get_source_info(asc_file)
+            if cached_info["md5"] != source_info["md5"]:
+                return None
+            # Contents are the same, so just update the modification time
+            cached_info["mtime_ns"] = source_info["mtime_ns"]
+            _write_info(cached_info, info_file)
+
+        columns = np.load(data_file, mmap_mode="r")
+        if columns.dtype != EVENT_DTYPE or columns.ndim != 2 or \
+                columns.shape[0] not in (3, 4):
+            return None
+        tof, energy, event_number, *third = columns
+        return EventStore(
+            tof, energy, event_number, third=third[0] if third else None)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cache(store: EventStore, asc_file: Path,
+                source_info: Optional[dict] = None):
+    """Writes the events into a sidecar cache of the given .asc file.
+
+    Args:
+        store: events parsed from the asc_file
+        asc_file: path to the .asc file
+        source_info: size, modification time and checksum of the asc_file at
+            the time it was parsed. Read from the file if None.
+    """
+    with CacheWriter(asc_file, len(store), has_third=store.has_third(),
+                     source_info=source_info) as writer:
+        writer.write(store.tof, store.energy, store.event_number,
+                     third=store.third)
+
+
+class CacheWriter:
+    """Writes the sidecar cache of an .asc file in chunks so that all
+    events do not have to be held in memory at once.
+
+    The cache is written into a temporary file that replaces the old cache
+    when the writer is closed. If an exception is raised within the
+    context, the temporary file is removed and the old cache is kept.
+    """
+    __slots__ = "asc_file", "event_count", "source_info", "__columns", \
+                "__position", "__tmp_file"
+
+    def __init__(self, asc_file: Path, event_count: int,
+                 has_third: bool = False,
+                 source_info: Optional[dict] = None):
+        """Initializes a new CacheWriter.
+
+        Args:
+            asc_file: path to the .asc file
+            event_count: total number of events that will be written
+            has_third: whether events have a third ADC value
+            source_info: size, modification time and checksum of the
+                asc_file. Read from the file when the writer is closed if
+                None.
+        """
+        self.asc_file = Path(asc_file)
+        self.event_count = event_count
+        self.source_info = source_info
+        self.__position = 0
+        data_file, _ = get_cache_files(self.asc_file)
+        self.__tmp_file = data_file.with_name(f"{data_file.name}.tmp")
+        # Data is stored in a (columns, events) array so that each column is
+        # contiguous in the memory-mapped file.
+        self.__columns = np.lib.format.open_memmap(
+            self.__tmp_file, mode="w+", dtype=EVENT_DTYPE,
+            shape=(4 if has_third else 3, event_count))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self.close()
+        finally:
+            self.__columns = None
+            gf.remove_files(self.__tmp_file)
+
+    def write(self, tof: np.ndarray, energy: np.ndarray,
+              event_number: np.ndarray, third: Optional[np.ndarray] = None):
+        """Writes the next chunk of events.
+        """
+        start, end = self.__position, self.__position + len(tof)
+        if end > self.event_count:
+            raise ValueError("More events written than expected.")
+        columns = [tof, energy, event_number]
+        if len(self.__columns) == 4:
+            columns.append(third if third is not None else 0)
+        for i, column in enumerate(columns):
+            self.__columns[i, start:end] = column
+        self.__position = end
+
+    def close(self):
+        """Moves the written cache in place of the old one.
+        """
+        if self.__position != self.event_count:
+            raise ValueError(
+                f"Expected {self.event_count} events, got {self.__position}.")
+        self.__columns.flush()
+        self.__columns = None
+        data_file, info_file = get_cache_files(self.asc_file)
+        if self.source_info is None:
+            self.source_info = _get_source_info(self.asc_file)
+        os.replace(self.__tmp_file, data_file)
+        _write_info(self.source_info, info_file)
+
+
+def remove_cache(asc_file: Path):
+    """Removes the sidecar cache files of the given .asc file.
+    """
+    gf.remove_files(*get_cache_files(asc_file))
+
+
+def _write_info(info, info_file: Path):
+    """Writes cache info as json.
+    """
+    tmp_file = info_file.with_name(f"{info_file.name}.tmp")
+    with tmp_file.open("w") as f:
+        json.dump(info, f, indent=4)
+    os.replace(tmp_file, info_file)
@@ -33,6 +33,7 @@ __version__ = "2.0"
 
 import bisect
 import hashlib
+import logging
 import os
 import platform
 import shutil
@@ -42,6 +43,8 @@ import time
 import functools
 import sys
 
+import numpy as np
+
 from timeit import default_timer as timer
 from pathlib import Path
 from decimal import Decimal
@@ -55,7 +58,8 @@ from typing import Iterable
 from typing import Tuple
 from typing import TypeVar
 
-from . import subprocess_utils as sutils
+from . import coincidence
+from . import histogram
 
 T = TypeVar("T")
 
@@ -194,9 +198,10 @@ def hist(data, col=0, weight_col=None, width=1.0):
 
     Python version of Arstila's hist code. This purpose is to format data's
     column at certain widths so the graph won't include all information.
+    Rows are histogrammed with histogram.calculate.
 
     Args:
-        data: List representation of data.
+        data: List of rows or a 2D array.
         col: column that contains the values to be histogrammed
         weight_col: column that contains weights for each row of data
         width: width of histogrammed bins.
@@ -204,27 +209,17 @@ def hist(data, col=0, weight_col=None, width=1.0):
     Return:
         Returns formatted list to use in graphs.
     """
-    if not data:
+    if len(data) == 0:
         return []
-    data_sliced = tuple(
-        (float(row[col]), float(row[weight_col])
-         if weight_col is not None else 1)
-        for row in data)
-    data_sliced = sorted(data_sliced, key=lambda x: x[0], reverse=False)
-    data_length = len(data_sliced)
-
-    a = int(data_sliced[0][0] / width) * width
-    i = 0
-    hist_list = []
-    while i < data_length:
-        b = 0.0
-        while i < data_length and data_sliced[i][0] < a:
-            b += data_sliced[i][1]
-            i += 1
-        hist_list.append((a - (width / 2.0), b))
-        a += width
-
-    return hist_list
+    if isinstance(data, np.ndarray):
+        values = data[:, col]
+        weights = data[:, weight_col] if weight_col is not None else None
+    else:
+        values = [float(row[col]) for row in data]
+        weights = [float(row[weight_col]) for row in data] \
+            if weight_col is not None else None
+    positions, sums = histogram.calculate(values, weights, width=width)
+    return list(zip(positions.tolist(), sums.tolist()))
 
 
 def copy_file_to_temp(file: Path) -> Path:
@@ -346,69 +341,34 @@ def coinc(input_file: Path, skip_lines: int, tablesize: int,
                 timings.
         output_file: Path to destination file. If None, the results will not
             be written to file.
-        columns: Columns to parse from output.
+        columns: awk style selection of the columns to output, such as
+            '$3,$5'.
         nevents: An integer representing limit of how many events will the
                  program look for. 0 means no limit.
         timediff: A boolean representing whether timediff is output or not.
         verbose: Whether errors are printed to console or not.
 
     Return:
-        The output of coinc as a list
+        selected columns of the coincidences as a list of lines
     """
-    # TODO consider replacing awk with something else so there is no need to
-    #   rely on an external dependency. Parsing individual lines with CSVParser
-    #   is too slow.
-    timings = (
-        (f"--low={key},{low}", f"--high={key},{high}")
-        for key, (low, high) in timing.items()
-    )
-    timings = [s for tpl in timings for s in tpl]
-
-    col_split = columns.split(',')
-    if not (all(col_split) and timings):
+    if not (all(columns.split(",")) and timing):
         return []
 
-    if timediff:
-        timediff_str = "--timediff"
-    else:
-        timediff_str = ""
-
-    bin_dir = get_bin_dir()
-
-    if platform.system() != "Windows":
-        executable = "./coinc"
-        awk_cmd = "awk", f"{{print {columns}}}"
-    else:
-        executable = bin_dir / "coinc.exe"
-        awk_cmd = str(get_bin_dir() / "awk.exe"), f"{{print {columns}}}"
-
-    coinc_cmd = (
-        str(executable),
-        "--silent",
-        f"--skip={skip_lines}",
-        f"--tablesize={tablesize}",
-        f"--trigger={trigger}",
-        f"--nadc={adc_count}",
-        timediff_str,
-        *timings,
-        f"--nevents={nevents}",
-        str(input_file),
-    )
-
-    kwargs = {
-        "cwd": bin_dir,
-        "stdout": subprocess.PIPE,
-        "stderr": None if verbose else subprocess.DEVNULL,
-        "universal_newlines": True,
-    }
-
     try:
-        with subprocess.Popen(coinc_cmd, **kwargs) as coinc_proc:
-            with subprocess.Popen(
-                    awk_cmd, stdin=coinc_proc.stdout, **kwargs) as awk_proc:
-                data = sutils.process_output(awk_proc, file=output_file)
-                return data
-    except OSError:
+        indices = coincidence.parse_columns(columns)
+        coincidences = coincidence.find_coincidences(
+            input_file, skip_lines=skip_lines, tablesize=tablesize,
+            trigger=trigger, adc_count=adc_count, timing=timing,
+            nevents=nevents, timediff=timediff)
+        data = coincidence.format_lines(coincidences, indices)
+        if output_file is not None:
+            with output_file.open("w") as file:
+                file.writelines(data)
+        return data
+    except (OSError, ValueError) as e:
+        if verbose:
+            logging.getLogger("request").error(
+                f"Could not calculate coincidences: {e}")
         return []
 
 
@@ -635,6 +595,12 @@ def get_data_dir() -> Path:
     return _get_external_dir() / "share"
 
 
+def get_lib_dir() -> Path:
+    """Returns absolute path to Potku's shared library directory.
+    """
+    return _get_external_dir() / "lib"
+
+
 # When running Potku as a bundle created by PyInstaller, the absolute path
 # to root folder is stored as the value of sys._MEIPASS attribute:
 # https://pyinstaller.readthedocs.io/en/stable/runtime-information.html?
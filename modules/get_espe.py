@@ -42,6 +42,7 @@ from . import subprocess_utils as sutils
 from .beam import Beam
 from .detector import Detector
 from .target import Target
+from .parsing import ArrayParser
 from .parsing import CSVParser
 from .base import Espe
 
@@ -89,7 +90,7 @@ class GetEspe:
         self.solid = solid
         self.recoil_file = recoil_file
         self.erd_file = erd_file
-        self._output_parser = CSVParser((0, float), (1, float))
+        self._output_parser = ArrayParser((0, float), (1, float))
 
     @staticmethod
     def calculate_simulated_spectrum(
@@ -167,13 +168,15 @@ class GetEspe:
                 for line in self.read_erd_files():
                     stdin.write(line)
 
-            espe = sutils.process_output(
+            columns = sutils.process_output(
                 espe_process,
                 parse_func=self._output_parser.parse_str,
                 file=output_file,
-                text_func=lambda x: f"{x[0]} {x[1]}\n")
+                text_func=self._output_parser.to_text,
+                output_func=self._output_parser.concatenate,
+                block_size=self._output_parser.BLOCK_SIZE)
 
-        return espe
+        return self._output_parser.to_rows(columns)
 
     def read_erd_files(self) -> Iterable[str]:
         """Yields lines from ERD files.
@@ -32,11 +32,13 @@ __version__ = "2.0"
 
 import configparser
 import functools
+import os
 
 from .enums import CrossSection
 from .enums import IonDivision
 from .enums import ToFEColorScheme
 from pathlib import Path
+from typing import Optional
 
 
 def handle_exceptions(return_value=None, attr=None):
@@ -83,6 +85,15 @@ class GlobalSettings:
     MIN_CONC_LIMIT = 1e-6
     _DEFAULT_CONC_LIMIT = 1e-4
 
+    # Default maximum size of the depth file cache in megabytes
+    _DEFAULT_DEPTH_CACHE_SIZE = 500
+
+    # Default maximum size of the tof_list cache directory in megabytes
+    _DEFAULT_TOF_LIST_CACHE_SIZE = 500
+
+    # Default maximum number of MCERD processes running at the same time
+    _DEFAULT_CORE_BUDGET = os.cpu_count() or 1
+
     def __init__(self, config_dir=None, save_on_creation=True):
         """Inits GlobalSettings class.
         """
@@ -258,6 +269,23 @@ class GlobalSettings:
         """
         self._config[self._DEFAULT]["preview_coincidence_count"] = str(count)
 
+    @handle_exceptions(return_value=False)
+    def get_binary_cut_files(self) -> bool:
+        """Get whether new cut files are saved in the binary format.
+
+        Return:
+            Returns a boolean representing if cut files are binary.
+        """
+        return self._config.getboolean(self._DEFAULT, "binary_cut_files")
+
+    def set_binary_cut_files(self, value: bool):
+        """Set whether new cut files are saved in the binary format.
+
+        Args:
+            value: A boolean representing if cut files are binary.
+        """
+        self._config[self._DEFAULT]["binary_cut_files"] = str(value)
+
     @handle_exceptions(return_value=CrossSection.ANDERSEN)
     def get_cross_sections(self) -> CrossSection:
         """Get cross section model to be used in depth profile.
@@ -363,6 +391,75 @@ class GlobalSettings:
         """
         self._config[self._DEPTH_PROFILE]["num_iter"] = str(value)
 
+    def get_depth_cache_directory(self) -> Path:
+        """Get the directory where generated depth files are cached.
+        Defaults to a directory inside the config directory.
+        """
+        directory = self._config[self._DEPTH_PROFILE].get("cache_directory")
+        if not directory:
+            return self.get_config_dir() / "cache" / "depth_files"
+        return Path(directory).resolve()
+
+    def set_depth_cache_directory(self, directory: Path):
+        """Set the directory where generated depth files are cached.
+
+        Args:
+            directory: path to the cache directory
+        """
+        self._config[self._DEPTH_PROFILE]["cache_directory"] = str(
+            Path(directory).resolve())
+
+    @handle_exceptions(return_value=_DEFAULT_DEPTH_CACHE_SIZE)
+    def get_depth_cache_size(self) -> int:
+        """Get the maximum size of the depth file cache in megabytes.
+        Least recently used depth files are removed when the cache grows
+        larger. Zero disables the cache.
+        """
+        return max(self._config.getint(self._DEPTH_PROFILE, "cache_size"), 0)
+
+    def set_depth_cache_size(self, value: int):
+        """Set the maximum size of the depth file cache in megabytes.
+
+        Args:
+            value: size in megabytes. Zero disables the cache.
+        """
+        self._config[self._DEPTH_PROFILE]["cache_size"] = str(max(value, 0))
+
+    def get_tof_list_cache_directory(self) -> Path:
+        """Get the directory where tof_list results of cut files are cached.
+        Defaults to a directory inside the config directory.
+        """
+        directory = self._config[self._DEFAULT].get("tof_list_cache_directory")
+        if not directory:
+            return self.get_config_dir() / "cache" / "tof_list"
+        return Path(directory).resolve()
+
+    def set_tof_list_cache_directory(self, directory: Path):
+        """Set the directory where tof_list results of cut files are cached.
+
+        Args:
+            directory: path to the cache directory
+        """
+        self._config[self._DEFAULT]["tof_list_cache_directory"] = str(
+            Path(directory).resolve())
+
+    @handle_exceptions(return_value=_DEFAULT_TOF_LIST_CACHE_SIZE)
+    def get_tof_list_cache_size(self) -> int:
+        """Get the maximum size of the tof_list cache directory in megabytes.
+        Zero keeps the cached results only in memory.
+        """
+        return max(
+            self._config.getint(self._DEFAULT, "tof_list_cache_size"), 0)
+
+    def set_tof_list_cache_size(self, value: int):
+        """Set the maximum size of the tof_list cache directory in megabytes.
+
+        Args:
+            value: size in megabytes. Zero keeps the cached results only in
+                memory.
+        """
+        self._config[self._DEFAULT]["tof_list_cache_size"] = str(max(value, 0))
+
     @handle_exceptions(return_value=ToFEColorScheme.DEFAULT)
     def get_tofe_color(self) -> ToFEColorScheme:
         """Get color of the ToF-E Histogram.
@@ -521,6 +618,38 @@ class GlobalSettings:
         """
         self._config[self._SIMULATION]["ion_division"] = str(int(value))
 
+    @handle_exceptions(return_value=_DEFAULT_CORE_BUDGET)
+    def get_core_budget(self) -> int:
+        """Returns the maximum number of MCERD processes that may run at the
+        same time in a request. Defaults to the number of CPUs.
+        """
+        return max(self._config.getint(self._SIMULATION, "core_budget"), 1)
+
+    def set_core_budget(self, value: int):
+        """Sets the maximum number of MCERD processes that may run at the
+        same time in a request. Must be at least 1.
+        """
+        self._config[self._SIMULATION]["core_budget"] = str(max(value, 1))
+
+    def get_mcerd_spool_directory(self) -> Optional[Path]:
+        """Returns the spool directory that is shared with MCERD workers or
+        None if MCERD is run locally.
+        """
+        directory = self._config[self._SIMULATION].get("spool_directory")
+        if not directory:
+            return None
+        return Path(directory).resolve()
+
+    def set_mcerd_spool_directory(self, directory: Optional[Path]):
+        """Sets the spool directory that is shared with MCERD workers. If
+        directory is None, MCERD is run locally.
+        """
+        if directory is None:
+            self._config[self._SIMULATION]["spool_directory"] = ""
+        else:
+            self._config[self._SIMULATION]["spool_directory"] = str(
+                Path(directory).resolve())
+
     @handle_exceptions(return_value=_DEFAULT_CONC_LIMIT)
     def get_minimum_concentration(self) -> float:
         """Returns the minimum concentration that can be set in recoil atom
@@ -29,6 +29,8 @@ __version__ = "2.0"
 
 import math
 
+import numpy as np
+
 from decimal import Decimal
 from typing import Tuple
 from shapely.geometry import Polygon
@@ -331,7 +333,7 @@ def _calculate_bin_count(lst, comp, min_count, max_count, data_sorted):
         raise ValueError("Minimum bin count was bigger than maximum")
     if comp <= 0:
         raise ValueError("Compression must be non-negative.")
-    if not lst:
+    if len(lst) == 0:
         return int(min_count), None
 
     if data_sorted:
@@ -350,8 +352,10 @@ def _calculate_bin_count(lst, comp, min_count, max_count, data_sorted):
 
 
 def get_min_and_max(lst):
-    """Returns both minimum and maximum values from a list.
+    """Returns both minimum and maximum values from a list or an array.
     """
+    if isinstance(lst, np.ndarray):
+        return lst.min(), lst.max()
     return min(lst), max(lst)
 
 
@@ -383,6 +387,43 @@ def point_inside_polygon(point, poly):
     return inside
 
 
+def points_inside_polygon(x, y, poly):
+    """Vectorized version of point_inside_polygon. Finds out which of the
+    points given as x and y arrays are inside a polygon "poly".
+
+    Uses the same crossing number rules as point_inside_polygon so both
+    functions classify points on the edges of the polygon identically.
+
+    Args:
+        x: array of x coordinates
+        y: array of y coordinates
+        poly: a list of (x, y) pairs
+
+    Return:
+        boolean array that is True for the points that are inside the polygon
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(x.shape, dtype=bool)
+    n = len(poly)
+    if n == 0:
+        return inside
+
+    for i in range(n):
+        p1x, p1y = poly[i - 1]
+        p2x, p2y = poly[i]
+        if p1y == p2y:
+            # Horizontal edges are never crossed
+            continue
+        crosses = (y > min(p1y, p2y)) & (y <= max(p1y, p2y)) & \
+            (x <= max(p1x, p2x))
+        if p1x != p2x:
+            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+            crosses &= x <= xinters
+        inside ^= crosses
+    return inside
+
+
 def distance(p0, p1):
     """Distance between points
 
@@ -28,14 +28,15 @@ __author__ = "Severi Jääskeläinen \n Samuel Kaiponen \n Heta Rekilä \n" \
              "Sinikka Siironen \n Juhani Sundell"
 __version__ = "2.0"
 
+import hashlib
+import os
 import platform
+import shutil
 import subprocess
 import re
-import multiprocessing
 import rx
 
 from . import general_functions as gf
-from . import subprocess_utils as sutils
 from . import observing
 
 from typing import Optional
@@ -45,11 +46,13 @@ from typing import Mapping
 from typing import Any
 from pathlib import Path
 from rx import operators as ops
-from rx.scheduler import ThreadPoolScheduler
 
 from .layer import Layer
 from .concurrency import CancellationToken
 from .base import StrTuple
+from .mcerd_executor import MCERDExecutor
+from .mcerd_executor import get_executor
+from .process_reactor import Termination
 
 
 class MCERD:
@@ -58,9 +61,9 @@ class MCERD:
     files it needs.
     """
     __slots__ = "_settings", "_rec_filename", "_filename", \
-                "recoil_file", "sim_dir", "result_file", "target_file", \
-                "command_file", "detector_file", "foils_file", \
-                "presimulation_file", "_seed"
+                "recoil_file", "sim_dir", "work_dir", "result_file", \
+                "target_file", "command_file", "detector_file", "foils_file", \
+                "presimulation_file", "output_file", "_seed"
 
     # These are the keys that exist in the parsed output from MCERD
     SEED = "seed"
@@ -85,13 +88,31 @@ class MCERD:
     _FINAL_STARTS = "Opening target file "
     _FINAL_ENDS = "angave "
 
+    # Name of the directory under sim_dir that contains the private working
+    # directories of each process
+    WORK_DIR = "mcerd"
+
+    # Lines of the command and detector files that do not affect the
+    # presimulation
+    _NOT_IN_PRESIMULATION = (
+        "Target description file:",
+        "Detector description file:",
+        "Recoiling material distribution:",
+        "Presimulation * result file:",
+        "Number of ions:",
+        "Seed number of the random number generator:",
+        "Description file for the detector foils:",
+    )
+
     def __init__(self, seed: int, settings: Mapping, file_prefix: str,
                  optimize_fluence: bool = False):
         """Create an MCERD object.
 
         Args:
             seed: seed for RNG
-            settings: All settings that MCERD needs in one dictionary.
+            settings: All settings that MCERD needs in one dictionary. If
+                settings contain a 'presimulation_file', the presimulation
+                results are copied from that file.
             file_prefix: prefix used for various simulation files
             optimize_fluence: whether fluence is optimized or not
         """
@@ -109,20 +130,30 @@ class MCERD:
 
         self.sim_dir = Path(self._settings["sim_dir"])
 
+        # Each process has its own working directory so that processes do
+        # not overwrite or remove each other's input files. Only the result
+        # file ends up in sim_dir.
+        self.work_dir = self.sim_dir / MCERD.WORK_DIR / \
+            f"{self._rec_filename}.{self._seed}"
+
         suffix = self._settings["simulation_type"].get_recoil_suffix()
 
         res_file = f"{self._rec_filename}.{self._seed}.erd"
 
-        # The recoil file and erd file are later passed to get_espe.
-        self.recoil_file = self.sim_dir / f"{self._rec_filename}.{suffix}"
+        # The erd file is later passed to get_espe.
         self.result_file = self.sim_dir / res_file
 
+        # MCERD writes its output files next to the command file so the
+        # result is first written to the working directory.
+        self.output_file = self.work_dir / res_file
+
         # These files will be deleted after the simulation
-        self.command_file = self.sim_dir / self._rec_filename
-        self.target_file = self.sim_dir / f"{self._filename}.erd_target"
-        self.detector_file = self.sim_dir / f"{self._filename}.erd_detector"
-        self.foils_file = self.sim_dir / f"{self._filename}.foils"
-        self.presimulation_file = self.sim_dir / f"{self._filename}.pre"
+        self.recoil_file = self.work_dir / f"{self._rec_filename}.{suffix}"
+        self.command_file = self.work_dir / self._rec_filename
+        self.target_file = self.work_dir / f"{self._filename}.erd_target"
+        self.detector_file = self.work_dir / f"{self._filename}.erd_detector"
+        self.foils_file = self.work_dir / f"{self._filename}.foils"
+        self.presimulation_file = self.work_dir / f"{self._filename}.pre"
 
     def get_command(self) -> StrTuple:
         """Returns the command that is used to start the MCERD process.
@@ -135,19 +166,17 @@ class MCERD:
         return cmd, str(self.command_file)
 
     def run(self, print_output=True, ct: Optional[CancellationToken] = None,
-            poll_interval=10, first_check=0.2, max_time=None,
-            ct_check=0.2) -> rx.Observable:
+            max_time=None,
+            executor: Optional[MCERDExecutor] = None) -> rx.Observable:
         """Starts the MCERD process.
 
         Args:
             print_output: whether MCERD output is also printed to console
             ct: token that is checked periodically to see if
                 the simulation should be stopped.
-            poll_interval: seconds between each check to see if the simulation
-                process is still running.
-            first_check: seconds until the first time mcerd is polled.
             max_time: maximum running time in seconds.
-            ct_check: how often cancellation is checked in seconds.
+            executor: executor that runs the process. Defaults to running
+                the process locally.
 
         Return:
             observable stream where each item is a dictionary. All dictionaries
@@ -155,67 +184,71 @@ class MCERD:
         """
         # Create files necessary to run MCERD
         self.create_mcerd_files()
-        cmd = self.get_command()
-        ct = ct or CancellationToken()
-
-        process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            cwd=gf.get_bin_dir(), universal_newlines=True)
-
-        errs = rx.from_iterable(iter(process.stderr.readline, ""))
-        outs = rx.from_iterable(iter(process.stdout.readline, ""))
-
-        is_running = MCERD.running_check(process, first_check, poll_interval)
-        ct_check = MCERD.cancellation_check(process, ct_check, ct)
-
-        if max_time is not None:
-            timeout = MCERD.timeout_check(process, max_time, ct)
-        else:
-            timeout = rx.empty()
-
-        thread_count = multiprocessing.cpu_count()
-        pool_scheduler = ThreadPoolScheduler(thread_count)
-
-        merged = rx.merge(errs, outs).pipe(
-            ops.subscribe_on(pool_scheduler),
-            MCERD.get_pipeline(
-                self._seed, self._rec_filename, print_output=print_output),
-            ops.combine_latest(rx.merge(
-                is_running, ct_check, timeout
-            )),
-            ops.starmap(lambda x, y: {
-                **x, **y,
-                MCERD.IS_RUNNING: x[MCERD.IS_RUNNING] and y[MCERD.IS_RUNNING]
-            }),
-            ops.take_while(lambda x: x[MCERD.IS_RUNNING], inclusive=True),
+        executor = executor or get_executor()
+
+        def parse(output: rx.Observable) -> rx.Observable:
+            lines = output.pipe(ops.filter(lambda x: isinstance(x, str)))
+            status = output.pipe(
+                ops.filter(lambda x: isinstance(x, Termination)),
+                ops.map(MCERD.get_status),
+                ops.start_with({MCERD.IS_RUNNING: True})
+            )
+            return lines.pipe(
+                MCERD.get_pipeline(
+                    self._seed, self._rec_filename, print_output=print_output,
+                    presim=self._settings["number_of_ions_in_presimu"] > 0),
+                ops.combine_latest(status),
+                ops.starmap(lambda x, y: {
+                    **x, **y,
+                    MCERD.IS_RUNNING:
+                        x[MCERD.IS_RUNNING] and y[MCERD.IS_RUNNING]
+                }),
+                ops.take_while(
+                    lambda x: x[MCERD.IS_RUNNING], inclusive=True),
+            )
+
+        merged = executor.execute(self, ct=ct, max_time=max_time).pipe(
+            ops.publish(parse)
         )
 
-        # on_completed does not get called if the take_while condition is
-        # inclusive so this is a quick fix to get the files deleted.
-        # TODO surely there is a way to get the on_completed called?
-        def del_if_not_running(x):
-            if not x[MCERD.IS_RUNNING]:
-                self.delete_unneeded_files()
-
+        # Files are deleted also when the subscription is disposed before
+        # the process has ended, e.g. when other processes were stopped.
         return merged.pipe(
-            ops.do_action(
-                on_next=del_if_not_running,
-                on_error=lambda _: self.delete_unneeded_files(),
-                on_completed=self.delete_unneeded_files)
+            ops.finally_action(self.delete_unneeded_files)
         )
 
+    def get_initial_status(self) -> Dict[str, Any]:
+        """Returns the status of the process before it has produced any
+        output.
+        """
+        return {
+            MCERD.SEED: self._seed,
+            MCERD.NAME: self._rec_filename,
+            MCERD.MSG: "",
+            MCERD.IS_RUNNING: True,
+            MCERD.CALCULATED: 0,
+            MCERD.TOTAL: 0,
+            MCERD.PERCENTAGE: 0,
+            MCERD.PRESIM: self._settings["number_of_ions_in_presimu"] > 0
+        }
+
     @staticmethod
-    def _stop_if_cancelled(
-            process: subprocess.Popen,
-            ct: CancellationToken) -> bool:
-        """Stops the process if cancellation has been requested. Returns
-        True if cancellation has not been requested and simulation is still
-        running, False otherwise.
+    def get_status(termination: Termination) -> Dict[str, Any]:
+        """Returns the status of an MCERD process that has ended.
         """
-        if ct.is_cancellation_requested():
-            sutils.kill_process(process)
-            return False
-        return True
+        if termination is Termination.CANCELLED:
+            return {
+                MCERD.IS_RUNNING: False,
+                MCERD.MSG: MCERD.SIM_STOPPED
+            }
+        if termination is Termination.TIMED_OUT:
+            return {
+                MCERD.IS_RUNNING: False,
+                MCERD.MSG: MCERD.SIM_TIMEOUT
+            }
+        return {
+            MCERD.IS_RUNNING: False
+        }
 
     @staticmethod
     def is_running(process: subprocess.Popen) -> bool:
@@ -231,7 +264,8 @@ class MCERD:
             f"MCERD stopped with an error code {res}.")
 
     @staticmethod
-    def get_pipeline(seed: int, name: str, print_output=False) -> rx.pipe:
+    def get_pipeline(seed: int, name: str, print_output=False,
+                     presim=True) -> rx.pipe:
         """Returns an rx pipeline that parses the raw output from MCERD
         into dictionaries.
 
@@ -244,6 +278,7 @@ class MCERD:
             seed: seed used in the MCERD process
             name: name of the process (usually the name of the recoil element)
             print_output: whether output is printed to console
+            presim: whether the process starts with a presimulation
         """
         # TODO add handling for fatal error messages
         return rx.pipe(
@@ -264,7 +299,7 @@ class MCERD:
                 MCERD.PRESIM: acc[MCERD.PRESIM] and x != MCERD.PRESIM_FINISHED,
                 **parse_raw_output(
                     x, end_at=lambda y: y.startswith(MCERD._FINAL_STARTS))
-            }, seed={MCERD.PRESIM: True}),
+            }, seed={MCERD.PRESIM: presim}),
             ops.scan(lambda acc, x: dict_accumulator(
                 acc, x, default={
                     MCERD.SEED: seed,
@@ -290,97 +325,18 @@ class MCERD:
             pass
         return ops.do_action(passer)
 
-    @staticmethod
-    def running_check(
-            process: subprocess.Popen,
-            first_check: float,
-            interval: float) -> rx.Observable:
-        """Periodically checks if the given process is running.
-
-        Args:
-            process: process to be monitored
-            first_check: seconds until the first check
-            interval: interval between each check
-
-        Return:
-            rx.Observable that fires dictionaries after each check
-        """
-        return rx.timer(first_check, interval).pipe(
-            # TODO change this to run at an increasing interval, i.e:
-            #       - first check after 0.0 seconds,
-            #       - second check after 0.2 seconds,
-            #       - third after 1.0, ... etc.
-            #   MCERD is likely to crash early (?) so it makes sense to
-            #   run the check more frequently at the beginning.
-            ops.map(lambda _: {
-                MCERD.IS_RUNNING: MCERD.is_running(process)
-            }),
-            ops.take_while(lambda x: x[MCERD.IS_RUNNING], inclusive=True)
-        )
-
-    @staticmethod
-    def cancellation_check(
-            process: subprocess.Popen,
-            interval: float,
-            ct: CancellationToken) -> rx.Observable:
-        """Kills the given process if cancellation is requested from the
-        CancellationToken.
-
-        Args:
-            process: process that will killed if cancellation is requested
-            interval: cancellation check interval in seconds
-            ct: CancellationToken that is being checked
-
-        Return:
-            rx.Observable that fires a single dictionary after cancellation is
-            requested
-        """
-        return rx.timer(0, interval).pipe(
-            ops.map(
-                lambda _: MCERD._stop_if_cancelled(process, ct)),
-            ops.first(lambda x: not x),
-            ops.map(lambda _: {
-                MCERD.IS_RUNNING: False,
-                MCERD.MSG: MCERD.SIM_STOPPED
-            }),
-        )
-
-    @staticmethod
-    def timeout_check(
-            process: subprocess.Popen,
-            timeout: float,
-            ct: CancellationToken) -> rx.Observable:
-        """Kills the given process after timeout has passed.
-
-        Args:
-            process: process to be killed
-            timeout: termination time in seconds
-            ct: CancellationToken
-
-        Return:
-            rx.Observable that fires only a single dictionary after the timeout
-            has passed.
-        """
-        return rx.timer(timeout).pipe(
-            ops.do_action(
-                # Request cancellation so all simulation processes that
-                # share the same cancellation_token are also stopped.
-                # TODO not working as intended if simulation is short enough
-                #   to stop before max_time has elapsed. Maybe let caller
-                #   implement its own timeout check when multiple processes
-                #   are being run.
-                on_next=lambda _: ct.request_cancellation()),
-            ops.map(lambda _: {
-                # sutils.kill_process returns None, which can be casted to bool
-                MCERD.IS_RUNNING: bool(sutils.kill_process(process)),
-                MCERD.MSG: MCERD.SIM_TIMEOUT
-            }),
-            ops.first()
-        )
-
     def create_mcerd_files(self):
         """Creates the temporary files needed for running MCERD.
         """
+        # Remove leftovers from an earlier process that used the same seed
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        try:
+            self.work_dir.mkdir(parents=True)
+        except FileNotFoundError:
+            # Another process removed the parent directory at the same time
+            self.work_dir.mkdir(parents=True)
+        self._link_result_file()
+
         # Create the main MCERD command file
         with open(self.command_file, "w") as file:
             file.write(self.get_command_file_contents())
@@ -401,6 +357,60 @@ class MCERD:
         with open(self.recoil_file, "w") as file:
             file.write(self.get_recoil_file_contents())
 
+        # Copy the results of an earlier presimulation
+        presimulation_file = self._settings.get("presimulation_file")
+        if presimulation_file is not None:
+            shutil.copyfile(presimulation_file, self.presimulation_file)
+
+    def get_presimulation_key(self) -> str:
+        """Returns a key that identifies the presimulation of this process.
+
+        Processes that have the same key produce the same presimulation
+        results regardless of their seeds and number of ions.
+        """
+        sha = hashlib.sha256()
+        for contents in (self.get_command_file_contents(),
+                         self.get_detector_file_contents(),
+                         self.get_target_file_contents(),
+                         self.get_foils_file_contents(),
+                         self.get_recoil_file_contents()):
+            for line in contents.splitlines():
+                if not line.startswith(MCERD._NOT_IN_PRESIMULATION):
+                    sha.update(line.encode("utf-8"))
+                    sha.update(b"\n")
+            sha.update(b"\0")
+        return sha.hexdigest()
+
+    def get_shared_presimulation_file(self) -> Path:
+        """Returns the path of the file where the presimulation results are
+        shared with other processes.
+        """
+        key = self.get_presimulation_key()[:16]
+        return self.sim_dir / f"{self._rec_filename}.{key}.pre"
+
+    def share_presimulation(self) -> bool:
+        """Copies the presimulation results of this process to the shared
+        presimulation file and removes presimulation files that were shared
+        with different settings.
+
+        Return:
+            True if the presimulation results were shared, False otherwise
+        """
+        shared_file = self.get_shared_presimulation_file()
+        tmp_file = self.work_dir / shared_file.name
+        try:
+            shutil.copyfile(self.presimulation_file, tmp_file)
+        except OSError:
+            return False
+        gf.remove_matching_files(
+            self.sim_dir, exts={".pre"},
+            filter_func=lambda f: f.startswith(f"{self._rec_filename}."))
+        try:
+            os.replace(tmp_file, shared_file)
+        except OSError:
+            return False
+        return True
+
     def get_recoil_file_contents(self) -> str:
         """Returns the contents of the recoil file.
         """
@@ -508,22 +518,49 @@ class MCERD:
 
         return "\n".join(cont)
 
+    def _link_result_file(self):
+        """Links the output file in the working directory to the result file
+        in sim_dir so that the results can be observed while MCERD is
+        running. If the file system does not support hard links, the output
+        file is moved to sim_dir once the process has finished.
+        """
+        self.result_file.touch()
+        try:
+            os.link(self.result_file, self.output_file)
+        except OSError:
+            gf.remove_files(self.result_file)
+
+    def _move_result_file(self) -> bool:
+        """Moves the output file from the working directory to sim_dir unless
+        it is already linked there. Returns False if the file could not be
+        moved.
+        """
+        try:
+            if self.result_file.exists() and \
+                    self.output_file.samefile(self.result_file):
+                return True
+            os.replace(self.output_file, self.result_file)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+
     def delete_unneeded_files(self):
         """Delete mcerd files that are not needed anymore.
-        """
-        # FIXME should only be called after the last process ends,
-        #   otherwise may remove files generated for other processes.
-        #   In that case GUI will show message
-        #       "MCERD stopped with an error code 10"
-        #   and console print may say something like:
-        #       "Fatal error: Could not open the target description file"
-        gf.remove_files(
-            self.command_file, self.detector_file, self.target_file,
-            self.foils_file)
 
-        gf.remove_matching_files(
-            self.sim_dir, exts={".out", ".dat", ".range", ".pre"},
-            filter_func=lambda f: f.startswith(self._rec_filename))
+        Only the working directory of this process is removed so this can be
+        called while other processes are still running.
+        """
+        if not self._move_result_file():
+            # Keep the working directory so the results are not lost
+            return
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        try:
+            # Fails if other processes are still using the directory
+            self.work_dir.parent.rmdir()
+        except OSError:
+            pass
 
 
 _pattern = re.compile(r"Calculated (?P<calculated>\d+) of (?P<total>\d+) ions "
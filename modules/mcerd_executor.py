@@ -0,0 +1,425 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+Executors that run MCERD processes either on the local machine or on
+worker nodes that share a spool directory.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import functools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+import rx
+
+from . import general_functions as gf
+
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from rx import operators as ops
+from rx.core.typing import Observer
+from rx.disposable import Disposable
+
+from .concurrency import CancellationToken
+from .process_reactor import LineDecoder
+from .process_reactor import ProcessReactor
+from .process_reactor import Termination
+from .process_reactor import Watch
+from .process_reactor import get_reactor
+
+
+class MCERDExecutor:
+    """Base class for executors that run MCERD processes.
+
+    An executor is given an MCERD object whose input files have already
+    been written to its working directory. The executor runs MCERD with
+    these files and makes sure that the output file of the MCERD object
+    contains the results.
+    """
+    __slots__ = ()
+
+    def execute(self, mcerd, ct: Optional[CancellationToken] = None,
+                max_time: Optional[float] = None) -> rx.Observable:
+        """Returns an observable that emits the lines MCERD writes to its
+        output followed by a Termination.
+
+        The observable must be subscribed to only once. If MCERD ends with an
+        error, the observable emits a SubprocessError instead of the
+        Termination.
+
+        Args:
+            mcerd: MCERD object to run
+            ct: MCERD is stopped when cancellation is requested from this
+                token
+            max_time: MCERD is stopped after running this many seconds.
+                Cancellation is also requested from ct so that other
+                processes that share the token are stopped.
+
+        Return:
+            observable stream of lines followed by a Termination
+        """
+        raise NotImplementedError
+
+
+def _check_exit(process: subprocess.Popen,
+                item: Union[str, Termination]) -> Union[str, Termination]:
+    """Raises SubprocessError if the process exited with an error code.
+    """
+    if item is Termination.EXITED and process.returncode:
+        raise subprocess.SubprocessError(
+            f"MCERD stopped with an error code {process.returncode}.")
+    return item
+
+
+class LocalExecutor(MCERDExecutor):
+    """Runs MCERD as a subprocess of this application.
+    """
+    __slots__ = "reactor",
+
+    def __init__(self, reactor: Optional[ProcessReactor] = None):
+        """Initializes a new LocalExecutor.
+
+        Args:
+            reactor: reactor that monitors the processes. Defaults to the
+                reactor that is shared by the whole application.
+        """
+        self.reactor = reactor or get_reactor()
+
+    def execute(self, mcerd, ct: Optional[CancellationToken] = None,
+                max_time: Optional[float] = None) -> rx.Observable:
+        """Starts the MCERD process and returns an observable that emits its
+        output. See MCERDExecutor.execute for details.
+        """
+        process = subprocess.Popen(
+            mcerd.get_command(), stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, cwd=gf.get_bin_dir())
+        return self.reactor.observe(process, ct=ct, max_time=max_time).pipe(
+            ops.map(lambda x: _check_exit(process, x))
+        )
+
+
+class SpoolJob:
+    """Names of the files that SpoolExecutor and SpoolWorker use to
+    communicate through a job directory.
+
+    A job directory contains the input files of MCERD and a manifest that is
+    written last. A worker claims the job by exclusively creating the claim
+    file and writes the output of MCERD to the output file. Once MCERD has
+    ended, the worker writes the exit file. The executor requests the worker
+    to stop MCERD by creating the cancel file.
+    """
+    MANIFEST = "job.json"
+    CLAIM = "job.claim"
+    OUTPUT = "job.out"
+    EXIT = "job.exit"
+    CANCEL = "job.cancel"
+
+    # Manifest keys
+    WORK_DIR = "work_dir"
+    COMMAND_FILE = "command_file"
+    STREAMED = "streamed"
+    COPIED = "copied"
+
+    # Exit file keys
+    RETURNCODE = "returncode"
+    ERROR = "error"
+
+    @staticmethod
+    def is_job_file(file: Path) -> bool:
+        """Checks if the file is one of the files used for communication.
+        """
+        return file.name.startswith("job.")
+
+    @staticmethod
+    def claim(job_dir: Path, claimant: str) -> bool:
+        """Tries to claim the job. Returns True if the job was not claimed
+        before.
+        """
+        try:
+            fd = os.open(job_dir / SpoolJob.CLAIM,
+                         os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError:
+            return False
+        with os.fdopen(fd, "w") as file:
+            file.write(claimant)
+        return True
+
+    @staticmethod
+    def is_job_dir(directory: Path) -> bool:
+        """Checks if the directory is a job directory that has been fully
+        written and is not being removed.
+        """
+        return not directory.name.startswith(".") and \
+            (directory / SpoolJob.MANIFEST).exists()
+
+    @staticmethod
+    def remove(job_dir: Path):
+        """Removes a job directory. The directory is renamed first so that
+        workers cannot claim it while it is being removed.
+        """
+        removed_dir = job_dir.with_name(f".{job_dir.name}")
+        try:
+            os.replace(job_dir, removed_dir)
+        except OSError:
+            return
+        shutil.rmtree(removed_dir, ignore_errors=True)
+
+    @staticmethod
+    def write_json(file: Path, contents: Dict):
+        """Writes the contents to a json file so that readers never see a
+        partially written file.
+        """
+        tmp_file = file.with_name(f"{file.name}.tmp")
+        with tmp_file.open("w") as f:
+            json.dump(contents, f)
+        os.replace(tmp_file, file)
+
+    @staticmethod
+    def get_claimant() -> str:
+        """Returns a string that identifies this process.
+        """
+        return f"{platform.node()}:{os.getpid()}"
+
+
+class _SpoolWatch(Watch):
+    """State of a single job that is monitored by SpoolExecutor.
+    """
+    __slots__ = "job_dir", "work_dir", "__decoder", "__position", \
+                "__streamed", "__copied"
+
+    def __init__(self, job_dir: Path, work_dir: Path, streamed: List[str],
+                 copied: List[str], observer: Observer,
+                 ct: Optional[CancellationToken] = None,
+                 max_time: Optional[float] = None):
+        super().__init__(observer, ct=ct, max_time=max_time)
+        self.job_dir = job_dir
+        self.work_dir = work_dir
+        self.__decoder = LineDecoder()
+        self.__position = 0
+        self.__streamed = {name: 0 for name in streamed}
+        self.__copied = {
+            name: _get_signature(job_dir / name) for name in copied
+        }
+
+    def read(self, final=False):
+        """Copies new results back to the working directory and emits the
+        complete lines that have been written to the output file.
+
+        Results are copied after the output has been read so that they are
+        up to date when the lines that announce them are emitted.
+        """
+        try:
+            with (self.job_dir / SpoolJob.OUTPUT).open("rb") as file:
+                file.seek(self.__position)
+                data = file.read()
+        except OSError:
+            data = b""
+        self.__position += len(data)
+        self.__sync(final=final)
+        for line in self.__decoder.decode(data, final=final):
+            self.emit(line)
+
+    def __sync(self, final=False):
+        """Appends complete lines of streamed files and copies changed files
+        to the working directory. If final is True, incomplete lines are
+        also appended.
+        """
+        for name, position in self.__streamed.items():
+            try:
+                with (self.job_dir / name).open("rb") as src:
+                    src.seek(position)
+                    data = src.read()
+                    if not final:
+                        data = data[:data.rfind(b"\n") + 1]
+                if data:
+                    with (self.work_dir / name).open("ab") as dst:
+                        dst.write(data)
+                    self.__streamed[name] = position + len(data)
+            except OSError:
+                pass
+        for name, signature in self.__copied.items():
+            src = self.job_dir / name
+            new_signature = _get_signature(src)
+            if new_signature is None or new_signature == signature:
+                continue
+            tmp_file = self.work_dir / f"{name}.tmp"
+            try:
+                shutil.copyfile(src, tmp_file)
+                os.replace(tmp_file, self.work_dir / name)
+                self.__copied[name] = new_signature
+            except OSError:
+                pass
+
+
+def _get_signature(file: Path) -> Optional[Tuple[int, int]]:
+    """Returns the size and the modification time of a file or None if the
+    file does not exist.
+    """
+    try:
+        stat = file.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class SpoolExecutor(MCERDExecutor):
+    """Runs MCERD on worker nodes that share a spool directory with this
+    application.
+
+    Each process is submitted as a job directory in the spool directory.
+    Workers (see modules.mcerd_worker) claim the jobs and run MCERD. The
+    output of MCERD and the result files are copied back while the job is
+    running so that the progress and the results can be observed the same
+    way as with a local process. All jobs are monitored in a single thread.
+    """
+    __slots__ = "spool_dir", "poll_interval", "__lock", "__thread", \
+                "__watches"
+
+    def __init__(self, spool_dir: Path, poll_interval: float = 0.2):
+        """Initializes a new SpoolExecutor.
+
+        Args:
+            spool_dir: directory that is shared with the workers
+            poll_interval: seconds between checking the state of the jobs
+        """
+        self.spool_dir = Path(spool_dir)
+        self.poll_interval = poll_interval
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__watches: List[_SpoolWatch] = []
+
+    def execute(self, mcerd, ct: Optional[CancellationToken] = None,
+                max_time: Optional[float] = None) -> rx.Observable:
+        """Submits the MCERD process to the workers and returns an
+        observable that emits its output. See MCERDExecutor.execute for
+        details.
+        """
+        job_dir = self.submit(mcerd)
+        streamed = [mcerd.output_file.name]
+        copied = [mcerd.presimulation_file.name]
+
+        def subscribe(observer: Observer, _=None) -> Disposable:
+            watch = _SpoolWatch(
+                job_dir, mcerd.work_dir, streamed, copied, observer, ct=ct,
+                max_time=max_time)
+            with self.__lock:
+                self.__watches.append(watch)
+                if self.__thread is None:
+                    self.__thread = threading.Thread(
+                        target=self.__run, name="SpoolExecutor", daemon=True)
+                    self.__thread.start()
+            return Disposable(watch.dispose)
+
+        return rx.create(subscribe)
+
+    def submit(self, mcerd) -> Path:
+        """Copies the input files of the MCERD process to a new job directory
+        and returns the path to the directory.
+        """
+        job_dir = self.spool_dir / f"{mcerd.work_dir.name}.{uuid.uuid4().hex}"
+        job_dir.mkdir(parents=True)
+        for file in mcerd.work_dir.iterdir():
+            if file.is_file() and file.name != mcerd.output_file.name:
+                shutil.copyfile(file, job_dir / file.name)
+        SpoolJob.write_json(job_dir / SpoolJob.MANIFEST, {
+            SpoolJob.WORK_DIR: str(mcerd.work_dir),
+            SpoolJob.COMMAND_FILE: mcerd.command_file.name,
+            SpoolJob.STREAMED: [mcerd.output_file.name],
+            SpoolJob.COPIED: [mcerd.presimulation_file.name]
+        })
+        return job_dir
+
+    def __run(self):
+        """Monitors the jobs until there are none left.
+        """
+        while True:
+            with self.__lock:
+                if not self.__watches:
+                    self.__thread = None
+                    return
+                watches = list(self.__watches)
+            time.sleep(self.poll_interval)
+            for watch in watches:
+                try:
+                    done = self.__check(watch)
+                except Exception as e:
+                    watch.error(e)
+                    done = True
+                if done:
+                    with self.__lock:
+                        self.__watches.remove(watch)
+
+    def __check(self, watch: _SpoolWatch) -> bool:
+        """Reads the output of the job and stops the job if it has been
+        cancelled or it has timed out. Returns True if the job has ended.
+        """
+        exit_file = watch.job_dir / SpoolJob.EXIT
+        if exit_file.exists():
+            watch.read(final=True)
+            with exit_file.open() as file:
+                status = json.load(file)
+            SpoolJob.remove(watch.job_dir)
+            if status.get(SpoolJob.ERROR):
+                watch.error(subprocess.SubprocessError(
+                    status[SpoolJob.ERROR]))
+            elif status.get(SpoolJob.RETURNCODE):
+                watch.error(subprocess.SubprocessError(
+                    f"MCERD stopped with an error code "
+                    f"{status[SpoolJob.RETURNCODE]}."))
+            else:
+                watch.complete()
+            return True
+
+        watch.read()
+        if watch.check_termination() is None:
+            return False
+
+        # The worker removes the job directory once it has stopped MCERD.
+        # If no worker has claimed the job or MCERD has already ended, the
+        # directory is removed here.
+        (watch.job_dir / SpoolJob.CANCEL).touch()
+        if SpoolJob.claim(watch.job_dir, SpoolJob.get_claimant()) or \
+                exit_file.exists():
+            SpoolJob.remove(watch.job_dir)
+        watch.complete()
+        return True
+
+
+@functools.lru_cache(maxsize=None)
+def get_executor(spool_dir: Optional[Path] = None) -> MCERDExecutor:
+    """Returns the executor that is shared by the whole application. If
+    spool_dir is given, the executor runs MCERD on the workers that use the
+    spool directory. Otherwise MCERD is run locally.
+    """
+    if spool_dir is None:
+        return LocalExecutor()
+    return SpoolExecutor(spool_dir)
@@ -0,0 +1,290 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+Scheduler that limits the number of MCERD processes that run at the same
+time across all simulations of a request.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import heapq
+import itertools
+import threading
+import time
+import rx
+
+from enum import IntEnum
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+from rx.core.typing import Observer
+from rx.disposable import Disposable
+
+from .concurrency import CancellationToken
+from .mcerd import MCERD
+
+
+class JobPriority(IntEnum):
+    """Priorities of MCERD jobs. Jobs with lower values are started first.
+    """
+    OPTIMIZATION = 0
+    SIMULATION = 1
+
+
+class _Job:
+    """MCERD process that has been submitted to MCERDScheduler.
+    """
+    __slots__ = "mcerd", "start", "priority", "ct", "observer", \
+                "queued_at", "wait_time", "running", "done", "disposable"
+
+    def __init__(self, mcerd: MCERD, start: Callable[[], rx.Observable],
+                 priority: JobPriority, ct: Optional[CancellationToken],
+                 observer: Observer):
+        self.mcerd = mcerd
+        self.start = start
+        self.priority = priority
+        self.ct = ct
+        self.observer = observer
+        self.queued_at = time.monotonic()
+        self.wait_time = 0.0
+        self.running = False
+        self.done = False
+        self.disposable = None
+
+
+class MCERDScheduler:
+    """Queues MCERD processes and starts them so that the number of running
+    processes does not exceed the core budget.
+
+    Jobs are started in the order of their priority and then in the order
+    they were submitted. Queued jobs whose cancellation has been requested
+    are removed from the queue without starting them.
+    """
+    __slots__ = "poll_interval", "__core_budget", "__lock", "__queue", \
+                "__running", "__counter", "__thread"
+
+    # Keys that are added to MCERD output
+    QUEUE_DEPTH = "queue_depth"
+    WAIT_TIME = "wait_time"
+
+    # Message of jobs that are waiting to be started
+    QUEUED = "Waiting for a free core"
+
+    def __init__(self, core_budget: Union[int, Callable[[], int]],
+                 poll_interval: float = 0.2):
+        """Initializes a new MCERDScheduler.
+
+        Args:
+            core_budget: maximum number of processes that may run at the
+                same time or a function that returns it. A function is
+                called each time jobs are started so changes take effect
+                without restarting the scheduler.
+            poll_interval: seconds between checking the cancellation of
+                queued jobs
+        """
+        self.poll_interval = poll_interval
+        self.__core_budget = core_budget
+        self.__lock = threading.Lock()
+        self.__queue: List[tuple] = []
+        self.__running = 0
+        self.__counter = itertools.count()
+        self.__thread = None
+
+    def get_core_budget(self) -> int:
+        """Returns the maximum number of processes that may run at the same
+        time.
+        """
+        if callable(self.__core_budget):
+            return max(self.__core_budget(), 1)
+        return max(self.__core_budget, 1)
+
+    def get_queue_depth(self) -> int:
+        """Returns the number of jobs waiting to be started.
+        """
+        with self.__lock:
+            return sum(1 for *_, job in self.__queue if not job.done)
+
+    def get_running_count(self) -> int:
+        """Returns the number of jobs that are running.
+        """
+        with self.__lock:
+            return self.__running
+
+    def submit(self, mcerd: MCERD, ct: Optional[CancellationToken] = None,
+               priority: JobPriority = JobPriority.SIMULATION,
+               **kwargs) -> rx.Observable:
+        """Returns an observable that queues the MCERD process when it is
+        subscribed to and runs it once there is room in the core budget.
+
+        Items are the same status dictionaries MCERD.run produces with the
+        queue depth and the seconds the job waited in the queue added to
+        them. A job that has to wait first emits a status with the QUEUED
+        message. A job that is cancelled while waiting emits a status with
+        the SIM_STOPPED message and completes.
+
+        Args:
+            mcerd: MCERD object to run
+            ct: CancellationToken that stops the process
+            priority: priority of the job
+            kwargs: keyword arguments passed down to MCERD's run method
+
+        Return:
+            observable stream of status dictionaries
+        """
+        def start() -> rx.Observable:
+            return mcerd.run(ct=ct, **kwargs)
+
+        def subscribe(observer: Observer, _=None) -> Disposable:
+            job = _Job(mcerd, start, priority, ct, observer)
+            if self.get_running_count() >= self.get_core_budget():
+                self.__emit(job, {
+                    **mcerd.get_initial_status(),
+                    MCERD.MSG: MCERDScheduler.QUEUED
+                })
+            with self.__lock:
+                heapq.heappush(
+                    self.__queue, (priority, next(self.__counter), job))
+            self.__dispatch()
+            return Disposable(lambda: self.__dispose(job))
+
+        return rx.create(subscribe)
+
+    def __emit(self, job: _Job, item: Dict[str, Any]):
+        """Emits an item to the observer of the job.
+        """
+        job.observer.on_next({
+            **item,
+            MCERDScheduler.QUEUE_DEPTH: self.get_queue_depth(),
+            MCERDScheduler.WAIT_TIME: job.wait_time
+        })
+
+    def __dispatch(self):
+        """Starts queued jobs while there is room in the core budget.
+        """
+        core_budget = self.get_core_budget()
+        jobs = []
+        cancelled = []
+        with self.__lock:
+            while self.__queue and self.__running < core_budget:
+                *_, job = heapq.heappop(self.__queue)
+                if job.done:
+                    continue
+                if job.ct is not None and job.ct.is_cancellation_requested():
+                    cancelled.append(job)
+                    continue
+                job.running = True
+                job.wait_time = time.monotonic() - job.queued_at
+                self.__running += 1
+                jobs.append(job)
+            if self.__queue and self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__watch, name="MCERDScheduler", daemon=True)
+                self.__thread.start()
+        for job in cancelled:
+            self.__cancel(job)
+        for job in jobs:
+            self.__start(job)
+
+    def __start(self, job: _Job):
+        """Starts the MCERD process of the job.
+        """
+        try:
+            observable = job.start()
+        except Exception as e:
+            if self.__finish(job):
+                job.observer.on_error(e)
+            return
+
+        def on_error(e):
+            if self.__finish(job):
+                job.observer.on_error(e)
+
+        def on_completed():
+            if self.__finish(job):
+                job.observer.on_completed()
+
+        job.disposable = observable.subscribe(
+            on_next=lambda x: self.__emit(job, x),
+            on_error=on_error,
+            on_completed=on_completed)
+
+    def __finish(self, job: _Job) -> bool:
+        """Marks the job as done and starts the next jobs. Returns False if
+        the job was already done.
+        """
+        with self.__lock:
+            if job.done:
+                return False
+            job.done = True
+            if job.running:
+                self.__running -= 1
+        self.__dispatch()
+        return True
+
+    def __cancel(self, job: _Job):
+        """Completes a queued job without starting it.
+        """
+        if not self.__finish(job):
+            return
+        try:
+            self.__emit(job, {
+                **job.mcerd.get_initial_status(),
+                MCERD.IS_RUNNING: False,
+                MCERD.MSG: MCERD.SIM_STOPPED
+            })
+            job.observer.on_completed()
+        except Exception as e:
+            job.observer.on_error(e)
+
+    def __dispose(self, job: _Job):
+        """Stops observing the job. A queued job is removed from the queue.
+        """
+        if job.disposable is not None:
+            job.disposable.dispose()
+        self.__finish(job)
+
+    def __watch(self):
+        """Removes cancelled jobs from the queue until the queue is empty.
+        """
+        while True:
+            time.sleep(self.poll_interval)
+            with self.__lock:
+                cancelled = [
+                    job for *_, job in self.__queue
+                    if not job.done and job.ct is not None and
+                    job.ct.is_cancellation_requested()
+                ]
+            for job in cancelled:
+                self.__cancel(job)
+            # Core budget may have been changed
+            self.__dispatch()
+            with self.__lock:
+                self.__queue = [
+                    entry for entry in self.__queue if not entry[-1].done]
+                heapq.heapify(self.__queue)
+                if not self.__queue:
+                    self.__thread = None
+                    return
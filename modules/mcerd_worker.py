@@ -0,0 +1,275 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+Worker that runs MCERD jobs submitted to a spool directory by
+SpoolExecutor. The worker can be run on any machine that can access the
+spool directory and has MCERD installed:
+
+    python run_mcerd_worker.py <spool directory>
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import threading
+
+from . import general_functions as gf
+from . import subprocess_utils as sutils
+
+from pathlib import Path
+from typing import IO
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from .mcerd_executor import SpoolJob
+
+
+class _RunningJob:
+    """MCERD process that has been started by SpoolWorker.
+    """
+    __slots__ = "job_dir", "process", "output"
+
+    def __init__(self, job_dir: Path, process: subprocess.Popen,
+                 output: IO[bytes]):
+        self.job_dir = job_dir
+        self.process = process
+        self.output = output
+
+
+class SpoolWorker:
+    """Claims jobs from a spool directory and runs MCERD for them.
+
+    Paths in the input files of a job refer to the working directory of the
+    process that submitted it. They are rewritten to refer to the job
+    directory before MCERD is started.
+    """
+    __slots__ = "spool_dir", "command", "max_jobs", "poll_interval", \
+                "__jobs", "__stop_event"
+
+    def __init__(self, spool_dir: Path,
+                 command: Optional[Sequence[str]] = None,
+                 max_jobs: Optional[int] = None, poll_interval: float = 0.5):
+        """Initializes a new SpoolWorker.
+
+        Args:
+            spool_dir: directory where the jobs are submitted
+            command: command that runs MCERD without the command file.
+                Defaults to the MCERD binary in the bin directory.
+            max_jobs: maximum number of MCERD processes that run at the
+                same time. Defaults to the number of CPUs.
+            poll_interval: seconds between checking the spool directory
+        """
+        self.spool_dir = Path(spool_dir)
+        if command is None:
+            if platform.system() == "Windows":
+                command = str(gf.get_bin_dir() / "mcerd.exe"),
+            else:
+                command = str(gf.get_bin_dir() / "mcerd"),
+        self.command = tuple(command)
+        self.max_jobs = max(max_jobs or os.cpu_count() or 1, 1)
+        self.poll_interval = poll_interval
+        self.__jobs: List[_RunningJob] = []
+        self.__stop_event = threading.Event()
+
+    def run(self):
+        """Runs jobs until stop is called. Processes that are still running
+        when the worker stops are killed.
+        """
+        self.__stop_event.clear()
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            while not self.__stop_event.wait(self.poll_interval):
+                self.poll()
+        finally:
+            for job in self.__jobs:
+                if job.process.poll() is None:
+                    sutils.kill_process(job.process)
+                    job.process.wait()
+                self.__finish(job, error="MCERD worker was stopped.")
+            self.__jobs.clear()
+
+    def stop(self):
+        """Stops the worker.
+        """
+        self.__stop_event.set()
+
+    def get_running_count(self) -> int:
+        """Returns the number of MCERD processes that are running.
+        """
+        return len(self.__jobs)
+
+    def poll(self):
+        """Checks the state of the running jobs and starts new ones.
+        """
+        for job in list(self.__jobs):
+            self.__check(job)
+        if len(self.__jobs) >= self.max_jobs:
+            return
+        for job_dir in self.get_pending_jobs():
+            if not SpoolJob.claim(job_dir, SpoolJob.get_claimant()):
+                continue
+            self.__start(job_dir)
+            if len(self.__jobs) >= self.max_jobs:
+                return
+
+    def get_pending_jobs(self) -> List[Path]:
+        """Returns the job directories that have not been claimed in the
+        order they were submitted.
+        """
+        jobs = []
+        try:
+            for job_dir in self.spool_dir.iterdir():
+                if not SpoolJob.is_job_dir(job_dir) or \
+                        (job_dir / SpoolJob.CLAIM).exists():
+                    continue
+                try:
+                    mtime = (job_dir / SpoolJob.MANIFEST).stat().st_mtime
+                except OSError:
+                    # The job was removed
+                    continue
+                jobs.append((mtime, job_dir))
+        except OSError:
+            pass
+        return [job_dir for _, job_dir in sorted(jobs)]
+
+    def __start(self, job_dir: Path):
+        """Starts MCERD for the job. Errors are reported in the exit file of
+        the job.
+        """
+        try:
+            with (job_dir / SpoolJob.MANIFEST).open() as file:
+                manifest = json.load(file)
+            SpoolWorker.rewrite_paths(
+                job_dir, manifest[SpoolJob.WORK_DIR], str(job_dir))
+            output = (job_dir / SpoolJob.OUTPUT).open("wb")
+        except (OSError, ValueError, KeyError) as e:
+            self.__write_error(job_dir, f"Could not read MCERD job: {e}")
+            return
+        try:
+            process = subprocess.Popen(
+                [*self.command,
+                 str(job_dir / manifest[SpoolJob.COMMAND_FILE])],
+                stdout=output, stderr=subprocess.STDOUT,
+                cwd=gf.get_bin_dir())
+        except OSError as e:
+            output.close()
+            self.__write_error(job_dir, f"Could not start MCERD: {e}")
+            return
+        logging.getLogger("mcerd_worker").info(f"Started {job_dir.name}")
+        self.__jobs.append(_RunningJob(job_dir, process, output))
+
+    @staticmethod
+    def __write_error(job_dir: Path, error: str):
+        """Reports a job that could not be started.
+        """
+        logging.getLogger("mcerd_worker").error(f"{job_dir.name}: {error}")
+        try:
+            SpoolJob.write_json(job_dir / SpoolJob.EXIT, {
+                SpoolJob.ERROR: error
+            })
+        except OSError:
+            # The job was removed
+            pass
+
+    def __check(self, job: _RunningJob):
+        """Kills the process if the job has been cancelled and finishes the
+        job if the process has ended.
+        """
+        if job.process.poll() is None:
+            if (job.job_dir / SpoolJob.CANCEL).exists():
+                sutils.kill_process(job.process)
+            return
+        self.__jobs.remove(job)
+        self.__finish(job)
+
+    def __finish(self, job: _RunningJob, error: Optional[str] = None):
+        """Writes the exit file of a job whose process has ended. The job
+        directory is removed instead if the job was cancelled.
+        """
+        job.output.close()
+        cancel_file = job.job_dir / SpoolJob.CANCEL
+        if not cancel_file.exists():
+            status = {SpoolJob.RETURNCODE: job.process.returncode}
+            if error is not None:
+                status[SpoolJob.ERROR] = error
+            try:
+                SpoolJob.write_json(job.job_dir / SpoolJob.EXIT, status)
+            except OSError:
+                pass
+        # Cancellation may have been requested while the exit file was
+        # written. The executor no longer follows the job in that case.
+        if cancel_file.exists():
+            SpoolJob.remove(job.job_dir)
+        logging.getLogger("mcerd_worker").info(
+            f"Finished {job.job_dir.name} with code "
+            f"{job.process.returncode}")
+
+    @staticmethod
+    def rewrite_paths(job_dir: Path, old: str, new: str):
+        """Replaces the old directory with the new one in the input files
+        of the job.
+        """
+        for file in job_dir.iterdir():
+            if SpoolJob.is_job_file(file) or not file.is_file():
+                continue
+            try:
+                contents = file.read_text(encoding="utf-8")
+            except UnicodeDecodeError:
+                continue
+            if old in contents:
+                file.write_text(contents.replace(old, new), encoding="utf-8")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Runs a SpoolWorker with command line arguments until it is
+    interrupted.
+    """
+    parser = argparse.ArgumentParser(
+        description="Runs MCERD jobs submitted to a spool directory.")
+    parser.add_argument("spool_dir", type=Path,
+                        help="directory where the jobs are submitted")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="maximum number of MCERD processes that run at "
+                             "the same time (default: number of CPUs)")
+    parser.add_argument("--mcerd", type=str, default=None,
+                        help="path to the MCERD executable")
+    parser.add_argument("--poll-interval", type=float, default=0.5,
+                        help="seconds between checking the spool directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(message)s")
+    command = None if args.mcerd is None else (args.mcerd,)
+    worker = SpoolWorker(args.spool_dir, command=command, max_jobs=args.jobs,
+                         poll_interval=args.poll_interval)
+    logging.getLogger("mcerd_worker").info(
+        f"Waiting for jobs in {worker.spool_dir}")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
@@ -48,6 +48,9 @@ from typing import Tuple
 from . import general_functions as gf
 from . import file_paths as fpaths
 from .cut_file import CutFile
+from .element_losses import CutEventIndex
+from . import event_store
+from .event_store import EventStore
 from .detector import Detector
 from .profile import Profile
 from .run import Run
@@ -257,7 +260,7 @@ class Measurement(Logger, Serializable):
                 "measurement_setting_file_description", "serial_number", \
                 "measurement_setting_modification_time", "data", \
                 "measurement_file", "directory", "use_request_settings", \
-                "selector"
+                "selector", "__cut_index"
 
     DIRECTORY_PREFIX = "Measurement_"
 
@@ -305,7 +308,7 @@ class Measurement(Logger, Serializable):
         self.measurement_setting_modification_time = \
             measurement_setting_modification_time
 
-        self.data = []
+        self.data = EventStore()
 
         self.serial_number = 0
         self.directory = self.path.parent
@@ -337,6 +340,7 @@ class Measurement(Logger, Serializable):
 
         # TODO: Should this be copied from default?
         self.selector = None
+        self.__cut_index = None
 
         self.use_request_settings = use_request_settings
 
@@ -666,25 +670,18 @@ class Measurement(Logger, Serializable):
         shutil.copyfile(file_path, new_path)
 
     def load_data(self):
-        """Loads measurement data from filepath
+        """Loads measurement data from filepath.
+
+        Parsed data is cached next to the data file, so subsequent loads
+        memory-map the cache instead of parsing the file again.
         """
-        n = 0
         try:
             filename = Path(self.measurement_file)
 
             measurement_name, extension = filename.stem, filename.suffix.lower()
             if extension == ".asc":
                 file_to_open = self.get_data_dir() / f"{measurement_name}.asc"
-                with file_to_open.open("r") as fp:
-                    for line in fp:
-                        n += 1  # Event number
-                        split = line.split()
-                        split_len = len(split)
-                        if split_len == 2:  # At least two columns
-                            self.data.append([int(split[0]), int(split[1]), n])
-                        if split_len == 3:
-                            self.data.append([int(split[0]), int(split[1]),
-                                              int(split[2]), n])
+                self.data = event_store.load_events(file_to_open)
             self.selector.measurement = self
         except IOError as e:
             error_log = "Error while loading the {0} {1}. {2}".format(
@@ -890,24 +887,8 @@ class Measurement(Logger, Serializable):
 
         self.__remove_old_cut_files()
 
-        # Initializes the list size to match the number of selections.
-        points_in_selection = [[] for _ in range(self.selector.count())]
-
-        # Go through all points in measurement data
-        data_count = len(self.data)
-        for n in range(data_count):  # while n < data_count: 
-            if n % 5000 == 0:
-                # Do not always update UI to make it faster.
-                if progress is not None:
-                    progress.report(n / data_count * 80)
-            point = self.data[n]
-            # Check if point is within selectors' limits for faster processing.
-            if not self.selector.axes_limits.is_inside(point):
-                continue
-
-            for i, selection in enumerate(self.selector.selections):
-                if selection.point_inside(point):
-                    points_in_selection[i].append(point)
+        # Indices of the events within each selection
+        points_in_selection = self.selector.get_events_in_selections()
 
         self.selector.update_selection_beams()
         self.selector.auto_save()
@@ -919,11 +900,12 @@ class Measurement(Logger, Serializable):
             progress.report(80)
 
         content_length = len(points_in_selection)
-        for i, points in enumerate(points_in_selection):
-            if points:  # If not empty selection -> save
+        binary = self.request.global_settings.get_binary_cut_files()
+        for i, indices in enumerate(points_in_selection):
+            if indices.size:  # If not empty selection -> save
                 selection = self.selector.get_at(i)
-                cut_file = CutFile(self.get_cuts_dir())
-                cut_file.set_info(selection, points)
+                cut_file = CutFile(self.get_cuts_dir(), binary=binary)
+                cut_file.set_info(selection, self.data.get_rows(indices))
                 cut_file.save()
             if progress is not None:
                 progress.report(80 + (i / content_length) * 0.2)
@@ -957,6 +939,14 @@ class Measurement(Logger, Serializable):
         elem_losses = self._get_cut_files(self.get_changes_dir())
         return cuts, elem_losses
 
+    def get_cut_event_index(self) -> CutEventIndex:
+        """Returns the index of the measurement's cut files that is shared by
+        elemental losses calculations.
+        """
+        if self.__cut_index is None:
+            self.__cut_index = CutEventIndex()
+        return self.__cut_index
+
     def load_selection(self, filename, progress=None):
         """Load selections from a file_path.
         
@@ -27,6 +27,16 @@ data.
 __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
+import io
+
+import numpy as np
+
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+Columns = Tuple[np.ndarray, ...]
+
 
 class CSVParser:
     """CSVParser parses csv-formatted strings by splitting rows into columns
@@ -214,6 +224,140 @@ class ToFListParser(CSVParser):
                          (7, int))
 
 
+class ArrayParser:
+    """ArrayParser parses whitespace separated columns of text into NumPy
+    arrays.
+
+    Whereas CSVParser converts each value into a Python object, ArrayParser
+    converts whole blocks of lines at once with numpy.loadtxt. It is meant
+    for large outputs, such as the output of tof_list, that are processed as
+    arrays anyway. Columns converted with str are stored in object arrays.
+
+    parser = ArrayParser((0, float), (2, int))
+    print(*parser.parse_str("1.5 a 1\n2.5 b 2\n"))
+    # prints '[1.5 2.5] [1 2]'
+    """
+    __slots__ = "_dtype", "_columns"
+    # Number of characters that are parsed at once
+    BLOCK_SIZE = 1 << 22
+
+    def __init__(self, *args):
+        """Initializes an ArrayParser.
+
+        Args:
+            args: each argument must be a tuple whose first element is an
+                  integer corresponding to a column index and last element
+                  is the type of the values in that column
+        """
+        for idx, func in args:
+            if not isinstance(idx, int):
+                raise TypeError("Column index must be an integer")
+        self._columns = tuple(idx for idx, _ in args)
+        if len(set(self._columns)) != len(self._columns):
+            raise ValueError("Each column can only be parsed once")
+        self._dtype = np.dtype([
+            (f"f{i}", object if func is str else func)
+            for i, (_, func) in enumerate(args)
+        ])
+
+    def parse_file(self, file_path) -> Columns:
+        """Parses a text file.
+
+        Args:
+            file_path: path to a file
+
+        Return:
+            tuple of column arrays
+        """
+        with open(file_path) as file:
+            return self.parse_str(file.read())
+
+    def parse_str(self, s: str) -> Columns:
+        """Parses lines in a string. Empty lines are ignored.
+
+        Args:
+            s: string that contains lines of values
+
+        Return:
+            tuple of column arrays
+        """
+        if not s or s.isspace():
+            return self.get_empty()
+        data = np.loadtxt(
+            io.StringIO(s), dtype=self._dtype, usecols=self._columns,
+            ndmin=1, comments=None)
+        # Columns are copied so that they do not keep the whole block alive
+        return tuple(
+            np.ascontiguousarray(data[name]) for name in self._dtype.names)
+
+    def parse_blocks(self, blocks: Iterable[str]) -> Columns:
+        """Parses blocks of lines and concatenates the results.
+
+        Args:
+            blocks: strings that only contain whole lines
+
+        Return:
+            tuple of column arrays
+        """
+        return self.concatenate(self.parse_str(block) for block in blocks)
+
+    def get_empty(self) -> Columns:
+        """Returns empty column arrays.
+        """
+        return tuple(
+            np.empty(0, dtype=self._dtype[name])
+            for name in self._dtype.names)
+
+    def concatenate(self, parsed: Iterable[Columns]) -> Columns:
+        """Concatenates parsed blocks into single column arrays.
+
+        Args:
+            parsed: parsed blocks
+
+        Return:
+            tuple of column arrays
+        """
+        parsed = list(parsed)
+        if not parsed:
+            return self.get_empty()
+        if len(parsed) == 1:
+            return parsed[0]
+        return tuple(np.concatenate(columns) for columns in zip(*parsed))
+
+    @staticmethod
+    def to_rows(columns: Columns) -> List[tuple]:
+        """Converts column arrays into a list of rows of Python values.
+        """
+        return list(zip(*(column.tolist() for column in columns)))
+
+    @staticmethod
+    def to_text(columns: Columns) -> str:
+        """Converts column arrays into lines of text where values are
+        separated by spaces.
+        """
+        return "".join(
+            f"{' '.join(str(value) for value in row)}\n"
+            for row in ArrayParser.to_rows(columns))
+
+
+class ToFListArrayParser(ArrayParser):
+    """Parser for reading the output of tof_list into arrays.
+    """
+    __slots__ = ()
+
+    def __init__(self):
+        """Initializes a ToFListArrayParser.
+        """
+        super().__init__((0, float),
+                         (1, float),
+                         (2, float),
+                         (3, int),
+                         (4, float),
+                         (5, str),
+                         (6, float),
+                         (7, int))
+
+
 def _get_conversion_function(idx, func):
     """Returns a function that will be applied to a list element
     at a given index.
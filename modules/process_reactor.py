@@ -0,0 +1,394 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+Reactor that monitors the output and the state of multiple subprocesses in
+a single thread.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import codecs
+import functools
+import io
+import locale
+import logging
+import os
+import selectors
+import subprocess
+import threading
+import time
+import rx
+
+from . import subprocess_utils as sutils
+
+from enum import Enum
+from typing import IO
+from typing import List
+from typing import Optional
+from typing import Union
+from rx.core.typing import Observer
+from rx.disposable import Disposable
+
+from .concurrency import CancellationToken
+
+if os.name == "nt":
+    import msvcrt
+    import _winapi
+
+# Pipes can be monitored with a selector only on POSIX. Elsewhere they are
+# polled.
+_SELECTABLE_PIPES = os.name == "posix"
+# Seconds between polling pipes that cannot be selected
+_PIPE_POLL_INTERVAL = 0.01
+
+
+class Termination(Enum):
+    """The way a process monitored by ProcessReactor ended.
+    """
+    # Process ended on its own
+    EXITED = "exited"
+    # Process was killed because cancellation was requested
+    CANCELLED = "cancelled"
+    # Process was killed because it ran longer than its maximum time
+    TIMED_OUT = "timed_out"
+
+
+class LineDecoder:
+    """Decodes the output of a process into lines. Line endings are
+    translated and removed.
+    """
+    __slots__ = "__decoder", "__buffer"
+
+    def __init__(self):
+        encoding = locale.getpreferredencoding(False)
+        self.__decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(errors="replace"),
+            translate=True)
+        self.__buffer = ""
+
+    def decode(self, data: bytes, final: bool = False) -> List[str]:
+        """Decodes data and returns the lines it completes. If final is
+        True, the last line is returned even if it has no line ending.
+        """
+        text = self.__buffer + self.__decoder.decode(data, final=final)
+        *lines, self.__buffer = text.split("\n")
+        if final and self.__buffer:
+            lines.append(self.__buffer)
+            self.__buffer = ""
+        return lines
+
+
+class Watch:
+    """Base class for the state of a monitored process. Passes the output
+    and the termination of the process to an observer and keeps track of
+    the cancellation and the time limit of the process.
+    """
+    __slots__ = "ct", "deadline", "termination", "__observer"
+
+    def __init__(self, observer: Observer,
+                 ct: Optional[CancellationToken] = None,
+                 max_time: Optional[float] = None):
+        self.ct = ct
+        if max_time is None:
+            self.deadline = None
+        else:
+            self.deadline = time.monotonic() + max_time
+        self.termination = None
+        self.__observer = observer
+
+    def dispose(self):
+        """Stops emitting items to the observer. The process is still
+        monitored until it ends.
+        """
+        self.__observer = None
+
+    def check_termination(self) -> Optional[Termination]:
+        """Sets the termination if cancellation has been requested or the
+        process has run out of time. Cancellation is also requested from
+        the token when the time runs out so that other processes that share
+        it are stopped.
+
+        Return:
+            the termination or None if the process may keep running
+        """
+        if self.termination is None:
+            if self.ct is not None and self.ct.is_cancellation_requested():
+                self.termination = Termination.CANCELLED
+            elif self.deadline is not None and \
+                    time.monotonic() >= self.deadline:
+                self.termination = Termination.TIMED_OUT
+                if self.ct is not None:
+                    self.ct.request_cancellation()
+        return self.termination
+
+    def emit(self, item: Union[str, Termination]):
+        """Emits an item to the observer.
+        """
+        if self.__observer is None:
+            return
+        try:
+            self.__observer.on_next(item)
+        except Exception as e:
+            self.error(e)
+
+    def complete(self):
+        """Emits the termination and completes the observer.
+        """
+        self.emit(self.termination or Termination.EXITED)
+        if self.__observer is not None:
+            observer, self.__observer = self.__observer, None
+            try:
+                observer.on_completed()
+            except Exception as e:
+                _log_error(e)
+
+    def error(self, error: Exception):
+        """Passes an error to the observer. No items are emitted after this.
+        """
+        if self.__observer is not None:
+            observer, self.__observer = self.__observer, None
+            try:
+                observer.on_error(error)
+            except Exception as e:
+                _log_error(e)
+
+
+class _Watch(Watch):
+    """State of a single process that is monitored by ProcessReactor.
+    """
+    __slots__ = "process", "files", "__decoders"
+
+    def __init__(self, process: subprocess.Popen, observer: Observer,
+                 ct: Optional[CancellationToken] = None,
+                 max_time: Optional[float] = None):
+        super().__init__(observer, ct=ct, max_time=max_time)
+        self.process = process
+        self.files = [
+            f for f in (process.stdout, process.stderr) if f is not None
+        ]
+        self.__decoders = {f: LineDecoder() for f in self.files}
+
+    def feed(self, file: IO[bytes], data: bytes):
+        """Decodes data read from one of the output files and emits the
+        complete lines. Empty data means that the end of file was reached.
+        """
+        if file not in self.files:
+            return
+        lines = self.__decoders[file].decode(data, final=not data)
+        if not data:
+            self.files.remove(file)
+        for line in lines:
+            self.emit(line)
+
+
+def _read_available(file: IO[bytes]) -> Optional[bytes]:
+    """Reads the data that is available in a pipe without blocking.
+
+    Args:
+        file: output pipe of a process
+
+    Return:
+        the data, None if there is nothing to read yet or empty bytes if the
+        end of file was reached
+    """
+    fd = file.fileno()
+    try:
+        if os.name == "nt":
+            available, _ = _winapi.PeekNamedPipe(msvcrt.get_osfhandle(fd), 0)
+            if not available:
+                return None
+            return os.read(fd, min(available, 2 ** 16))
+        os.set_blocking(fd, False)
+        return os.read(fd, 2 ** 16)
+    except BlockingIOError:
+        return None
+    except OSError:
+        # Windows reports the end of a pipe as an error
+        return b""
+
+
+def _log_error(error: Exception):
+    """Logs an error that was raised by an observer. Errors are not allowed
+    to stop the thread that monitors the processes.
+    """
+    logging.getLogger("request").error(
+        f"Error while observing a process: {error}")
+
+
+class ProcessReactor:
+    """Monitors the output, the exit and the cancellation of subprocesses.
+
+    All processes are handled in a single thread regardless of how many of
+    them are running. The thread is started when the first process is added
+    and it stops once there are no processes left. Output is read with a
+    selector on platforms that support selecting pipes. Elsewhere the pipes
+    are polled by the same thread.
+    """
+    __slots__ = "poll_interval", "__lock", "__thread", "__pending", \
+                "__watches", "__selector"
+
+    def __init__(self, poll_interval: float = 0.2):
+        """Initializes a new ProcessReactor.
+
+        Args:
+            poll_interval: seconds between checking the state and the
+                cancellation of the processes
+        """
+        self.poll_interval = poll_interval
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__pending: List[_Watch] = []
+        self.__watches: List[_Watch] = []
+        if _SELECTABLE_PIPES:
+            self.__selector = selectors.DefaultSelector()
+        else:
+            self.__selector = None
+
+    def observe(self, process: subprocess.Popen,
+                ct: Optional[CancellationToken] = None,
+                max_time: Optional[float] = None) -> rx.Observable:
+        """Returns an observable that emits the lines the process writes to
+        its stdout and stderr.
+
+        The observable must be subscribed to only once. Lines are emitted
+        without line endings. After the process has ended, a Termination is
+        emitted and the observable completes.
+
+        Args:
+            process: process that was started with piped output in binary
+                mode
+            ct: the process is killed when cancellation is requested from
+                this token
+            max_time: the process is killed after running this many seconds.
+                Cancellation is also requested from ct so that other
+                processes that share the token are stopped.
+
+        Return:
+            observable stream of lines followed by a Termination
+        """
+        def subscribe(observer: Observer, _=None) -> Disposable:
+            watch = _Watch(process, observer, ct=ct, max_time=max_time)
+            with self.__lock:
+                self.__pending.append(watch)
+                if self.__thread is None:
+                    self.__thread = threading.Thread(
+                        target=self.__run, name="ProcessReactor", daemon=True)
+                    self.__thread.start()
+            return Disposable(watch.dispose)
+
+        return rx.create(subscribe)
+
+    def __run(self):
+        """Runs the reactor until there are no processes left.
+        """
+        while True:
+            with self.__lock:
+                for watch in self.__pending:
+                    self.__register(watch)
+                self.__watches.extend(self.__pending)
+                self.__pending.clear()
+                if not self.__watches:
+                    self.__thread = None
+                    return
+            try:
+                self.__read(self.poll_interval)
+            except OSError as e:
+                logging.getLogger("request").warning(
+                    f"Could not read process output: {e}")
+            for watch in list(self.__watches):
+                self.__check(watch)
+
+    def __register(self, watch: _Watch):
+        """Starts reading the output of the process.
+        """
+        if self.__selector is not None:
+            for file in watch.files:
+                self.__selector.register(
+                    file, selectors.EVENT_READ, data=watch)
+
+    def __read(self, timeout: float):
+        """Reads the output that is available within the timeout.
+        """
+        if self.__selector is not None:
+            if not self.__selector.get_map():
+                time.sleep(timeout)
+                return
+            for key, _ in self.__selector.select(timeout):
+                data = os.read(key.fd, 2 ** 16)
+                if not data:
+                    self.__selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                key.data.feed(key.fileobj, data)
+            return
+
+        deadline = time.monotonic() + timeout
+        while True:
+            received = False
+            for watch in self.__watches:
+                for file in list(watch.files):
+                    data = _read_available(file)
+                    if data is None:
+                        continue
+                    received = True
+                    if not data:
+                        file.close()
+                    watch.feed(file, data)
+            remaining = deadline - time.monotonic()
+            if received or remaining <= 0:
+                return
+            time.sleep(min(remaining, _PIPE_POLL_INTERVAL))
+
+    def __close(self, watch: _Watch):
+        """Stops reading the output of the process.
+        """
+        for file in list(watch.files):
+            if self.__selector is not None:
+                self.__selector.unregister(file)
+            file.close()
+            watch.files.remove(file)
+
+    def __check(self, watch: _Watch):
+        """Kills the process if it has been cancelled or it has timed out and
+        completes the watch if the process has ended.
+        """
+        if watch.termination is None and \
+                watch.check_termination() is not None and \
+                watch.process.poll() is None:
+            sutils.kill_process(watch.process)
+
+        if watch.termination is not None and \
+                watch.process.poll() is not None:
+            # Child processes of a killed process may keep the pipes open so
+            # the rest of the output is ignored.
+            self.__close(watch)
+
+        if not watch.files and watch.process.poll() is not None:
+            self.__watches.remove(watch)
+            watch.complete()
+
+
+@functools.lru_cache(maxsize=None)
+def get_reactor() -> ProcessReactor:
+    """Returns the ProcessReactor that is shared by the whole application.
+    """
+    return ProcessReactor()
@@ -52,6 +52,9 @@ from .simulation import Simulation
 from .target import Target
 from .recoil_element import RecoilElement
 from .global_settings import GlobalSettings
+from .mcerd_executor import MCERDExecutor
+from .mcerd_executor import get_executor
+from .mcerd_scheduler import MCERDScheduler
 
 
 class Request(ElementSimulationContainer):
@@ -77,6 +80,10 @@ class Request(ElementSimulationContainer):
         self.global_settings = global_settings
         self.samples = Samples(self)
 
+        # MCERD processes of all simulations in the request share the same
+        # core budget
+        self.scheduler = MCERDScheduler(global_settings.get_core_budget)
+
         self.__tabs = tabs
         self.__master_measurement = None
         self.__non_slaves = []  # List of measurements that aren't slaves,
@@ -611,6 +618,13 @@ class Request(ElementSimulationContainer):
             pass
         return files
 
+    def get_mcerd_executor(self) -> MCERDExecutor:
+        """Returns the executor that runs the MCERD processes of the request.
+        MCERD is run on workers if a spool directory has been set in the
+        global settings and locally otherwise.
+        """
+        return get_executor(self.global_settings.get_mcerd_spool_directory())
+
     def _get_simulations(self):
         return (
             sim for sample in self.samples.samples
@@ -36,11 +36,15 @@ __version__ = "2.0"
 import logging
 import os
 import itertools
+import math
 
 from . import math_functions as mf
 from . import general_functions as gf
 
+from .event_store import EventIndex
+
 import matplotlib as mpl
+import numpy as np
 
 from dialogs.measurement.selection import SelectionSettingsDialog
 
@@ -102,6 +106,83 @@ class AxesLimits:
         return True
 
 
+class SelectionGrid:
+    """Rasterized selection polygon.
+
+    ToF and energy values are integer channels, so membership of every
+    channel within the polygon's bounding box can be computed once and then
+    looked up with a single array index per event.
+    """
+    # Polygons whose bounding box has more cells than this are not rasterized
+    # to keep the memory usage in check. Those are tested with
+    # math_functions.points_inside_polygon instead.
+    MAX_CELLS = 16_000_000
+
+    __slots__ = "points", "x_min", "x_max", "y_min", "y_max", "mask"
+
+    def __init__(self, points):
+        """Inits SelectionGrid.
+
+        Args:
+            points: points of the selection polygon as a list of (x, y) pairs.
+        """
+        self.points = [tuple(p) for p in points]
+        self.mask = None
+        if not self.points:
+            self.x_min = self.y_min = 0
+            self.x_max = self.y_max = -1
+            return
+
+        xs, ys = zip(*self.points)
+        self.x_min, self.x_max = math.floor(min(xs)), math.ceil(max(xs))
+        self.y_min, self.y_max = math.floor(min(ys)), math.ceil(max(ys))
+
+        width = self.x_max - self.x_min + 1
+        height = self.y_max - self.y_min + 1
+        if width * height <= SelectionGrid.MAX_CELLS:
+            y, x = np.mgrid[self.y_min:self.y_max + 1,
+                            self.x_min:self.x_max + 1]
+            self.mask = mf.points_inside_polygon(
+                x.ravel(), y.ravel(), self.points).reshape(height, width)
+
+    def get_inside_mask(self, x, y):
+        """Returns a boolean mask of the points that are inside the selection.
+
+        Args:
+            x: array of integer values on the x axis
+            y: array of integer values on the y axis
+
+        Return:
+            boolean array with the same length as x and y.
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+        inside = np.zeros(x.shape, dtype=bool)
+        in_bbox = np.flatnonzero(
+            (self.x_min <= x) & (x <= self.x_max) &
+            (self.y_min <= y) & (y <= self.y_max))
+        if not in_bbox.size:
+            return inside
+        bx, by = x[in_bbox], y[in_bbox]
+        if self.mask is not None and np.issubdtype(x.dtype, np.integer) and \
+                np.issubdtype(y.dtype, np.integer):
+            inside[in_bbox] = self.mask[by - self.y_min, bx - self.x_min]
+        else:
+            inside[in_bbox] = mf.points_inside_polygon(bx, by, self.points)
+        return inside
+
+    def contains(self, point) -> bool:
+        """Checks if a single point is inside the selection.
+
+        Args:
+            point: (x, y) point
+
+        Return:
+            True if point is inside the selection.
+        """
+        return bool(self.get_inside_mask([point[0]], [point[1]])[0])
+
+
 class Selector:
     """Selector objects handles all selections within measurement.
     """
@@ -130,6 +211,9 @@ class Selector:
         self.axes_limits = AxesLimits()
         self.selected_id = None
         self.draw_legend = False
+        # Rasterized selections by selection id
+        self.__grids = {}
+        self.__event_index = None
 
     def count(self):
         """Get count of selections.
@@ -225,6 +309,7 @@ class Selector:
                     return -1
 
         sel.add_point(point)
+        self.__invalidate_grid(sel)
         return 0
 
     def undo_point(self):
@@ -238,6 +323,7 @@ class Selector:
         sel = self.selections[-1]  # [-1] = last one
         if not sel.is_closed:
             sel.undo_last()
+            self.__invalidate_grid(sel)
 
     def update_references(self, measurement: "Measurement"):
         """
@@ -269,6 +355,7 @@ class Selector:
             if not s.is_closed:  # If selection is not closed -> purge
                 s.delete()
                 self.selections.remove(s)
+                self.__invalidate_grid(s)
         self.new_selection_is_allowed = True
 
     def remove_selected(self):
@@ -282,6 +369,7 @@ class Selector:
             if s.id == self.selected_id:
                 s.delete()
                 self.selections.remove(s)
+                self.__invalidate_grid(s)
         self.selected_id = None
 
     def __remove_last(self):
@@ -292,6 +380,7 @@ class Selector:
         selection_last = self.selections[-1]
         selection_last.delete()
         self.selections.remove(selection_last)
+        self.__invalidate_grid(selection_last)
         # Purge everything just in case and allow new selection.
         self.purge()
 
@@ -301,6 +390,7 @@ class Selector:
         for s in self.selections:
             s.delete()
         self.selections.clear()
+        self.__grids.clear()
         self.selected_id = None
 
     def draw(self):
@@ -343,6 +433,7 @@ class Selector:
             return 0
         elif not sel.is_closed:
             selection_is_ok = sel.end_selection(canvas)
+            self.__invalidate_grid(sel)
             if not selection_is_ok:
                 self.__remove_last()
             self.reset_colors()
@@ -509,22 +600,62 @@ class Selector:
         self.is_transposed = is_transposed
         for selection in self.selections:
             selection.transpose(is_transposed)
+        self.__grids.clear()
+
+    def get_grid(self, selection) -> SelectionGrid:
+        """Returns the rasterized grid of the selection. Grid is built when
+        it is first requested after the selection's points have changed.
+
+        Args:
+            selection: Selection object
+
+        Return:
+            SelectionGrid
+        """
+        try:
+            return self.__grids[selection.id]
+        except KeyError:
+            grid = SelectionGrid(selection.get_points())
+            self.__grids[selection.id] = grid
+            return grid
+
+    def __invalidate_grid(self, selection):
+        """Removes the cached grid of the selection.
+        """
+        self.__grids.pop(selection.id, None)
+
+    def get_selection_at(self, point):
+        """Returns the first selection that contains the given point.
+
+        Args:
+            point: (x, y) point
+
+        Return:
+            Selection or None if the point is not inside any selection.
+        """
+        if not self.axes_limits.is_inside(point):
+            return None
+        for selection in self.selections:
+            if selection.points is not None and \
+                    self.get_grid(selection).contains(point):
+                return selection
+        return None
 
     def update_single_selection_points(self, selection):
         """
-        Update single selection points.
+        Update single selection points. Only the events within the
+        bounding box of the selection are recounted.
 
         Args:
             selection: Points to update.
         """
         selection.events_counted = False
         selection.event_count = 0
-        data = self.measurement.data
         if not selection.is_closed:
             selection.events_counted = True
             return
-        for n in range(len(data)):
-            selection.point_inside(data[n])
+        indices, = self.get_events_in_selections([selection])
+        selection.event_count = len(indices)
         selection.events_counted = True
 
     def update_selection_points(self, progress=None):
@@ -533,20 +664,60 @@ class Selector:
         Args:
             progress: ProgressReporter object
         """
-        data = self.measurement.data
         for selection in self.selections:
             selection.events_counted = False
             selection.event_count = 0
 
-        for i, point in enumerate(data):
-            for selection in self.selections:
-                if selection.is_closed:
-                    selection.point_inside(point)
-            if progress is not None and i % 10_000 == 0:
-                progress.report(i / len(data) * 100)
+        closed = [sel for sel in self.selections if sel.is_closed]
+        inside = self.get_events_in_selections(closed)
+        for selection, indices in zip(closed, inside):
+            selection.event_count = len(indices)
 
         for selection in self.selections:
             selection.events_counted = True
+        if progress is not None:
+            progress.report(100)
+
+    def get_events_in_selections(self, selections=None):
+        """Returns the indices of measurement's events within each
+        selection. Overlapping selections may share events.
+
+        Only the events within the bounding box of each selection are
+        tested, so changing one selection does not require scanning all
+        events.
+
+        Args:
+            selections: list of selections. If None, all selections of the
+                Selector are used.
+
+        Return:
+            list that contains an array of event indices in ascending order
+            for each selection
+        """
+        if selections is None:
+            selections = self.selections
+        data = self.measurement.data
+        inside = []
+        for selection in selections:
+            grid = self.get_grid(selection)
+            if not grid.points or not len(data):
+                inside.append(np.empty(0, dtype=np.intp))
+                continue
+            candidates = self.get_event_index().get_indices_in_box(
+                grid.x_min, grid.x_max, grid.y_min, grid.y_max)
+            mask = grid.get_inside_mask(
+                data.tof[candidates], data.energy[candidates])
+            inside.append(candidates[mask])
+        return inside
+
+    def get_event_index(self) -> EventIndex:
+        """Returns the index over the measurement's events. Index is rebuilt
+        if the measurement data has been reloaded.
+        """
+        data = self.measurement.data
+        if self.__event_index is None or self.__event_index.store is not data:
+            self.__event_index = EventIndex(data)
+        return self.__event_index
 
     def update_selection_beams(self):
         """Update all RBS selections' beam ions."""
@@ -888,7 +1059,4 @@ class Selection:
             return False
         inside = mf.point_inside_polygon((point[0], point[1]),
                                          self.get_points())
-        # While at it, increase event point counts if not counted already.
-        if inside and not self.events_counted:
-            self.event_count += 1
         return inside
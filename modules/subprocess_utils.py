@@ -29,6 +29,7 @@ import subprocess
 import platform
 from pathlib import Path
 from typing import Callable
+from typing import IO
 from typing import Iterable
 from typing import Optional
 from typing import TypeVar
@@ -41,14 +42,21 @@ class StdoutStream:
     """Class for processing stdout of a subprocess.Popen. Can be used as a
     context manager.
     """
-    def __init__(self, process: subprocess.Popen):
+    def __init__(self, process: subprocess.Popen,
+                 block_size: Optional[int] = None):
         """Initializes a new StdoutStream.
 
         Args:
             process: a subprocess.Popen object
+            block_size: if given, the stream produces blocks of whole lines
+                instead of single lines. Each block is at least this many
+                characters long, except for the last one.
         """
         self._stdout = process.stdout
-        self._output = iter(self._stdout.readline, "")
+        if block_size is None:
+            self._output = iter(self._stdout.readline, "")
+        else:
+            self._output = read_blocks(self._stdout, block_size)
 
     @property
     def closed(self) -> bool:
@@ -77,6 +85,29 @@ class StdoutStream:
         self.close()
 
 
+def read_blocks(file: IO[str], block_size: int) -> Iterable[str]:
+    """Reads a text file in blocks that only contain whole lines.
+
+    Args:
+        file: text file object
+        block_size: number of characters read at a time
+
+    Yield:
+        blocks of lines
+    """
+    if block_size <= 0:
+        raise ValueError("Block size must be positive.")
+    remainder = ""
+    for block in iter(lambda: file.read(block_size), ""):
+        block = remainder + block
+        end = block.rfind("\n") + 1
+        remainder = block[end:]
+        if end:
+            yield block[:end]
+    if remainder:
+        yield remainder
+
+
 def write_to_file(
         iterable: Iterable[T0],
         file: Path,
@@ -105,8 +136,10 @@ def process_output(
         parse_func: Optional[Callable[[str], T0]] = None,
         file: Optional[Path] = None,
         text_func: Callable[[T0], str] = str,
-        output_func: Callable[[Iterable[T0]], T1] = list) -> T1:
-    """Processes the output from a subprocess line by line.
+        output_func: Callable[[Iterable[T0]], T1] = list,
+        block_size: Optional[int] = None) -> T1:
+    """Processes the output from a subprocess line by line or in blocks of
+    lines.
 
     Args:
         process: a subprocess.Popen object
@@ -116,11 +149,13 @@ def process_output(
             written to a file (str by default)
         output_func: function that returns an aggregate of all lines (list by
             default)
+        block_size: if given, output is processed in blocks of lines instead
+            of single lines (see StdoutStream)
 
     Return:
         processed lines as an object returned by output_func
     """
-    with StdoutStream(process) as stream:
+    with StdoutStream(process, block_size=block_size) as stream:
         if parse_func is not None:
             stream = map(parse_func, stream)
         if file is not None:
@@ -0,0 +1,259 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+
+Bindings to the shared library version of Arstila's tof_list program. The
+library reads tof.in and loads stopping data once per measurement, after
+which the events of each cut file are converted in memory.
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import ctypes
+import functools
+import platform
+import tempfile
+import threading
+
+import numpy as np
+
+from pathlib import Path
+from typing import Optional
+
+from . import cut_file as cf
+from . import general_functions as gf
+from .parsing import Columns
+
+_INT_ARRAY = np.ctypeslib.ndpointer(dtype=np.intc, flags="C_CONTIGUOUS")
+_FLOAT_ARRAY = np.ctypeslib.ndpointer(dtype=np.float64, flags="C_CONTIGUOUS")
+
+# tof_list_convert seeds and uses the C library's random number generator, so
+# only that call is serialized. Cuts and configurations can be created and
+# freed concurrently.
+_LOCK = threading.Lock()
+
+
+def get_library_file() -> Path:
+    """Returns the path of the tof_list shared library.
+    """
+    if platform.system() == "Windows":
+        name = "tof_list.dll"
+    elif platform.system() == "Darwin":
+        name = "libtof_list.dylib"
+    else:
+        name = "libtof_list.so"
+    return gf.get_lib_dir() / name
+
+
+@functools.lru_cache(maxsize=None)
+def load_library(file: Optional[Path] = None) -> Optional[ctypes.CDLL]:
+    """Loads the tof_list shared library.
+
+    Args:
+        file: path to the library. Defaults to the one in Potku's library
+            directory.
+
+    Return:
+        the library or None if it has not been built
+    """
+    if file is None:
+        file = get_library_file()
+    try:
+        lib = ctypes.CDLL(str(file))
+    except OSError:
+        return None
+
+    lib.tof_list_config_new.argtypes = \
+        ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p
+    lib.tof_list_config_new.restype = ctypes.c_void_p
+    lib.tof_list_config_free.argtypes = ctypes.c_void_p,
+    lib.tof_list_config_free.restype = None
+    lib.tof_list_set_verbose.argtypes = ctypes.c_int,
+    lib.tof_list_set_verbose.restype = None
+
+    lib.tof_list_cut_new.argtypes = \
+        ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p, \
+        ctypes.c_char_p
+    lib.tof_list_cut_new.restype = ctypes.c_void_p
+    lib.tof_list_cut_free.argtypes = ctypes.c_void_p,
+    lib.tof_list_cut_free.restype = None
+    lib.tof_list_cut_z.argtypes = ctypes.c_void_p,
+    lib.tof_list_cut_z.restype = ctypes.c_int
+    lib.tof_list_cut_mass.argtypes = ctypes.c_void_p,
+    lib.tof_list_cut_mass.restype = ctypes.c_double
+    lib.tof_list_cut_is_erd.argtypes = ctypes.c_void_p,
+    lib.tof_list_cut_is_erd.restype = ctypes.c_int
+
+    lib.tof_list_convert.argtypes = \
+        ctypes.c_void_p, _INT_ARRAY, ctypes.c_long, ctypes.c_int, \
+        _FLOAT_ARRAY, _FLOAT_ARRAY, _FLOAT_ARRAY, _INT_ARRAY
+    lib.tof_list_convert.restype = ctypes.c_long
+    return lib
+
+
+def is_available() -> bool:
+    """Returns True if the tof_list shared library has been built.
+    """
+    return load_library() is not None
+
+
+def write_stoppings_file(file: Path, bin_dir: Optional[Path] = None,
+                         data_dir: Optional[Path] = None):
+    """Writes the stopping settings file with the paths of the stopping
+    files resolved.
+
+    Paths in Potku's stoppings.txt are relative to the bin directory where
+    the tof_list program is run. The library is run in Potku's own working
+    directory, so the paths must be absolute.
+
+    Args:
+        file: path to the file to write
+        bin_dir: directory that the paths are relative to
+        data_dir: directory of stoppings.txt
+    """
+    if bin_dir is None:
+        bin_dir = gf.get_bin_dir()
+    if data_dir is None:
+        data_dir = gf.get_data_dir()
+    lines = []
+    with (data_dir / "stoppings.txt").open("r") as settings:
+        for line in settings:
+            columns = line.split()
+            if columns and not columns[0].startswith("#"):
+                stopping_file = (bin_dir / columns[0]).resolve()
+                line = " ".join([str(stopping_file), *columns[1:]]) + "\n"
+            lines.append(line)
+    with file.open("w") as settings:
+        settings.writelines(lines)
+
+
+class ToFListConfig:
+    """Configuration of the tof_list library for a single measurement.
+
+    Configuration is read from tof.in and the stopping data is loaded when
+    the object is created. The same configuration is then used to convert
+    each cut file of the measurement. Configuration must be closed when
+    it is no longer needed.
+    """
+    __slots__ = "__lib", "__config"
+
+    def __init__(self, tof_in: Path, verbose: bool = True,
+                 lib: Optional[ctypes.CDLL] = None):
+        """Initializes a new ToFListConfig.
+
+        Args:
+            tof_in: path to tof.in file
+            verbose: whether the library prints messages to stderr
+            lib: tof_list library. Defaults to the one in Potku's library
+                directory.
+        """
+        if lib is None:
+            lib = load_library()
+        if lib is None:
+            raise ValueError("tof_list library has not been built.")
+        self.__lib = lib
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stoppings_file = Path(tmp_dir, "stoppings.txt")
+            write_stoppings_file(stoppings_file)
+            mass_file = gf.get_data_dir() / "masses.dat"
+            lib.tof_list_set_verbose(int(verbose))
+            self.__config = lib.tof_list_config_new(
+                bytes(tof_in), bytes(stoppings_file), bytes(mass_file))
+        if not self.__config:
+            raise ValueError(
+                f"Could not create tof_list configuration from {tof_in}.")
+
+    def __enter__(self) -> "ToFListConfig":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Frees the configuration.
+        """
+        if self.__config:
+            self.__lib.tof_list_config_free(self.__config)
+            self.__config = None
+
+    def convert(self, cut_file: Path) -> Columns:
+        """Converts the events of a cut file the same way as the tof_list
+        program does.
+
+        Args:
+            cut_file: path to a text or binary cut file
+
+        Return:
+            columns of tof_list output as arrays
+        """
+        if not self.__config:
+            raise ValueError("tof_list configuration has been closed.")
+        header, data = cf.read_file(cut_file)
+        events = np.ascontiguousarray(data, dtype=np.intc)
+        rows, columns = events.shape
+        # Element is read from the file name just like tof_list does
+        element = cut_file.name.split(".", 1)[-1]
+
+        angles = np.empty(rows, dtype=np.float64)
+        energies = np.empty(rows, dtype=np.float64)
+        weights = np.empty(rows, dtype=np.float64)
+        event_numbers = np.empty(rows, dtype=np.intc)
+
+        cut = self.__lib.tof_list_cut_new(
+            self.__config, element.encode(),
+            *(_encode(header.get(key)) for key in (
+                "Type", "Weight Factor", "Scatter Element")))
+        if not cut:
+            raise ValueError(
+                f"Could not read the element of {cut_file.name}.")
+        try:
+            with _LOCK:
+                count = self.__lib.tof_list_convert(
+                    cut, events, rows, columns, angles, energies, weights,
+                    event_numbers)
+            z = self.__lib.tof_list_cut_z(cut)
+            mass = self.__lib.tof_list_cut_mass(cut)
+            is_erd = self.__lib.tof_list_cut_is_erd(cut)
+        finally:
+            self.__lib.tof_list_cut_free(cut)
+        if count < 0:
+            raise ValueError(
+                f"Unexpected number of columns in {cut_file.name}.")
+
+        return (
+            angles[:count].copy(),
+            np.zeros(count, dtype=np.float64),
+            energies[:count].copy(),
+            np.full(count, z, dtype=np.int64),
+            np.full(count, mass, dtype=np.float64),
+            np.full(count, "ERD" if is_erd else "RBS", dtype=object),
+            weights[:count].copy(),
+            event_numbers[:count].astype(np.int64),
+        )
+
+
+def _encode(value: Optional[str]) -> Optional[bytes]:
+    """Encodes a header value for the library.
+    """
+    if value is None:
+        return None
+    return value.encode()
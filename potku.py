@@ -34,6 +34,7 @@ import gc
 import os
 import platform
 import shutil
+import multiprocessing
 import subprocess
 import sys
 import functools
@@ -1497,4 +1498,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Worker processes of a frozen application must not start the GUI
+    multiprocessing.freeze_support()
     main()
@@ -39,6 +39,10 @@ else:
     icon = "ui_icons/potku/potku_logo_icons/potku_icon.ico"
     console = True
 
+# Potku loads the tof_list library (libtof_list.so, libtof_list.dylib or
+# tof_list.dll) from external/lib
+extras += [("external/lib/*tof_list.*", "external/lib/")]
+
 block_cipher = None
 
 bins = [
@@ -23,6 +23,8 @@ You should have received a copy of the GNU General Public License
 along with this program (file named 'LICENCE').
 """
 
+import multiprocessing
+
 import potku
 
 
@@ -31,4 +33,6 @@ def run_potku():
 
 
 if __name__ == "__main__":
+    # Worker processes of a frozen application must not start the GUI
+    multiprocessing.freeze_support()
     run_potku()
@@ -28,6 +28,8 @@ __version__ = "2.0"
 import unittest
 import math
 
+import numpy as np
+
 import tests.mock_objects as mo
 
 from modules.depth_files import DepthProfileHandler
@@ -144,6 +146,45 @@ class TestDepthProfileHandling(unittest.TestCase):
         self.assertAlmostEqual(34.94, sum(p.values()), places=2)
         self.assertAlmostEqual(0.57, sum(m.values()), places=2)
 
+    def test_stacked_profiles_match_single_profiles(self):
+        """Profiles that share depths are handled all at once. The results
+        must be the same as when each profile is handled separately."""
+        self.handler.read_directory(self.depth_dir, self.all_elements)
+        single = DepthProfileHandler()
+        single.read_directory(self.depth_dir, self.all_elements)
+        # Without the stack, calculations are done profile by profile
+        single._DepthProfileHandler__stack = None
+        a, b = self.handler.get_depth_range()
+
+        for lim_a, lim_b in ((a + 100, b - 100), (-math.inf, math.inf),
+                             (50.5, 20), (0, 0)):
+            ratios = self.handler.calculate_ratios({"H"}, lim_a, lim_b, 3)
+            expected = single.calculate_ratios({"H"}, lim_a, lim_b, 3)
+            for values, expected_values in zip(ratios, expected):
+                self.assertEqual(expected_values.keys(), values.keys())
+                self.assertIsNone(values["H"])
+                for key, value in values.items():
+                    if key != "H":
+                        self.assertAlmostEqual(
+                            expected_values[key], value, places=10)
+
+            integrals = self.handler.integrate_concentrations(lim_a, lim_b)
+            expected = single.integrate_concentrations(lim_a, lim_b)
+            self.assertEqual(expected.keys(), integrals.keys())
+            for key, value in integrals.items():
+                self.assertAlmostEqual(expected[key], value, places=10)
+
+            for method in ("abs_rel_abs", "rel_abs_rel"):
+                merged = self.handler.merge_profiles(lim_a, lim_b, method)
+                expected = single.merge_profiles(lim_a, lim_b, method)
+                self.assertEqual(expected.keys(), merged.keys())
+                for key, profile in merged.items():
+                    self.assertEqual(expected[key].element, profile.element)
+                    np.testing.assert_array_equal(
+                        expected[key].events, profile.events)
+                    np.testing.assert_allclose(
+                        expected[key].concentrations, profile.concentrations)
+
     def test_caching_with_merge(self):
         """Tests caching functionality in DepthProfile merging"""
 
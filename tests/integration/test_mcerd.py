@@ -59,7 +59,8 @@ class TestMCERD(unittest.TestCase):
                 Element.from_string("Si 1.0")
             ], 1000.0, 2.32, start_depth=90.01)
         ])
-        cls.mcerd = MCERD(101, {
+        cls.work_dir = cls.directory / "mcerd" / "He-Default.101"
+        cls.settings = {
             "recoil_element": mo.get_recoil_element(),
             "sim_dir": tempfile.gettempdir(),
             "simulation_type": SimulationType.ERD,
@@ -77,7 +78,9 @@ class TestMCERD(unittest.TestCase):
             "number_of_scaling_ions": 14,
             "number_of_ions_in_presimu": 100,
             "number_of_ions": 1000
-        }, mo.get_element_simulation().get_full_name())
+        }
+        cls.mcerd = MCERD(
+            101, cls.settings, mo.get_element_simulation().get_full_name())
 
     def test_get_command(self):
         """Tests the get_command function on different platforms.
@@ -85,7 +88,7 @@ class TestMCERD(unittest.TestCase):
         # PlatformSwitcher cannot change the separator char in file paths.
         # Therefore the same bin_path and file_path is used for each system
         bin_path = gf.get_bin_dir() / "mcerd"
-        file_path = self.directory / "He-Default"
+        file_path = self.work_dir / "He-Default"
 
         with utils.PlatformSwitcher("Windows"):
             cmd = f"{bin_path}.exe", str(file_path)
@@ -101,28 +104,28 @@ class TestMCERD(unittest.TestCase):
 
     def test_paths(self):
         """Testing various file paths that MCERD uses."""
-        self.assertEqual(
-            self.directory / "He-Default.recoil",
-            self.mcerd.recoil_file)
         self.assertEqual(
             self.directory / "He-Default.101.erd",
             self.mcerd.result_file)
         self.assertEqual(
-            self.directory / "He-Default",
+            self.work_dir / "He-Default.recoil",
+            self.mcerd.recoil_file)
+        self.assertEqual(
+            self.work_dir / "He-Default",
             self.mcerd.command_file)
 
         # These use the parent prefix, therefore they do not start with 'He'
         self.assertEqual(
-            self.directory / "Default.erd_target",
+            self.work_dir / "Default.erd_target",
             self.mcerd.target_file)
         self.assertEqual(
-            self.directory / "Default.erd_detector",
+            self.work_dir / "Default.erd_detector",
             self.mcerd.detector_file)
         self.assertEqual(
-            self.directory / "Default.foils",
+            self.work_dir / "Default.foils",
             self.mcerd.foils_file)
         self.assertEqual(
-            self.directory / "Default.pre",
+            self.work_dir / "Default.pre",
             self.mcerd.presimulation_file)
 
     def test_get_command_file_contents(self):
@@ -130,10 +133,10 @@ class TestMCERD(unittest.TestCase):
 
         expected = utils.get_template_file_contents(
             detector_file,
-            tgt_file=self.directory / "Default.erd_target",
-            det_file=self.directory / "Default.erd_detector",
-            rec_file=self.directory / "He-Default.recoil",
-            pre_file=self.directory / "Default.pre"
+            tgt_file=self.work_dir / "Default.erd_target",
+            det_file=self.work_dir / "Default.erd_detector",
+            rec_file=self.work_dir / "He-Default.recoil",
+            pre_file=self.work_dir / "Default.pre"
         )
         output = self.mcerd.get_command_file_contents()
 
@@ -144,7 +147,7 @@ class TestMCERD(unittest.TestCase):
 
         expected = utils.get_template_file_contents(
             detector_file,
-            foils_file=self.directory / "Default.foils"
+            foils_file=self.work_dir / "Default.foils"
         )
         output = self.mcerd.get_detector_file_contents()
 
@@ -177,3 +180,83 @@ class TestMCERD(unittest.TestCase):
         output = self.mcerd.get_recoil_file_contents()
 
         self.assertEqual(expected, output)
+
+    def test_processes_do_not_share_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings = {**self.settings, "sim_dir": tmp_dir}
+            mcerd1 = MCERD(1, settings, "Default")
+            mcerd2 = MCERD(2, settings, "Default")
+            self.assertNotEqual(mcerd1.work_dir, mcerd2.work_dir)
+
+            mcerd1.create_mcerd_files()
+            mcerd2.create_mcerd_files()
+            self.assertTrue(mcerd1.command_file.exists())
+            self.assertTrue(mcerd2.command_file.exists())
+
+            # MCERD writes its output next to the command file
+            output_file = mcerd1.work_dir / mcerd1.result_file.name
+            with output_file.open("a") as file:
+                file.write("foo\n")
+
+            mcerd1.delete_unneeded_files()
+            self.assertFalse(mcerd1.work_dir.exists())
+            self.assertEqual("foo\n", mcerd1.result_file.read_text())
+
+            # Files of the other process are left intact
+            self.assertTrue(mcerd2.command_file.exists())
+            self.assertTrue(mcerd2.target_file.exists())
+            self.assertTrue(mcerd2.presimulation_file.parent.exists())
+
+            # Last process also removes the parent of the working directories
+            mcerd2.delete_unneeded_files()
+            self.assertEqual(
+                ["He-Default.1.erd", "He-Default.2.erd"],
+                sorted(f.name for f in Path(tmp_dir).iterdir()))
+
+    def test_presimulation_key(self):
+        key = self.mcerd.get_presimulation_key()
+        # Seed, number of ions and file locations do not affect the key
+        settings = {
+            **self.settings,
+            "sim_dir": self.directory / "foo",
+            "number_of_ions": 10,
+        }
+        self.assertEqual(key, MCERD(7, settings, "bar").get_presimulation_key())
+
+        settings = {**self.settings, "number_of_ions_in_presimu": 10}
+        self.assertNotEqual(
+            key, MCERD(101, settings, "Default").get_presimulation_key())
+
+        settings = {**self.settings, "minimum_energy_of_ions": 1.0}
+        self.assertNotEqual(
+            key, MCERD(101, settings, "Default").get_presimulation_key())
+
+    def test_share_presimulation(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings = {**self.settings, "sim_dir": tmp_dir}
+            mcerd1 = MCERD(1, settings, "Default")
+            mcerd1.create_mcerd_files()
+            shared_file = mcerd1.get_shared_presimulation_file()
+            self.assertFalse(mcerd1.share_presimulation())
+
+            mcerd1.presimulation_file.write_text("foo")
+            old_file = Path(tmp_dir, "He-Default.abc.pre")
+            old_file.write_text("bar")
+            self.assertTrue(mcerd1.share_presimulation())
+            self.assertEqual("foo", shared_file.read_text())
+            self.assertFalse(old_file.exists())
+
+            settings = {
+                **settings,
+                "number_of_ions_in_presimu": 0,
+                "presimulation_file": shared_file
+            }
+            mcerd2 = MCERD(2, settings, "Default")
+            mcerd2.create_mcerd_files()
+            self.assertEqual("foo", mcerd2.presimulation_file.read_text())
+            self.assertNotEqual(
+                shared_file, mcerd2.presimulation_file)
+
+            mcerd1.delete_unneeded_files()
+            mcerd2.delete_unneeded_files()
+            self.assertTrue(shared_file.exists())
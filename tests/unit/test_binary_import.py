@@ -0,0 +1,100 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import tempfile
+import struct
+
+from unittest.mock import Mock
+
+import numpy as np
+
+import modules.binary_import as bi
+import modules.event_store as es
+
+from pathlib import Path
+
+
+class TestConvertLstFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lst_file = Path(self.tmp_dir.name, "mesu.lst")
+        self.asc_file = Path(self.tmp_dir.name, "mesu.asc")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_lst(self, pairs, extra=b""):
+        with self.lst_file.open("wb") as f:
+            for pair in pairs:
+                f.write(struct.pack("<hh", *pair))
+            f.write(extra)
+
+    def test_conversion(self):
+        pairs = [(0, 0), (1, 8192), (-32768, -32768), (32767, 32767),
+                 (1234, 9000)]
+        self.write_lst(pairs)
+        self.assertEqual(5, bi.convert_lst_file(self.lst_file, self.asc_file))
+        expected = "".join(f"{t} {e - 8192}\n" for t, e in pairs)
+        self.assertEqual(expected, self.asc_file.read_text())
+        self.assertIsNone(es.read_cache(self.asc_file))
+
+    def test_chunks(self):
+        rand = np.random.default_rng(5)
+        pairs = rand.integers(-2 ** 15, 2 ** 15, size=(1001, 2)).tolist()
+        self.write_lst(pairs)
+        progress = Mock()
+        bi.convert_lst_file(
+            self.lst_file, self.asc_file, chunk_size=100, progress=progress)
+        expected = "".join(f"{t} {e - 8192}\n" for t, e in pairs)
+        self.assertEqual(expected, self.asc_file.read_text())
+        self.assertEqual(12, progress.report.call_count)
+        progress.report.assert_called_with(100)
+
+    def test_incomplete_event_is_ignored(self):
+        self.write_lst([(5, 8200)], extra=b"\x01\x02")
+        self.assertEqual(1, bi.convert_lst_file(self.lst_file, self.asc_file))
+        self.assertEqual("5 8\n", self.asc_file.read_text())
+
+    def test_empty_file(self):
+        self.write_lst([])
+        self.assertEqual(0, bi.convert_lst_file(self.lst_file, self.asc_file))
+        self.assertEqual("", self.asc_file.read_text())
+
+    def test_event_cache_is_written(self):
+        pairs = [(10, 8200), (20, 8300), (30, 8100)]
+        self.write_lst(pairs)
+        bi.convert_lst_file(self.lst_file, self.asc_file,
+                            write_event_cache=True, chunk_size=2)
+        cached = es.read_cache(self.asc_file)
+        self.assertIsNotNone(cached)
+        np.testing.assert_array_equal(
+            es.EventStore.from_asc_file(self.asc_file).get_rows(),
+            cached.get_rows())
+
+
+if __name__ == '__main__':
+    unittest.main()
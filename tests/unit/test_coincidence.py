@@ -0,0 +1,228 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import tempfile
+
+from unittest.mock import Mock
+
+import numpy as np
+import tests.utils as utils
+
+import modules.coincidence as co
+import modules.event_store as es
+
+from modules.concurrency import CancellationToken
+
+from pathlib import Path
+
+
+class TestFindCoincidences(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = Path(self.tmp_dir.name, "events.evnt")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def find(self, lines, **kwargs):
+        self.file.write_text("header\n" + "".join(lines))
+        params = {
+            "skip_lines": 0,
+            "tablesize": 4,
+            "trigger": 1,
+            "adc_count": 2,
+            "timing": {"0": (-15, 15)},
+            **kwargs
+        }
+        return co.find_coincidences(self.file, **params).tolist()
+
+    def test_resource_file(self):
+        # Expected values are from the output of coinc
+        actual = co.find_coincidences(
+            utils.get_resource_dir() / "events.evnt", skip_lines=1,
+            tablesize=10, trigger=2, adc_count=3, timing={"1": (-1000, 1000)})
+        self.assertEqual([
+            [0, 0, 10, -100, 100, 0],
+            [0, 0, 20, 100, 200, 0],
+        ], actual.tolist())
+
+    def test_table_sizes(self):
+        lines = [
+            "0 1 100\n", "1 2 110\n", "0 3 120\n", "1 4 125\n", "0 5 130\n",
+            "1 6 150\n", "0 7 160\n"
+        ]
+        expected = [[1, -10, 2, 0], [3, -5, 4, 0], [7, 10, 6, 0]]
+        self.assertEqual(expected, self.find(lines, tablesize=4))
+        self.assertEqual(expected, self.find(lines, tablesize=20))
+        # With odd table sizes, coinc overwrites one of the events before
+        # it has been processed
+        self.assertEqual(
+            [[1, -10, 2, 0], [5, 5, 4, 0], [7, 10, 6, 0]],
+            self.find(lines, tablesize=5))
+
+    def test_nevents_and_timediff(self):
+        lines = ["0 1 100\n", "1 2 110\n", "0 3 120\n", "1 4 125\n"]
+        self.assertEqual(
+            [[1, 2]], self.find(lines, nevents=1, timediff=False))
+
+    def test_last_event_slot_is_reused(self):
+        # coinc processes the slot that should have contained the event
+        # after the last one again.
+        lines = ["1 9 100\n", "0 1 300\n", "0 2 305\n", "0 3 310\n"]
+        timing = {"0": (-1000, 1000)}
+        self.assertEqual([[1, 200, 9, 0], [3, 210, 9, 0]],
+                         self.find(lines, timing=timing))
+        self.assertEqual([[1, 200, 9, 0]],
+                         self.find(lines + ["0 4\n"], timing=timing))
+
+    def test_reading_stops_at_invalid_values(self):
+        lines = ["0 1 100\n", "1 2 110\n", "0 3 120\n", "1 4 125\n"]
+        self.assertEqual(
+            [[1, -10, 2, 0]],
+            self.find(lines[:2] + ["0 x 120\n"] + lines[2:]))
+        self.assertEqual(
+            [[1, -10, 2, 0]],
+            self.find(lines[:2] + ["2 3 120\n"] + lines[2:], tablesize=20))
+
+    def test_chunk_sizes(self):
+        rand = np.random.default_rng(1)
+        n = 2000
+        events = np.column_stack((
+            rand.integers(0, 3, n), rand.integers(0, 5000, n),
+            np.cumsum(rand.integers(-20, 100, n)) + 10 ** 6))
+        self.file.write_text("header\n" + "".join(
+            f"{a}\t{c}\t{t}\n" for a, c, t in events.tolist()))
+        params = {
+            "skip_lines": 0,
+            "trigger": 2,
+            "adc_count": 3,
+            "timing": {"0": (-100, 50), "1": (-30, 200)}
+        }
+        for tablesize in (2, 9, 10):
+            expected = co.find_coincidences(
+                self.file, tablesize=tablesize, **params)
+            self.assertGreater(len(expected), 0)
+            for chunk_size in (5, 1000):
+                np.testing.assert_array_equal(
+                    expected, co.find_coincidences(
+                        self.file, tablesize=tablesize,
+                        chunk_size=chunk_size, **params))
+
+    def test_skipping_too_many_lines(self):
+        self.assertEqual([], self.find(["1 2 3\n"], skip_lines=2))
+
+    def test_invalid_parameters(self):
+        self.assertRaises(ValueError, lambda: self.find([], adc_count=1))
+        self.assertRaises(ValueError, lambda: self.find([], tablesize=1))
+        self.assertRaises(ValueError, lambda: self.find([], trigger=2))
+        self.assertRaises(
+            ValueError, lambda: self.find([], timing={"200": (0, 1)}))
+
+
+class TestColumns(unittest.TestCase):
+    def test_parse_columns(self):
+        self.assertEqual([2, 4], co.parse_columns("$3,$5"))
+        self.assertEqual([0], co.parse_columns(" $1 "))
+        self.assertRaises(ValueError, lambda: co.parse_columns("$0"))
+        self.assertRaises(ValueError, lambda: co.parse_columns("3"))
+        self.assertRaises(ValueError, lambda: co.parse_columns(""))
+
+    def test_format_lines(self):
+        coincs = np.array([[1, 2, 3], [4, 5, -6]])
+        self.assertEqual(["3 1\n", "-6 4\n"],
+                         co.format_lines(coincs, [2, 0]))
+        # Like in awk, columns that do not exist are empty
+        self.assertEqual(["2 \n", "5 \n"], co.format_lines(coincs, [1, 3]))
+
+    def test_import_coincidences(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            asc_file = Path(tmp_dir, "mesu.asc")
+            selected = co.import_coincidences(
+                utils.get_resource_dir() / "events.evnt", asc_file, "$3,$5",
+                skip_lines=1, tablesize=10, trigger=2, adc_count=3,
+                timing={"1": (-1000, 1000)})
+            self.assertEqual([[10, 100], [20, 200]], selected.tolist())
+            self.assertEqual("10 100\n20 200\n", asc_file.read_text())
+            np.testing.assert_array_equal(
+                [[10, 100, 1], [20, 200, 2]],
+                es.read_cache(asc_file).get_rows())
+
+
+
+class TestImportFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.resource = utils.get_resource_dir() / "events.evnt"
+        self.params = {
+            "skip_lines": 1,
+            "tablesize": 10,
+            "trigger": 2,
+            "adc_count": 3,
+            "timing": {"1": (-1000, 1000)},
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_files_are_imported_in_parallel(self):
+        missing = Path(self.tmp_dir.name, "missing.evnt")
+        files = [
+            (self.resource, Path(self.tmp_dir.name, f"{i}.asc"))
+            for i in range(3)
+        ]
+        files.append((missing, Path(self.tmp_dir.name, "missing.asc")))
+        progress = Mock()
+        errors = co.import_files(
+            files, "$3,$5", max_workers=2, progress=progress, **self.params)
+
+        self.assertEqual([missing], list(errors))
+        self.assertIsInstance(errors[missing], OSError)
+        for _, asc_file in files[:-1]:
+            self.assertEqual("10 100\n20 200\n", asc_file.read_text())
+        self.assertFalse(files[-1][1].exists())
+        progress.report.assert_called_with(100)
+
+    def test_cancelled_import_writes_nothing(self):
+        ct = CancellationToken()
+        ct.request_cancellation()
+        asc_file = Path(self.tmp_dir.name, "mesu.asc")
+        errors = co.import_files(
+            [(self.resource, asc_file)], "$3,$5", ct=ct, **self.params)
+        self.assertEqual({}, errors)
+        self.assertFalse(asc_file.exists())
+
+    def test_cancellation_returns_found_coincidences(self):
+        ct = CancellationToken()
+        ct.request_cancellation()
+        self.assertEqual(
+            0, len(co.import_coincidences(
+                self.resource, Path(self.tmp_dir.name, "mesu.asc"), "$3",
+                ct=ct, **self.params)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,6 +28,8 @@ import unittest
 import os
 import tempfile
 import random
+
+import numpy as np
 import tests.utils as utils
 import tests.mock_objects as mo
 
@@ -80,6 +82,8 @@ class TestCutFile(unittest.TestCase):
 
             self.assertIsNone(cut1_d.pop("element_number"))
             self.assertEqual(0, cut2_d.pop("element_number"))
+            np.testing.assert_array_equal(
+                cut1_d.pop("data"), cut2_d.pop("data"))
 
             self.assertTrue(len(cut1_d) > 0)
             self.assertEqual(cut1_d, cut2_d)
@@ -98,6 +102,118 @@ class TestCutFile(unittest.TestCase):
                 "He.RBS_Cl.1.cut": mo.get_element(symbol="Cl"),
             }, rbs)
 
+    def test_binary_loading(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, self.rel_dir)
+            cut1 = CutFile(directory=path, split_count=4, binary=True)
+            cut1.set_info(mo.get_selection(), self.data)
+            cut1.save()
+
+            fp = path / "mesu1.He.RBS_Cl.0.cut"
+            self.assertTrue(cut_file.is_binary(fp))
+
+            cut2 = CutFile(cut_file_path=fp)
+            self.assertTrue(cut2.binary)
+            cut1_d = dict(vars(cut1))
+            cut2_d = dict(vars(cut2))
+            cut1_d.pop("element_number")
+            cut2_d.pop("element_number")
+            np.testing.assert_array_equal(
+                cut1_d.pop("data"), cut2_d.pop("data"))
+            self.assertEqual(cut1_d, cut2_d)
+
+            self.assertTrue(cut_file.is_rbs(fp))
+            self.assertEqual(
+                mo.get_element(symbol="Cl"), cut_file.get_scatter_element(fp))
+
+    def test_legacy_export_matches_text_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            text_dir = Path(tmp_dir, "text", self.rel_dir)
+            binary_dir = Path(tmp_dir, "binary", self.rel_dir)
+            for directory, binary in (text_dir, False), (binary_dir, True):
+                cut = CutFile(directory=directory, binary=binary)
+                cut.set_info(mo.get_selection(), self.data)
+                cut.save()
+            text_file = text_dir / "mesu1.He.RBS_Cl.0.cut"
+            binary_file = binary_dir / "mesu1.He.RBS_Cl.0.cut"
+            self.assertFalse(cut_file.is_binary(text_file))
+            self.assertEqual(
+                cut_file.read_header(text_file),
+                cut_file.read_header(binary_file))
+
+            output_file = Path(tmp_dir, "legacy.cut")
+            cut_file.export_legacy(binary_file, output_file)
+            self.assertEqual(text_file.read_text(), output_file.read_text())
+            self.assertRaises(
+                ValueError,
+                lambda: cut_file.export_legacy(text_file, output_file))
+
+            with cut_file.legacy_cut_files(
+                    [text_file, binary_file]) as legacy_files:
+                self.assertEqual(text_file, legacy_files[0])
+                self.assertEqual(binary_file.name, legacy_files[1].name)
+                self.assertEqual(
+                    text_file.read_text(), legacy_files[1].read_text())
+            self.assertFalse(legacy_files[1].exists())
+
+    def test_split(self):
+        reference = CutFile()
+        reference.data = _cut_data([1, 3, 4, 7, 9, 10, 12])
+        cut = CutFile()
+        cut.data = _cut_data([0, 1, 2, 4, 5, 8, 9, 11, 12, 13])
+
+        splits = cut.split(reference, splits=3, save=False)
+        # Reference splits end at event numbers 3, 7 and 10
+        self.assertEqual(
+            [[0, 1, 2], [4, 5], [8, 9]],
+            [split[:, -1].tolist() for split in splits])
+
+        # More splits than events in reference cut
+        self.assertEqual(
+            [9, 0, 0, 0, 0, 0, 0, 0],
+            [len(split) for split in cut.split(reference, 8, save=False)])
+
+        empty = CutFile()
+        self.assertEqual(
+            [(0, 3), (0, 3)],
+            [split.shape for split in empty.split(reference, 2, save=False)])
+
+    def test_split_with_unsorted_event_numbers(self):
+        reference = CutFile()
+        reference.data = _cut_data([5, 2, 8, 9])
+        cut = CutFile()
+        cut.data = _cut_data([1, 6, 3, 7, 8, 2])
+        # Splits are filled in order until an event number exceeds the
+        # split's last reference event number
+        self.assertEqual(
+            [[1], [], [6, 3, 7, 8, 2]],
+            [split[:, -1].tolist()
+             for split in cut.split(reference, splits=3, save=False)])
+
+    def test_saved_splits(self):
+        reference = CutFile()
+        reference.data = _cut_data([1, 3, 4, 7])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, self.rel_dir)
+            cut = CutFile(directory=path)
+            cut.set_info(mo.get_selection(), _cut_data([0, 1, 2, 4, 5, 7]))
+            cut.save()
+            cut_file_path, = path.glob("*.cut")
+            cut = CutFile()
+            cut.load_file(cut_file_path)
+            cut.split(reference, splits=2)
+
+            files = sorted(set(path.glob("*.cut")) - {cut_file_path})
+            self.assertEqual(2, len(files))
+            for i, (file, expected) in enumerate(zip(files, [3, 3])):
+                split = CutFile()
+                split.load_file(file)
+                self.assertEqual(expected, split.count)
+                self.assertTrue(file.name.endswith(f".{i}.cut"))
+                self.assertEqual(2, split.split_count)
+                self.assertEqual(
+                    cut.weight_factor * 2, split.weight_factor)
+
     def _generate_cut_files(self, directory):
         cut = CutFile(directory=directory)
         cut.set_info(mo.get_selection(), self.data)
@@ -119,5 +235,9 @@ class TestCutFile(unittest.TestCase):
         cut3.save(element_count=10)
 
 
+def _cut_data(event_numbers):
+    return np.array([[0, 0, n] for n in event_numbers]).reshape(-1, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
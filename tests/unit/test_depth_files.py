@@ -26,10 +26,20 @@ __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
 import unittest
+import tempfile
+import os
+import numpy as np
+import tests.mock_objects as mo
+import tests.utils as utils
 
 import modules.depth_files as depth_files
 
+from pathlib import Path
+from unittest.mock import patch
+
 from modules.depth_files import DepthProfile
+from modules.depth_files import DepthFileCache
+from modules.depth_files import DepthFileGenerator
 from modules.element import Element
 
 
@@ -38,22 +48,22 @@ class TestDepthProfile(unittest.TestCase):
     def test_initialization(self):
         """Tests the initialization of a DepthProfile object"""
         dp = DepthProfile([1], [2])
-        self.assertEqual((1,), dp.depths)
-        self.assertEqual((2,), dp.concentrations)
+        np.testing.assert_array_equal((1,), dp.depths)
+        np.testing.assert_array_equal((2,), dp.concentrations)
         self.assertIsNone(dp.events)
         self.assertEqual("total", dp.get_profile_name())
 
-        # Currently the order of depth counts, or validity of
-        # numerical values is not checked so following is ok.
-        dp = DepthProfile([2, 1], [True, "Foo"])
-        self.assertEqual((2, 1), dp.depths)
-        self.assertEqual((True, "Foo"), dp.concentrations)
+        # Currently the order of depth counts is not checked so following
+        # is ok.
+        dp = DepthProfile([2, 1], [True, 3])
+        np.testing.assert_array_equal((2, 1), dp.depths)
+        np.testing.assert_array_equal((1, 3), dp.concentrations)
 
         dp = DepthProfile([1], [2], [3],
                           element=Element.from_string("Si"))
-        self.assertEqual((1,), dp.depths)
-        self.assertEqual((2,), dp.concentrations)
-        self.assertEqual((3,), dp.events)
+        np.testing.assert_array_equal((1,), dp.depths)
+        np.testing.assert_array_equal((2,), dp.concentrations)
+        np.testing.assert_array_equal((3,), dp.events)
         self.assertEqual("Si", dp.get_profile_name())
 
         self.assertRaises(ValueError,
@@ -68,21 +78,10 @@ class TestDepthProfile(unittest.TestCase):
                               [1], [1], [], element=Element.from_string("Si")))
 
     def test_bad_inputs(self):
-        # Note: these behaviours may change in the future
-        # Currently DepthProfile accepts non-numerical values that have __len__
-        dp = DepthProfile("foo", "bar")
-        self.assertEqual(dp.depths, ("f", "o", "o"))
-        self.assertEqual(dp.concentrations, ("b", "a", "r"))
-
-        # These can also be iterated over
-        for val in dp:
-            self.assertEqual(("f", "b", 0), val)
-            break
-
-        # Numerical operations such as calculating relative
-        # concentrations will fail
-        self.assertRaises(TypeError,
-                          lambda: dp.get_relative_concentrations(dp))
+        # Values are stored as numbers so non-numerical values are not
+        # accepted
+        self.assertRaises(ValueError, lambda: DepthProfile("foo", "bar"))
+        self.assertRaises(ValueError, lambda: DepthProfile([1], ["bar"]))
 
         # element parameter should be an Element type if specified
         self.assertRaises(TypeError,
@@ -140,15 +139,15 @@ class TestDepthProfile(unittest.TestCase):
 
         dp3 = dp1 + dp2
         self.assertIsInstance(dp3, DepthProfile)
-        self.assertEqual(dp3.depths, (0, 1, 2))
-        self.assertEqual(dp3.concentrations, (25, 27, 29))
+        np.testing.assert_array_equal(dp3.depths, (0, 1, 2))
+        np.testing.assert_array_equal(dp3.concentrations, (25, 27, 29))
         self.assertIsNone(dp3.events)
         self.assertEqual(dp3.get_profile_name(), "total")
 
         # DepthProfile can be incremented by another DepthProfile
         dp3 += dp3
-        self.assertEqual(dp3.depths, (0, 1, 2))
-        self.assertEqual(dp3.concentrations, (50, 54, 58))
+        np.testing.assert_array_equal(dp3.depths, (0, 1, 2))
+        np.testing.assert_array_equal(dp3.concentrations, (50, 54, 58))
         self.assertIsNone(dp3.events)
         self.assertEqual(dp3.get_profile_name(), "total")
 
@@ -161,13 +160,13 @@ class TestDepthProfile(unittest.TestCase):
         dp2 = DepthProfile([0, 1], [3, 4], [1, 2], Element.from_string("Si"))
 
         dp3 = dp2 - dp1
-        self.assertEqual((1, 1), dp3.concentrations)
-        self.assertEqual((0, 1), dp3.depths)
+        np.testing.assert_array_equal((1, 1), dp3.concentrations)
+        np.testing.assert_array_equal((0, 1), dp3.depths)
         self.assertIsNone(dp3.events)
         self.assertIsNone(dp3.element)
 
         dp3 -= dp3
-        self.assertEqual((0, 0), dp3.concentrations)
+        np.testing.assert_array_equal((0, 0), dp3.concentrations)
 
     def test_merging(self):
         dp1 = DepthProfile([0, 1, 2, 3, 4],
@@ -181,36 +180,36 @@ class TestDepthProfile(unittest.TestCase):
 
         dp3 = dp1.merge(dp2, 1, 3)
 
-        self.assertEqual(dp1.depths, dp3.depths)
-        self.assertEqual((1, 2, 2, 2, 1), dp3.concentrations)
-        self.assertEqual((1, 1, 1, 1, 1), dp3.events)
+        np.testing.assert_array_equal(dp1.depths, dp3.depths)
+        np.testing.assert_array_equal((1, 2, 2, 2, 1), dp3.concentrations)
+        np.testing.assert_array_equal((1, 1, 1, 1, 1), dp3.events)
         self.assertEqual("Si", dp3.get_profile_name())
 
         # Original depth profiles remain unchanged
-        self.assertEqual(dp1.depths, (0, 1, 2, 3, 4))
-        self.assertEqual(dp2.depths, (0, 1, 2, 3, 4))
-        self.assertEqual(dp1.concentrations, (1, 1, 1, 1, 1))
-        self.assertEqual(dp2.concentrations, (2, 2, 2, 2, 2))
-        self.assertEqual(dp1.events, (1, 1, 1, 1, 1))
-        self.assertEqual(dp2.events, (2, 2, 2, 2, 2))
+        np.testing.assert_array_equal(dp1.depths, (0, 1, 2, 3, 4))
+        np.testing.assert_array_equal(dp2.depths, (0, 1, 2, 3, 4))
+        np.testing.assert_array_equal(dp1.concentrations, (1, 1, 1, 1, 1))
+        np.testing.assert_array_equal(dp2.concentrations, (2, 2, 2, 2, 2))
+        np.testing.assert_array_equal(dp1.events, (1, 1, 1, 1, 1))
+        np.testing.assert_array_equal(dp2.events, (2, 2, 2, 2, 2))
         self.assertEqual(dp1.element, Element.from_string("Si"))
         self.assertEqual(dp2.element, Element.from_string("Si"))
 
         # Testing merging at different depths
         dp3 = dp1.merge(dp2, 1, 3.5)
-        self.assertEqual((1, 2, 2, 2, 1), dp3.concentrations)
+        np.testing.assert_array_equal((1, 2, 2, 2, 1), dp3.concentrations)
 
         dp3 = dp1.merge(dp2, 0.5, 4)
-        self.assertEqual((1, 2, 2, 2, 2), dp3.concentrations)
+        np.testing.assert_array_equal((1, 2, 2, 2, 2), dp3.concentrations)
 
         dp3 = dp1.merge(dp2, -1, 6)
-        self.assertEqual((2, 2, 2, 2, 2), dp3.concentrations)
+        np.testing.assert_array_equal((2, 2, 2, 2, 2), dp3.concentrations)
 
         dp3 = dp2.merge(dp1, 4, 6)
-        self.assertEqual((2, 2, 2, 2, 1), dp3.concentrations)
+        np.testing.assert_array_equal((2, 2, 2, 2, 1), dp3.concentrations)
 
         dp3 = dp2.merge(dp1, 3, 2)
-        self.assertEqual((2, 2, 2, 2, 2), dp3.concentrations)
+        np.testing.assert_array_equal((2, 2, 2, 2, 2), dp3.concentrations)
 
     def test_uneven_depth_lenghts(self):
         """Testing how DepthProfile operations work when they have uneven
@@ -322,3 +321,104 @@ class TestDepthFiles(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestDepthFileCache(unittest.TestCase):
+    def setUp(self):
+        self.cut_files = [
+            Path(utils.get_resource_dir(), "cuts.1H.ERD.0.cut"),
+            Path(utils.get_resource_dir(), "cuts.7Li.0.0.0.cut"),
+        ]
+
+    def test_key_depends_on_inputs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tof_in = Path(tmp_dir, "tof.in")
+            tof_in.write_text("Depth step for output: 10\n")
+            key = DepthFileCache.get_key(self.cut_files, tof_in)
+            self.assertEqual(
+                key, DepthFileCache.get_key(self.cut_files, tof_in))
+            self.assertNotEqual(
+                key, DepthFileCache.get_key(self.cut_files[:1], tof_in))
+
+            tof_in.write_text("Depth step for output: 5\n")
+            self.assertNotEqual(
+                key, DepthFileCache.get_key(self.cut_files, tof_in))
+
+    def test_depth_files_are_restored_from_cache(self):
+        def run(generator):
+            for name in ("depth.1H", "depth.7Li", "depth.total"):
+                Path(generator._output_path.parent, name).write_text(name)
+            return 0
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            output_dir = tmp_dir / "depth"
+            cache = DepthFileCache(tmp_dir / "cache", 2 ** 20)
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+
+            with patch.object(DepthFileGenerator, "run", autospec=True,
+                              side_effect=run) as mock_run:
+                depth_files.generate_depth_files(
+                    self.cut_files, output_dir, mesu, tof_in_dir=tmp_dir,
+                    cache=cache)
+                (output_dir / "depth.1H").unlink()
+                depth_files.generate_depth_files(
+                    self.cut_files, output_dir, mesu, tof_in_dir=tmp_dir,
+                    cache=cache)
+                mock_run.assert_called_once()
+
+            self.assertEqual(
+                ["depth.1H", "depth.7Li", "depth.total"],
+                sorted(os.listdir(output_dir)))
+            self.assertEqual(
+                "depth.1H", (output_dir / "depth.1H").read_text())
+
+            # Different cut files are not found in the cache
+            with patch.object(DepthFileGenerator, "run", autospec=True,
+                              side_effect=run) as mock_run:
+                depth_files.generate_depth_files(
+                    self.cut_files[:1], output_dir, mesu,
+                    tof_in_dir=tmp_dir, cache=cache)
+                mock_run.assert_called_once()
+
+    def test_failed_runs_are_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            output_dir = tmp_dir / "depth"
+            output_dir.mkdir()
+            (output_dir / "depth.1H").write_text("partial")
+            cache = DepthFileCache(tmp_dir / "cache", 2 ** 20)
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+            with patch.object(DepthFileGenerator, "run", return_value=1):
+                depth_files.generate_depth_files(
+                    self.cut_files, output_dir, mesu, tof_in_dir=tmp_dir,
+                    cache=cache)
+            self.assertFalse((tmp_dir / "cache").exists())
+
+    def test_least_recently_used_entries_are_evicted(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            cache = DepthFileCache(tmp_dir / "cache", 250)
+            output_dir = tmp_dir / "depth"
+            output_dir.mkdir()
+            (output_dir / "depth.total").write_text("x" * 100)
+
+            cache.put("a", output_dir)
+            cache.put("b", output_dir)
+            os.utime(cache.directory / "a", ns=(0, 0))
+            os.utime(cache.directory / "b", ns=(1, 1))
+            self.assertTrue(cache.get("a", output_dir))
+            cache.put("c", output_dir)
+
+            self.assertEqual(["a", "c"], sorted(os.listdir(cache.directory)))
+            self.assertFalse(cache.get("b", output_dir))
+
+    def test_cache_is_disabled_in_settings(self):
+        settings = mo.get_global_settings()
+        settings.set_depth_cache_size(0)
+        self.assertIsNone(DepthFileCache.from_settings(settings))
+        settings.set_depth_cache_size(1)
+        cache = DepthFileCache.from_settings(settings)
+        self.assertEqual(2 ** 20, cache.max_size)
+        self.assertEqual(
+            settings.get_depth_cache_directory(), cache.directory)
@@ -0,0 +1,115 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import tempfile
+
+import numpy as np
+import tests.utils as utils
+import tests.mock_objects as mo
+
+from pathlib import Path
+from unittest.mock import patch
+
+from modules.cut_file import CutFile
+from modules.element_losses import CutEventIndex
+from modules.element_losses import ElementLosses
+from modules.measurement import Measurement
+
+
+class TestElementLosses(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        mesu_dir = Path(self.tmp_dir.name, f"{Measurement.DIRECTORY_PREFIX}"
+                                           f"01-mesu")
+        self.cuts_dir = mesu_dir / "data" / "cuts"
+        self.changes_dir = mesu_dir / "Composition_changes"
+        (self.changes_dir / "Changes").mkdir(parents=True)
+
+        self.reference = self.save_cut(
+            "He", [1, 3, 4, 7, 9, 10, 12])
+        self.cut = self.save_cut("F", [0, 1, 2, 4, 5, 8, 9, 11, 12, 13])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def save_cut(self, symbol, event_numbers):
+        cut = CutFile(directory=self.cuts_dir)
+        cut.set_info(mo.get_selection(),
+                     [[0, 0, n] for n in event_numbers])
+        cut.element = mo.get_element(symbol=symbol)
+        cut.type = "ERD"
+        cut.save()
+        return self.cuts_dir / f"mesu.{symbol}.ERD.0.cut"
+
+    def get_losses(self, partition_count, cut_index=None):
+        return ElementLosses(
+            self.cuts_dir, self.changes_dir, self.reference,
+            [self.reference, self.cut], partition_count, cut_index=cut_index)
+
+    def test_has_slots(self):
+        utils.assert_has_slots(self.get_losses(1))
+        utils.assert_has_slots(CutEventIndex())
+
+    def test_count_element_cuts(self):
+        self.assertEqual({
+            "He.ERD.0": [2, 2, 2],
+            "F.ERD.0": [3, 2, 2],
+        }, self.get_losses(3).count_element_cuts())
+        self.assertEqual({
+            "He.ERD.0": [7],
+            "F.ERD.0": [9],
+        }, self.get_losses(1).count_element_cuts())
+        self.assertEqual([], list((self.changes_dir / "Changes").iterdir()))
+
+    def test_cut_files_are_loaded_once(self):
+        cut_index = CutEventIndex()
+        self.get_losses(3, cut_index=cut_index).count_element_cuts()
+        with patch.object(CutFile, "load_file") as mock_load:
+            counts = self.get_losses(
+                2, cut_index=cut_index).count_element_cuts()
+            mock_load.assert_not_called()
+        self.assertEqual([3, 3], counts["He.ERD.0"])
+
+        # Changed cut file is reloaded
+        self.cut.unlink()
+        self.save_cut("F", [1, 2])
+        np.testing.assert_array_equal([1, 2], cut_index.get_events(self.cut))
+
+    def test_save_splits(self):
+        self.get_losses(3).count_element_cuts(save_splits=True)
+        self.assertEqual([
+            "mesu.F.ERD.0.0.cut", "mesu.F.ERD.0.1.cut", "mesu.F.ERD.0.2.cut",
+            "mesu.He.ERD.0.0.cut", "mesu.He.ERD.0.1.cut",
+            "mesu.He.ERD.0.2.cut"
+        ], sorted(f.name for f in (self.changes_dir / "Changes").iterdir()))
+        split = CutFile(
+            cut_file_path=self.changes_dir / "Changes" / "mesu.F.ERD.0.1.cut")
+        np.testing.assert_array_equal([4, 5], split.data[:, -1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,14 +29,29 @@ import tests.mock_objects as mo
 import tests.utils as utils
 import tempfile
 import os
+import time
 import numpy as np
 
 from pathlib import Path
+from unittest.mock import patch
+from unittest.mock import Mock
+
+import modules.general_functions as gf
 
 from modules.energy_spectrum import EnergySpectrum
+from modules.energy_spectrum import ToFListCache
+from modules.energy_spectrum import SpectrumCache
 from modules.parsing import ToFListParser
+from modules.parsing import ToFListArrayParser
 
 parser = ToFListParser()
+array_parser = ToFListArrayParser()
+
+
+def to_columns(rows):
+    """Converts tof_list rows into the columns returned by tof_list."""
+    return array_parser.parse_str(
+        "".join(f"{' '.join(str(x) for x in row)}\n" for row in rows))
 
 
 class TestCalculateMeasuredSpectra(unittest.TestCase):
@@ -237,5 +252,330 @@ class TestGetTofListFileName(unittest.TestCase):
         )
 
 
+class TestLoadCuts(unittest.TestCase):
+    def test_results_are_in_cut_file_order(self):
+        cuts = [
+            Path("cuts.1H.ERD.0.cut"),
+            Path("cuts.35Cl.RBS_Mn.0.cut"),
+            Path("cuts.7Li.0.0.0.cut"),
+            Path("cuts.1H.ERD.1.cut"),
+        ]
+        delays = {
+            "cuts.1H.ERD.0.cut": 0.15,
+            "cuts.35Cl.RBS_Mn.0.cut": 0,
+            "cuts.7Li.0.0.0.cut": 0.05,
+            "cuts.1H.ERD.1.cut": 0.1,
+        }
+
+        def tof_list(cut_file, *_, **__):
+            time.sleep(delays[cut_file.name])
+            return to_columns(
+                [(0.0, 0.0, delays[cut_file.name], 1, 1.0, "ERD", 2.0, 1)])
+
+        progress = Mock()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for cut in cuts:
+                (tmp_dir / cut).write_text(cut.name)
+            cuts = [tmp_dir / cut for cut in cuts]
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+            with patch.object(EnergySpectrum, "tof_list",
+                              side_effect=tof_list) as mock_tof_list, \
+                    patch.object(EnergySpectrum, "tof_list_cache",
+                                 ToFListCache()):
+                es = EnergySpectrum(mesu, cuts, 1, progress=progress)
+                self.assertEqual(4, mock_tof_list.call_count)
+
+        spectra = es._tof_listed_files
+        self.assertEqual(
+            ["1H.ERD.0", "35Cl.RBS_Mn.0", "7Li.0.0.0", "1H.ERD.1"],
+            list(spectra))
+        for cut, (energies, weights) in zip(cuts, spectra.values()):
+            np.testing.assert_array_equal([delays[cut.name]], energies)
+            np.testing.assert_array_equal([2.0], weights)
+
+        reported = [c.args[0] for c in progress.report.call_args_list]
+        self.assertEqual([22.5, 45, 67.5, 90, 100], reported)
+
+    def test_library_configuration_is_shared_and_closed(self):
+        cuts = [Path("cuts.1H.ERD.0.cut"), Path("cuts.1H.ERD.1.cut")]
+        config = Mock()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            for cut in cuts:
+                (tmp_dir / cut).write_text(cut.name)
+            cuts = [tmp_dir / cut for cut in cuts]
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+            with patch.object(EnergySpectrum, "get_tof_list_config",
+                              return_value=config) as mock_config, \
+                    patch.object(EnergySpectrum, "tof_list",
+                                 return_value=to_columns([])) as mock_tof, \
+                    patch.object(EnergySpectrum, "tof_list_cache",
+                                 ToFListCache()):
+                EnergySpectrum(mesu, cuts, 1)
+
+        mock_config.assert_called_once()
+        self.assertEqual(2, mock_tof.call_count)
+        for c in mock_tof.call_args_list:
+            self.assertIs(config, c.kwargs["config"])
+        config.close.assert_called_once()
+
+
+class TestToFListLibrary(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            (0.0, 0.0, 0.53703, 1, 1.0078, "ERD", 1.0, 764),
+            (0.0, 0.0, 0.94982, 1, 1.0078, "ERD", 0.5, 3688),
+        ]
+        self.cut_file = Path(utils.get_resource_dir(), "cuts.1H.ERD.0.cut")
+
+    def test_library_output_is_written_to_tof_list_file(self):
+        config = Mock()
+        config.convert.return_value = to_columns(self.rows)
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch("subprocess.Popen") as mock_popen:
+            directory = Path(tmp_dir)
+            data = EnergySpectrum.tof_list(
+                self.cut_file, directory, config=config)
+            tof_list_file = EnergySpectrum.get_tof_list_file_name(
+                directory, self.cut_file)
+            self.assertEqual(self.rows, array_parser.to_rows(
+                array_parser.parse_file(tof_list_file)))
+
+        mock_popen.assert_not_called()
+        config.convert.assert_called_once_with(self.cut_file)
+        self.assertEqual(self.rows, array_parser.to_rows(data))
+
+    def test_executable_is_used_if_library_fails(self):
+        config = Mock()
+        config.convert.side_effect = ValueError("no stopping")
+        with patch("modules.subprocess_utils.process_output",
+                   return_value=to_columns(self.rows)) as mock_output, \
+                patch("subprocess.Popen"), \
+                self.assertLogs("mesu", level="WARNING"):
+            data = EnergySpectrum.tof_list(
+                self.cut_file, logger_name="mesu", config=config)
+
+        mock_output.assert_called_once()
+        self.assertEqual(self.rows, array_parser.to_rows(data))
+
+    def test_configuration_is_not_created_without_library(self):
+        with patch("modules.tof_list.load_library", return_value=None):
+            self.assertIsNone(
+                EnergySpectrum.get_tof_list_config(Path("tof.in")))
+
+
+class TestToFListCache(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            (0.0, 0.0, 0.53703, 1, 1.0078, "ERD", 1.0, 764),
+            (0.0, 0.0, 0.94982, 1, 1.0078, "ERD", 0.5, 3688),
+            (0.0, 0.0, 1.55655, 1, 1.0078, "ERD", 2.0, 7581),
+        ]
+
+    def calculate(self, mesu, cuts, width, **kwargs):
+        return EnergySpectrum.calculate_measured_spectra(
+            mesu, cuts, width, verbose=False, **kwargs)
+
+    def test_spectra_are_rebinned_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            cut = tmp_dir / "cuts.1H.ERD.0.cut"
+            cut.write_text("cut")
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+
+            def tof_list(cut_file, directory, **_):
+                with EnergySpectrum.get_tof_list_file_name(
+                        directory, cut_file).open("w") as file:
+                    file.write("tof_list output")
+                return to_columns(self.rows)
+
+            with patch.object(EnergySpectrum, "tof_list",
+                              side_effect=tof_list) as mock_tof_list, \
+                    patch.object(EnergySpectrum, "tof_list_cache",
+                                 ToFListCache()), \
+                    patch.object(EnergySpectrum, "spectrum_cache",
+                                 SpectrumCache()):
+                espe_1 = self.calculate(mesu, [cut], 1.0)
+                espe_05 = self.calculate(mesu, [cut], 0.5)
+                espe_eff = self.calculate(
+                    mesu, [cut], 0.5, use_efficiency=True)
+                self.assertEqual(1, mock_tof_list.call_count)
+
+                # Changing the cut file invalidates the cached results
+                cut.write_text("new cut")
+                self.calculate(mesu, [cut], 0.5)
+                self.assertEqual(2, mock_tof_list.call_count)
+
+                # So does removing the .tof_list file
+                EnergySpectrum.get_tof_list_file_name(
+                    mesu.get_energy_spectra_dir(), cut).unlink()
+                self.calculate(mesu, [cut], 0.25)
+                self.assertEqual(3, mock_tof_list.call_count)
+
+        self.assertEqual(
+            gf.hist(self.rows, col=2, width=1.0), espe_1["1H.ERD.0"][1:-1])
+        self.assertEqual(
+            gf.hist(self.rows, col=2, width=0.5), espe_05["1H.ERD.0"][1:-1])
+        self.assertEqual(
+            gf.hist(self.rows, col=2, weight_col=6, width=0.5),
+            espe_eff["1H.ERD.0"][1:-1])
+
+    def test_entries_are_read_from_directory(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            cut = tmp_dir / "cut"
+            tof_in = tmp_dir / "tof.in"
+            cut.write_text("cut")
+            tof_in.write_text("Efficiency directory: foo")
+
+            cache = ToFListCache(tmp_dir / "cache")
+            key = cache.get_key(cut, tof_in, no_foil=False)
+            self.assertNotEqual(key, cache.get_key(cut, tof_in, no_foil=True))
+            self.assertIsNone(cache.get(key))
+            cache.put(key, np.array([1.0, 2.0]), np.array([0.5, 1.5]))
+
+            energies, weights = ToFListCache(tmp_dir / "cache").get(key)
+            np.testing.assert_array_equal([1.0, 2.0], energies)
+            np.testing.assert_array_equal([0.5, 1.5], weights)
+
+    def test_least_recently_used_files_are_removed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            directory = Path(tmp_dir)
+            cache = ToFListCache(directory)
+            cache.put("a", np.zeros(2), np.zeros(2))
+            entry_size = (directory / "a.tof_list.npz").stat().st_size
+
+            cache = ToFListCache(directory, max_size=2 * entry_size)
+            cache.put("b", np.zeros(2), np.zeros(2))
+            os.utime(directory / "a.tof_list.npz", (0, 0))
+            os.utime(directory / "b.tof_list.npz", (1, 1))
+            # Reading an entry from the directory marks it used
+            ToFListCache(directory).get("a")
+            cache.put("c", np.zeros(2), np.zeros(2))
+
+            self.assertEqual(
+                ["a.tof_list.npz", "c.tof_list.npz"],
+                sorted(f.name for f in directory.iterdir()))
+
+    def test_cache_from_settings(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings = mo.get_global_settings()
+            settings.set_tof_list_cache_directory(Path(tmp_dir))
+            settings.set_tof_list_cache_size(2)
+            cache = ToFListCache.from_settings(settings)
+            self.assertEqual(Path(tmp_dir).resolve(), cache.directory)
+            self.assertEqual(2 * 2 ** 20, cache.max_size)
+
+            settings.set_tof_list_cache_size(0)
+            self.assertIsNone(ToFListCache.from_settings(settings).directory)
+
+            with patch.object(EnergySpectrum, "tof_list_cache", None):
+                cache = EnergySpectrum.get_tof_list_cache(settings)
+                self.assertIsNone(cache.directory)
+                self.assertIs(
+                    cache, EnergySpectrum.get_tof_list_cache(
+                        mo.get_global_settings()))
+
+    def test_oldest_entries_are_evicted(self):
+        cache = ToFListCache()
+        with patch.object(ToFListCache, "MAX_EVENTS", 4):
+            cache.put("a", np.zeros(2), np.zeros(2))
+            cache.put("b", np.zeros(2), np.zeros(2))
+            cache.get("a")
+            cache.put("c", np.zeros(2), np.zeros(2))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+
+
+class TestSpectrumCache(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            (0.0, 0.0, 0.53703, 1, 1.0078, "ERD", 1.0, 764),
+            (0.0, 0.0, 1.55655, 1, 1.0078, "ERD", 2.0, 7581),
+        ]
+
+    def test_cached_spectra_are_returned_without_tof_list(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            cuts = [tmp_dir / "cuts.1H.ERD.0.cut", tmp_dir / "cuts.O.0.0.cut"]
+            for cut in cuts:
+                cut.write_text(cut.name)
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+            cache = SpectrumCache()
+
+            def calculate(cut_files, width, **kwargs):
+                return EnergySpectrum.calculate_measured_spectra(
+                    mesu, cut_files, width, verbose=False, **kwargs)
+
+            with patch.object(EnergySpectrum, "tof_list",
+                              return_value=to_columns(self.rows)) \
+                    as mock_tof_list, \
+                    patch.object(EnergySpectrum, "tof_list_cache",
+                                 ToFListCache()), \
+                    patch.object(EnergySpectrum, "spectrum_cache", cache):
+                espes = calculate(cuts, 0.5)
+                self.assertEqual((0, 2), (cache.hits, cache.misses))
+                self.assertEqual(2, mock_tof_list.call_count)
+
+                hist_file = EnergySpectrum.get_hist_file_name(
+                    mesu.get_energy_spectra_dir(), mesu.name, "1H.ERD.0")
+                hist_content = hist_file.read_text()
+                hist_file.unlink()
+
+                progress = Mock()
+                self.assertEqual(
+                    espes, calculate(cuts, 0.5, progress=progress))
+                self.assertEqual((2, 2), (cache.hits, cache.misses))
+                self.assertEqual(2, mock_tof_list.call_count)
+                progress.report.assert_called_once_with(100)
+
+                # Removed .hist file is written again
+                self.assertEqual(hist_content, hist_file.read_text())
+
+                # Changing the efficiency only misses the cache
+                self.assertNotEqual(
+                    espes,
+                    calculate(cuts[::-1], 0.5, use_efficiency=True))
+                self.assertEqual((2, 4), (cache.hits, cache.misses))
+
+                espes = calculate(cuts[::-1], 0.5)
+                self.assertEqual(["O.0.0", "1H.ERD.0"], list(espes))
+                self.assertEqual((4, 4), (cache.hits, cache.misses))
+
+    def test_empty_spectra_are_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            cut = tmp_dir / "cuts.1H.ERD.0.cut"
+            cut.write_text(cut.name)
+            mesu = mo.get_measurement(path=tmp_dir / "mesu.info")
+
+            with patch.object(EnergySpectrum, "tof_list",
+                              return_value=to_columns([])) \
+                    as mock_tof_list, \
+                    patch.object(EnergySpectrum, "spectrum_cache",
+                                 SpectrumCache()):
+                for _ in range(2):
+                    self.assertEqual(
+                        {"1H.ERD.0": []},
+                        EnergySpectrum.calculate_measured_spectra(
+                            mesu, [cut], 1, verbose=False))
+                self.assertEqual(2, mock_tof_list.call_count)
+
+    def test_least_recently_used_spectra_are_evicted(self):
+        cache = SpectrumCache()
+        with patch.object(SpectrumCache, "MAX_BINS", 4):
+            cache.put("a", [(0, 0), (1, 0)])
+            cache.put("b", [(0, 0), (1, 0)])
+            cache.get("a")
+            cache.put("c", [(0, 0), (1, 0)])
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual((3, 1), (cache.hits, cache.misses))
+
+
 if __name__ == '__main__':
     unittest.main()
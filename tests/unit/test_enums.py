@@ -56,6 +56,11 @@ class TestIonDivision(unittest.TestCase):
             IonDivision.BOTH.get_ion_counts(*args)
         )
 
+        self.assertEqual(
+            (presim, 250_000),
+            IonDivision.SHARED.get_ion_counts(*args)
+        )
+
     def test_negative_ions(self):
         """Negative ions default to 0
         """
@@ -0,0 +1,349 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import tempfile
+import os
+
+from unittest.mock import patch
+
+import numpy as np
+import tests.utils as utils
+
+from pathlib import Path
+
+import modules.event_store as es
+
+from modules.event_store import EventStore
+from modules.event_store import EventIndex
+from modules.event_store import EventHistogram
+
+
+class TestEventStore(unittest.TestCase):
+    def test_has_slots(self):
+        utils.assert_has_slots(EventStore())
+
+    def test_empty_store(self):
+        store = EventStore()
+        self.assertEqual(0, len(store))
+        self.assertFalse(store)
+        self.assertFalse(store.has_third())
+        self.assertEqual((0, 3), store.get_rows().shape)
+
+    def test_event_numbers_default_to_line_numbers(self):
+        store = EventStore([4, 5, 6], [1, 2, 3])
+        np.testing.assert_array_equal([1, 2, 3], store.event_number)
+
+    def test_columns_must_be_equal_length(self):
+        self.assertRaises(ValueError, lambda: EventStore([1, 2], [1]))
+        self.assertRaises(
+            ValueError, lambda: EventStore([1, 2], [1, 2], [1]))
+        self.assertRaises(
+            ValueError, lambda: EventStore([1, 2], [1, 2], third=[1]))
+
+    def test_get_rows(self):
+        store = EventStore([4, 5, 6], [1, 2, 3], [2, 4, 6])
+        np.testing.assert_array_equal(
+            [[4, 1, 2], [6, 3, 6]], store.get_rows([0, 2]))
+        np.testing.assert_array_equal(
+            [[5, 2, 4]], store.get_rows(np.array([False, True, False])))
+
+        store = EventStore([4, 5], [1, 2], [2, 4], third=[7, 8])
+        np.testing.assert_array_equal(
+            [[4, 1, 7, 2], [5, 2, 8, 4]], store.get_rows())
+
+    def test_from_rows(self):
+        rows = [[4, 1, 7, 2], [5, 2, 8, 4]]
+        np.testing.assert_array_equal(
+            rows, EventStore.from_rows(rows).get_rows())
+        rows = [[4, 1, 2], [5, 2, 4]]
+        np.testing.assert_array_equal(
+            rows, EventStore.from_rows(rows).get_rows())
+
+    def test_memory_per_event(self):
+        store = EventStore(np.zeros(1000), np.zeros(1000))
+        self.assertEqual(12 * 1000, store.nbytes())
+
+    def test_from_asc_file(self):
+        self.assert_asc_file_read([
+            "1 2\n",
+            "3 4\n",
+            "5 6\n"
+        ], [[1, 2, 1], [3, 4, 2], [5, 6, 3]])
+
+    def test_from_asc_file_with_irregular_lines(self):
+        # Lines in unknown format are skipped but counted as events
+        self.assert_asc_file_read([
+            "1 2\n",
+            "\n",
+            "3\n",
+            "5 6\n",
+            "5 6 7 8\n",
+            "9 10\n"
+        ], [[1, 2, 1], [5, 6, 4], [9, 10, 6]])
+
+    def test_from_asc_file_with_third_adc(self):
+        self.assert_asc_file_read([
+            "1 2 3\n",
+            "4 5 6\n",
+        ], [[1, 2, 3, 1], [4, 5, 6, 2]])
+
+        self.assert_asc_file_read([
+            "1 2 3\n",
+            "4 5\n",
+        ], [[1, 2, 3, 1], [4, 5, 0, 2]])
+
+    def test_from_empty_asc_file(self):
+        self.assert_asc_file_read([], np.empty((0, 3)))
+
+    def test_from_asc_file_with_bad_values(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "foo.asc")
+            file.write_text("1 2\n3 foo\n")
+            self.assertRaises(
+                ValueError, lambda: EventStore.from_asc_file(file))
+
+    def test_out_of_range_values_are_not_truncated(self):
+        # The first chunk is parsed in bulk and the others line by line
+        for lines, line_number in (
+                (["1 2", "3000000000 5"], 2),
+                (["1 2", "", "3 4 -3000000000"], 3),
+                (["1 2", "", "3 99999999999999999999"], 3)):
+            with self.assertRaisesRegex(ValueError, f"Line {line_number} "):
+                es._parse_asc_lines(lines, 1)
+
+    def test_sample_data_matches_line_by_line_parsing(self):
+        asc = utils.get_sample_data_dir() / "Ecaart-11-mini" / \
+            "Tof-E_65-mini.asc"
+        expected = []
+        with asc.open("r") as file:
+            for n, line in enumerate(file, start=1):
+                x, y = line.split()
+                expected.append([int(x), int(y), n])
+        store = EventStore.from_asc_file(asc)
+        np.testing.assert_array_equal(expected, store.get_rows())
+
+    def assert_asc_file_read(self, lines, expected_rows):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "foo.asc")
+            with file.open("w") as f:
+                f.writelines(lines)
+            store = EventStore.from_asc_file(file)
+            np.testing.assert_array_equal(expected_rows, store.get_rows())
+
+
+class TestEventIndex(unittest.TestCase):
+    def test_has_slots(self):
+        utils.assert_has_slots(EventIndex(EventStore()))
+
+    def test_empty_store(self):
+        index = EventIndex(EventStore())
+        self.assertEqual(0, index.get_indices_in_box(0, 10, 0, 10).size)
+
+    def test_indices_in_box(self):
+        rand = np.random.default_rng(3)
+        store = EventStore(rand.integers(-50, 50, 2000),
+                           rand.integers(0, 100, 2000))
+        index = EventIndex(store)
+        for x_min, x_max, y_min, y_max in [
+            (-10, 10, 20, 40),
+            (-100, 100, -100, 200),
+            (0, 0, 0, 99),
+            (60, 70, 0, 10),
+            (10, 0, 0, 10),
+        ]:
+            expected = np.flatnonzero(
+                (x_min <= store.tof) & (store.tof <= x_max) &
+                (y_min <= store.energy) & (store.energy <= y_max))
+            np.testing.assert_array_equal(
+                expected, index.get_indices_in_box(x_min, x_max, y_min,
+                                                   y_max))
+
+
+class TestEventHistogram(unittest.TestCase):
+    def setUp(self):
+        rand = np.random.default_rng(5)
+        self.store = EventStore(rand.integers(-50, 950, 5000),
+                                rand.integers(0, 400, 5000))
+
+    def test_has_slots(self):
+        utils.assert_has_slots(EventHistogram(EventStore()))
+
+    def test_data_limits(self):
+        self.assertEqual([[], []], EventHistogram(EventStore()).get_data_limits())
+        self.assertEqual(
+            [[-50, 949], [0, 399]],
+            EventHistogram(self.store).get_data_limits())
+
+    def test_histogram_matches_numpy(self):
+        histogram = EventHistogram(self.store)
+        for bins, axes_range in [
+            ((100, 40), None),
+            ((50, 20), None),
+            ((25, 5), None),
+            ((7, 13), None),
+            ((30, 30), ((0, 500), (-10.5, 200))),
+            ((10, 10), ((0, 500), (-10.5, 200))),
+            ((1, 1), ((3, 3), (1, 1))),
+        ]:
+            self.assert_histogram_equal(histogram, bins, axes_range)
+
+    def test_histogram_of_float_values(self):
+        rand = np.random.default_rng(2)
+        store = EventStore()
+        store.tof = rand.random(100) * 10
+        store.energy = rand.random(100)
+        histogram = EventHistogram(store)
+        for bins in (8, 8), (4, 2), (3, 3):
+            self.assert_histogram_equal(histogram, bins, None)
+
+    def test_empty_histogram(self):
+        counts, x_edges, y_edges = EventHistogram(
+            EventStore()).get_histogram((2, 3))
+        np.testing.assert_array_equal(np.zeros((2, 3)), counts)
+        np.testing.assert_array_equal([0, 0.5, 1], x_edges)
+
+    def test_coarse_histogram_is_summed_from_cached_one(self):
+        histogram = EventHistogram(self.store)
+        histogram.get_histogram((100, 40))
+        with patch.object(EventHistogram, "_EventHistogram__bin_events") \
+                as mock_bin:
+            self.assert_histogram_equal(histogram, (50, 20), None)
+            self.assert_histogram_equal(histogram, (25, 5), None)
+            mock_bin.assert_not_called()
+
+    def test_cached_histogram_is_returned(self):
+        histogram = EventHistogram(self.store)
+        counts, *_ = histogram.get_histogram((10, 10))
+        self.assertIs(counts, histogram.get_histogram((10, 10))[0])
+        self.assertFalse(counts.flags.writeable)
+
+    def test_bad_parameters(self):
+        histogram = EventHistogram(self.store)
+        self.assertRaises(ValueError, lambda: histogram.get_histogram((0, 1)))
+        self.assertRaises(
+            ValueError,
+            lambda: histogram.get_histogram((1, 1), ((2, 1), (0, 1))))
+
+    def assert_histogram_equal(self, histogram, bins, axes_range):
+        expected, x_expected, y_expected = np.histogram2d(
+            histogram.store.tof, histogram.store.energy, bins=bins,
+            range=axes_range)
+        counts, x_edges, y_edges = histogram.get_histogram(bins, axes_range)
+        np.testing.assert_array_equal(expected, counts)
+        np.testing.assert_array_equal(x_expected, x_edges)
+        np.testing.assert_array_equal(y_expected, y_edges)
+
+
+class TestEventCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.asc_file = Path(self.tmp_dir.name, "mesu.asc")
+        self.asc_file.write_text("1 2\n3 4 5\n\n6 7\n")
+        self.expected = [[1, 2, 0, 1], [3, 4, 5, 2], [6, 7, 0, 4]]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cache_files_are_next_to_asc_file(self):
+        self.assertEqual(
+            (Path(self.tmp_dir.name, "mesu.events.npy"),
+             Path(self.tmp_dir.name, "mesu.events.json")),
+            es.get_cache_files(self.asc_file))
+
+    def test_cache_is_written_and_used(self):
+        self.assertIsNone(es.read_cache(self.asc_file))
+        store = es.load_events(self.asc_file)
+        np.testing.assert_array_equal(self.expected, store.get_rows())
+        for f in es.get_cache_files(self.asc_file):
+            self.assertTrue(f.exists())
+
+        with patch.object(EventStore, "from_asc_file") as mock_parse:
+            store = es.load_events(self.asc_file)
+            mock_parse.assert_not_called()
+        self.assertIsInstance(store.tof.base, np.memmap)
+        np.testing.assert_array_equal(self.expected, store.get_rows())
+
+    def test_cache_is_not_used_if_disabled(self):
+        es.load_events(self.asc_file, use_cache=False)
+        for f in es.get_cache_files(self.asc_file):
+            self.assertFalse(f.exists())
+
+    def test_cache_is_invalidated_when_source_changes(self):
+        es.load_events(self.asc_file)
+        self.asc_file.write_text("8 9\n")
+        self.assertIsNone(es.read_cache(self.asc_file))
+        store = es.load_events(self.asc_file)
+        np.testing.assert_array_equal([[8, 9, 1]], store.get_rows())
+
+    def test_cache_is_valid_if_only_modification_time_changes(self):
+        es.load_events(self.asc_file)
+        stat = self.asc_file.stat()
+        os.utime(self.asc_file, ns=(stat.st_atime_ns,
+                                    stat.st_mtime_ns + 10 ** 9))
+        store = es.read_cache(self.asc_file)
+        self.assertIsNotNone(store)
+        np.testing.assert_array_equal(self.expected, store.get_rows())
+
+    def test_same_size_change_with_new_mtime_invalidates_cache(self):
+        es.load_events(self.asc_file)
+        stat = self.asc_file.stat()
+        self.asc_file.write_text("1 2\n3 4 5\n\n6 8\n")
+        os.utime(self.asc_file, ns=(stat.st_atime_ns,
+                                    stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(es.read_cache(self.asc_file))
+
+    def test_corrupted_cache_is_ignored(self):
+        es.load_events(self.asc_file)
+        data_file, _ = es.get_cache_files(self.asc_file)
+        data_file.write_bytes(b"foo")
+        self.assertIsNone(es.read_cache(self.asc_file))
+        store = es.load_events(self.asc_file)
+        np.testing.assert_array_equal(self.expected, store.get_rows())
+
+    def test_remove_cache(self):
+        es.load_events(self.asc_file)
+        es.remove_cache(self.asc_file)
+        for f in es.get_cache_files(self.asc_file):
+            self.assertFalse(f.exists())
+
+    def test_cache_writer_writes_chunks(self):
+        with es.CacheWriter(self.asc_file, 3, has_third=True) as writer:
+            writer.write([1, 3], [2, 4], [1, 2], third=[0, 5])
+            writer.write([6], [7], [4])
+        np.testing.assert_array_equal(
+            self.expected, es.read_cache(self.asc_file).get_rows())
+
+    def test_cache_writer_keeps_old_cache_on_error(self):
+        es.load_events(self.asc_file)
+        with self.assertRaises(ValueError):
+            with es.CacheWriter(self.asc_file, 3) as writer:
+                writer.write([1], [2], [1])
+        np.testing.assert_array_equal(
+            self.expected, es.read_cache(self.asc_file).get_rows())
+        self.assertEqual(
+            ["mesu.asc", "mesu.events.json", "mesu.events.npy"],
+            sorted(f.name for f in Path(self.tmp_dir.name).iterdir()))
@@ -24,6 +24,7 @@ along with this program (file named 'LICENCE').
 __author__ = "Juhani Sundell"
 __version__ = "2.0"
 
+import os
 import unittest
 import tempfile
 import tests.mock_objects as mo
@@ -73,6 +74,10 @@ class TestGlobalSettings(unittest.TestCase):
         self.gs.set_tofe_invert_y(True)
         self.assertTrue(self.gs.get_tofe_invert_y())
 
+        self.assertFalse(self.gs.get_binary_cut_files())
+        self.gs.set_binary_cut_files(True)
+        self.assertTrue(self.gs.get_binary_cut_files())
+
     def test_int_getters(self):
         self.gs.set_import_coinc_count(555)
         self.assertEqual(555, self.gs.get_import_coinc_count())
@@ -133,6 +138,52 @@ class TestGlobalSettings(unittest.TestCase):
         # The absolute minimum
         self.assertEqual(0.000001, self.gs.get_minimum_concentration())
 
+    def test_core_budget(self):
+        self.assertEqual(os.cpu_count() or 1, self.gs.get_core_budget())
+        self.gs.set_core_budget(3)
+        self.assertEqual(3, self.gs.get_core_budget())
+        # At least one process must be allowed to run
+        self.gs.set_core_budget(0)
+        self.assertEqual(1, self.gs.get_core_budget())
+
+    def test_mcerd_spool_directory(self):
+        self.assertIsNone(self.gs.get_mcerd_spool_directory())
+        self.gs.set_mcerd_spool_directory(Path("spool"))
+        self.assertEqual(
+            Path("spool").resolve(), self.gs.get_mcerd_spool_directory())
+        self.gs.set_mcerd_spool_directory(None)
+        self.assertIsNone(self.gs.get_mcerd_spool_directory())
+
+    def test_tof_list_cache(self):
+        self.assertEqual(
+            Path(tempfile.gettempdir(), "cache", "tof_list").resolve(),
+            self.gs.get_tof_list_cache_directory())
+        self.gs.set_tof_list_cache_directory(Path("cache"))
+        self.assertEqual(
+            Path("cache").resolve(), self.gs.get_tof_list_cache_directory())
+
+        self.assertEqual(500, self.gs.get_tof_list_cache_size())
+        self.gs.set_tof_list_cache_size(20)
+        self.assertEqual(20, self.gs.get_tof_list_cache_size())
+        # Negative size keeps the results only in memory
+        self.gs.set_tof_list_cache_size(-1)
+        self.assertEqual(0, self.gs.get_tof_list_cache_size())
+
+    def test_depth_cache(self):
+        self.assertEqual(
+            Path(tempfile.gettempdir(), "cache", "depth_files").resolve(),
+            self.gs.get_depth_cache_directory())
+        self.gs.set_depth_cache_directory(Path("cache"))
+        self.assertEqual(
+            Path("cache").resolve(), self.gs.get_depth_cache_directory())
+
+        self.assertEqual(500, self.gs.get_depth_cache_size())
+        self.gs.set_depth_cache_size(20)
+        self.assertEqual(20, self.gs.get_depth_cache_size())
+        # Negative size disables the cache
+        self.gs.set_depth_cache_size(-1)
+        self.assertEqual(0, self.gs.get_depth_cache_size())
+
     def test_serialiazation(self):
         """Deserialized GlobalSettings object should have the same
         values as the serialized object.
@@ -0,0 +1,101 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+
+import numpy as np
+
+import modules.histogram as histogram
+
+
+def _reference_hist(values, weights, width):
+    """Row by row implementation that the vectorized version must match.
+    """
+    if weights is None:
+        weights = [1] * len(values)
+    rows = sorted(zip(values, weights), key=lambda x: x[0])
+    a = int(rows[0][0] / width) * width
+    i = 0
+    result = []
+    while i < len(rows):
+        b = 0.0
+        while i < len(rows) and rows[i][0] < a:
+            b += rows[i][1]
+            i += 1
+        result.append((a - (width / 2.0), b))
+        a += width
+    return result
+
+
+class TestCalculate(unittest.TestCase):
+    def test_empty_values(self):
+        positions, sums = histogram.calculate([])
+        self.assertEqual(0, positions.size)
+        self.assertEqual(0, sums.size)
+
+    def test_bins(self):
+        positions, sums = histogram.calculate([1, 1.5, 4, 2], width=1)
+        np.testing.assert_array_equal([0.5, 1.5, 2.5, 3.5, 4.5], positions)
+        np.testing.assert_array_equal([0, 2, 1, 0, 1], sums)
+
+    def test_negative_values(self):
+        # First edge is truncated towards zero so the first bin collects the
+        # values below it
+        positions, sums = histogram.calculate([-1.5, -0.5, 0.5], width=1)
+        np.testing.assert_array_equal([-1.5, -0.5, 0.5], positions)
+        np.testing.assert_array_equal([1, 1, 1], sums)
+
+    def test_weights(self):
+        positions, sums = histogram.calculate(
+            [3, 1, 3], weights=[0.5, 2, 0.25], width=2)
+        np.testing.assert_array_equal([-1, 1, 3], positions)
+        np.testing.assert_array_equal([0, 2, 0.75], sums)
+
+    def test_bad_parameters(self):
+        self.assertRaises(
+            ValueError, lambda: histogram.calculate([1], width=0))
+        self.assertRaises(
+            ValueError, lambda: histogram.calculate([1, 2], weights=[1]))
+
+    def test_results_match_reference_implementation(self):
+        rand = np.random.default_rng(7)
+        for width in 0.025, 0.1, 0.3, 1, 2.5:
+            for values in (rand.normal(3, 2, 500),
+                           np.round(rand.uniform(-3, 3, 500), 1),
+                           rand.integers(-20, 300, 500).astype(float)):
+                weights = rand.uniform(0, 2, values.size)
+                for w in None, weights:
+                    positions, sums = histogram.calculate(
+                        values, weights=w, width=width)
+                    # Compare as Python floats to require exact equality
+                    self.assertEqual(
+                        _reference_hist(values.tolist(), None if w is None
+                                        else w.tolist(), width),
+                        list(zip(positions.tolist(), sums.tolist())))
+
+
+if __name__ == '__main__':
+    unittest.main()
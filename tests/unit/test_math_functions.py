@@ -480,6 +480,39 @@ class TestPointInside(unittest.TestCase):
         self.assertFalse(mf.point_inside_polygon(Point(1.5, 0.25), rectangle))
 
 
+class TestPointsInside(unittest.TestCase):
+    def test_matches_point_inside_polygon(self):
+        rng = np.random.default_rng(2)
+        for _ in range(50):
+            n = random.randint(1, 8)
+            poly = [
+                (random.randint(0, 20), random.randint(0, 20))
+                for _ in range(n)
+            ]
+            x = rng.integers(-2, 23, 500)
+            y = rng.integers(-2, 23, 500)
+            expected = [
+                mf.point_inside_polygon(p, poly)
+                for p in zip(x.tolist(), y.tolist())
+            ]
+            np.testing.assert_array_equal(
+                expected, mf.points_inside_polygon(x, y, poly))
+
+    def test_float_coordinates(self):
+        rectangle = ((0, 0), (1, 1), (2, 1), (1, 0))
+        x = [0, 1, 1.5, 2, 1, 1.5, 0]
+        y = [0, 1, 1, 1, 0.5, 0.8, 0.25]
+        np.testing.assert_array_equal(
+            [False, False, True, True, True, True, False],
+            mf.points_inside_polygon(x, y, rectangle))
+
+    def test_empty_inputs(self):
+        self.assertEqual(
+            0, mf.points_inside_polygon([], [], [(0, 0), (1, 1)]).size)
+        np.testing.assert_array_equal(
+            [False], mf.points_inside_polygon([0], [0], []))
+
+
 class TestBinCounts(unittest.TestCase):
     def setUp(self):
         a, b = 0, 100
@@ -0,0 +1,220 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from pathlib import Path
+
+from modules.concurrency import CancellationToken
+from modules.mcerd_executor import LocalExecutor
+from modules.mcerd_executor import SpoolExecutor
+from modules.mcerd_executor import SpoolJob
+from modules.mcerd_worker import SpoolWorker
+from modules.process_reactor import ProcessReactor
+from modules.process_reactor import Termination
+
+from tests.mock_objects import MockObserver
+
+
+# Stand-in for the MCERD binary. Reads the names of its output files, the
+# number of ions and the exit code from the command file.
+FAKE_MCERD = """
+import sys
+import time
+
+with open(sys.argv[1]) as file:
+    cmd = dict(line.split(": ", 1) for line in file.read().splitlines())
+with open(cmd["Presimulation"], "w") as file:
+    file.write("presimulation")
+print("Presimulation finished", flush=True)
+for i in range(int(cmd["Ions"])):
+    with open(cmd["Result"], "a") as file:
+        file.write(f"{i}\\n")
+    print(f"Calculated {i + 1}", flush=True)
+    time.sleep(float(cmd["Sleep"]))
+sys.exit(int(cmd["Exit"]))
+"""
+
+
+class FakeMCERD:
+    """Has the same files as an MCERD object but runs FAKE_MCERD.
+    """
+    def __init__(self, directory: Path, ions=3, sleep=0.0, exit_code=0):
+        self.script = directory / "mcerd.py"
+        self.script.write_text(FAKE_MCERD)
+        self.work_dir = directory / "mcerd" / "He.1"
+        self.work_dir.mkdir(parents=True)
+        self.command_file = self.work_dir / "He"
+        self.output_file = self.work_dir / "He.1.erd"
+        self.presimulation_file = self.work_dir / "He.pre"
+        self.command_file.write_text("\n".join([
+            f"Presimulation: {self.presimulation_file}",
+            f"Result: {self.output_file}",
+            f"Ions: {ions}",
+            f"Sleep: {sleep}",
+            f"Exit: {exit_code}"
+        ]))
+
+    def get_command(self):
+        return sys.executable, str(self.script), str(self.command_file)
+
+
+class TestLocalExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = LocalExecutor(ProcessReactor(poll_interval=0.01))
+
+    def test_output_is_emitted(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mcerd = FakeMCERD(Path(tmp_dir))
+            obs = MockObserver()
+            self.executor.execute(mcerd).subscribe(obs)
+            time.sleep(1)
+
+            self.assertEqual([
+                "Presimulation finished",
+                "Calculated 1",
+                "Calculated 2",
+                "Calculated 3",
+                Termination.EXITED
+            ], obs.nexts)
+            self.assertEqual(["done"], obs.compl)
+            self.assertEqual("0\n1\n2\n", mcerd.output_file.read_text())
+
+    def test_error_code_is_emitted_as_error(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mcerd = FakeMCERD(Path(tmp_dir), exit_code=3)
+            obs = MockObserver()
+            self.executor.execute(mcerd).subscribe(obs)
+            time.sleep(1)
+
+            self.assertNotIn(Termination.EXITED, obs.nexts)
+            self.assertIsInstance(obs.errs[0], subprocess.SubprocessError)
+
+
+class TestSpoolExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.spool_dir = Path(self.tmp_dir.name, "spool")
+        self.executor = SpoolExecutor(self.spool_dir, poll_interval=0.01)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def start_worker(self) -> SpoolWorker:
+        worker = SpoolWorker(
+            self.spool_dir, command=[sys.executable, str(
+                Path(self.tmp_dir.name, "mcerd.py"))],
+            poll_interval=0.01)
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(worker.stop)
+        return worker
+
+    def test_submit(self):
+        mcerd = FakeMCERD(Path(self.tmp_dir.name))
+        mcerd.output_file.touch()
+        job_dir = self.executor.submit(mcerd)
+
+        self.assertEqual(self.spool_dir, job_dir.parent)
+        self.assertEqual(
+            {"He", SpoolJob.MANIFEST}, {f.name for f in job_dir.iterdir()})
+        self.assertEqual(
+            mcerd.command_file.read_text(), (job_dir / "He").read_text())
+
+    def test_output_and_results_are_copied_back(self):
+        mcerd = FakeMCERD(Path(self.tmp_dir.name), sleep=0.05)
+        self.start_worker()
+        obs = MockObserver()
+        self.executor.execute(mcerd).subscribe(obs)
+        time.sleep(1.5)
+
+        self.assertEqual([
+            "Presimulation finished",
+            "Calculated 1",
+            "Calculated 2",
+            "Calculated 3",
+            Termination.EXITED
+        ], obs.nexts)
+        self.assertEqual(["done"], obs.compl)
+        self.assertEqual("0\n1\n2\n", mcerd.output_file.read_text())
+        self.assertEqual(
+            "presimulation", mcerd.presimulation_file.read_text())
+        self.assertEqual([], list(self.spool_dir.iterdir()))
+
+    def test_error_code_is_emitted_as_error(self):
+        mcerd = FakeMCERD(Path(self.tmp_dir.name), exit_code=3)
+        self.start_worker()
+        obs = MockObserver()
+        self.executor.execute(mcerd).subscribe(obs)
+        time.sleep(1.5)
+
+        self.assertNotIn(Termination.EXITED, obs.nexts)
+        self.assertIsInstance(obs.errs[0], subprocess.SubprocessError)
+        self.assertEqual([], list(self.spool_dir.iterdir()))
+
+    def test_running_job_is_cancelled(self):
+        mcerd = FakeMCERD(Path(self.tmp_dir.name), ions=100, sleep=0.1)
+        worker = self.start_worker()
+        ct = CancellationToken()
+        obs = MockObserver()
+        self.executor.execute(mcerd, ct=ct).subscribe(obs)
+        time.sleep(1)
+        self.assertEqual(1, worker.get_running_count())
+
+        ct.request_cancellation()
+        time.sleep(0.5)
+        self.assertEqual(Termination.CANCELLED, obs.nexts[-1])
+        self.assertEqual(["done"], obs.compl)
+        self.assertEqual(0, worker.get_running_count())
+        self.assertEqual([], list(self.spool_dir.iterdir()))
+
+    def test_unclaimed_job_is_cancelled(self):
+        mcerd = FakeMCERD(Path(self.tmp_dir.name))
+        ct = CancellationToken()
+        obs = MockObserver()
+        self.executor.execute(mcerd, ct=ct).subscribe(obs)
+        ct.request_cancellation()
+        time.sleep(0.1)
+
+        self.assertEqual([Termination.CANCELLED], obs.nexts)
+        self.assertEqual([], list(self.spool_dir.iterdir()))
+
+    def test_unclaimed_job_times_out(self):
+        mcerd = FakeMCERD(Path(self.tmp_dir.name))
+        ct = CancellationToken()
+        obs = MockObserver()
+        self.executor.execute(mcerd, ct=ct, max_time=0.05).subscribe(obs)
+        time.sleep(0.2)
+
+        self.assertEqual([Termination.TIMED_OUT], obs.nexts)
+        self.assertTrue(ct.is_cancellation_requested())
+        self.assertEqual([], list(self.spool_dir.iterdir()))
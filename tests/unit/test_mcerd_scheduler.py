@@ -0,0 +1,174 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import time
+
+from rx.subject import Subject
+
+from modules.concurrency import CancellationToken
+from modules.mcerd import MCERD
+from modules.mcerd_scheduler import MCERDScheduler
+from modules.mcerd_scheduler import JobPriority
+
+from tests.mock_objects import MockObserver
+
+
+class FakeMCERD:
+    """Stand-in for MCERD whose output is controlled by a Subject.
+    """
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.subject = Subject()
+        self.started = False
+
+    def run(self, ct=None, **kwargs):
+        self.started = True
+        return self.subject
+
+    def get_initial_status(self):
+        return {
+            MCERD.SEED: self.seed,
+            MCERD.MSG: "",
+            MCERD.IS_RUNNING: True
+        }
+
+    def finish(self):
+        self.subject.on_next({
+            MCERD.SEED: self.seed,
+            MCERD.MSG: "",
+            MCERD.IS_RUNNING: False
+        })
+        self.subject.on_completed()
+
+
+class TestMCERDScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = MCERDScheduler(2, poll_interval=0.01)
+
+    def submit(self, mcerd, **kwargs) -> MockObserver:
+        obs = MockObserver()
+        self.scheduler.submit(mcerd, **kwargs).subscribe(obs)
+        return obs
+
+    def test_core_budget_limits_running_processes(self):
+        mcerds = [FakeMCERD(i) for i in range(5)]
+        observers = [self.submit(mcerd) for mcerd in mcerds]
+
+        self.assertEqual(
+            [True, True, False, False, False], [m.started for m in mcerds])
+        self.assertEqual(2, self.scheduler.get_running_count())
+        self.assertEqual(3, self.scheduler.get_queue_depth())
+
+        mcerds[0].finish()
+        self.assertEqual(
+            [True, True, True, False, False], [m.started for m in mcerds])
+        self.assertEqual(["done"], observers[0].compl)
+        self.assertEqual(2, self.scheduler.get_running_count())
+        self.assertEqual(2, self.scheduler.get_queue_depth())
+
+        for mcerd in mcerds[1:]:
+            mcerd.finish()
+        self.assertTrue(all(m.started for m in mcerds))
+        self.assertEqual(0, self.scheduler.get_running_count())
+        self.assertEqual(0, self.scheduler.get_queue_depth())
+
+    def test_queued_processes_report_queue_and_wait_time(self):
+        mcerds = [FakeMCERD(i) for i in range(3)]
+        observers = [self.submit(mcerd) for mcerd in mcerds]
+
+        self.assertEqual([], observers[0].nexts)
+        self.assertEqual([{
+            MCERD.SEED: 2,
+            MCERD.MSG: MCERDScheduler.QUEUED,
+            MCERD.IS_RUNNING: True,
+            MCERDScheduler.QUEUE_DEPTH: 0,
+            MCERDScheduler.WAIT_TIME: 0.0
+        }], observers[2].nexts)
+
+        time.sleep(0.05)
+        mcerds[0].finish()
+        mcerds[2].finish()
+        status = observers[2].nexts[-1]
+        self.assertFalse(status[MCERD.IS_RUNNING])
+        self.assertLessEqual(0.05, status[MCERDScheduler.WAIT_TIME])
+        self.assertEqual(0, status[MCERDScheduler.QUEUE_DEPTH])
+        self.assertGreater(
+            0.05, observers[0].nexts[-1][MCERDScheduler.WAIT_TIME])
+
+    def test_optimization_processes_are_started_first(self):
+        mcerds = [FakeMCERD(i) for i in range(4)]
+        for mcerd in mcerds[:3]:
+            self.submit(mcerd)
+        self.submit(mcerds[3], priority=JobPriority.OPTIMIZATION)
+
+        mcerds[0].finish()
+        self.assertEqual(
+            [True, True, False, True], [m.started for m in mcerds])
+
+    def test_cancelled_processes_are_not_started(self):
+        mcerds = [FakeMCERD(i) for i in range(3)]
+        ct = CancellationToken()
+        self.submit(mcerds[0])
+        self.submit(mcerds[1])
+        obs = self.submit(mcerds[2], ct=ct)
+
+        ct.request_cancellation()
+        time.sleep(0.1)
+        self.assertEqual(0, self.scheduler.get_queue_depth())
+        self.assertFalse(mcerds[2].started)
+        self.assertEqual(MCERD.SIM_STOPPED, obs.nexts[-1][MCERD.MSG])
+        self.assertFalse(obs.nexts[-1][MCERD.IS_RUNNING])
+        self.assertEqual(["done"], obs.compl)
+
+        mcerds[0].finish()
+        self.assertFalse(mcerds[2].started)
+
+    def test_disposed_processes_are_removed_from_queue(self):
+        mcerds = [FakeMCERD(i) for i in range(3)]
+        self.submit(mcerds[0])
+        self.submit(mcerds[1])
+        self.scheduler.submit(mcerds[2]).subscribe(MockObserver()).dispose()
+
+        self.assertEqual(0, self.scheduler.get_queue_depth())
+        mcerds[0].finish()
+        self.assertFalse(mcerds[2].started)
+
+    def test_core_budget_can_be_changed(self):
+        budget = 1
+        scheduler = MCERDScheduler(lambda: budget, poll_interval=0.01)
+        mcerds = [FakeMCERD(i) for i in range(3)]
+        for mcerd in mcerds:
+            scheduler.submit(mcerd).subscribe(MockObserver())
+        self.assertEqual([True, False, False], [m.started for m in mcerds])
+
+        budget = 3
+        time.sleep(0.1)
+        self.assertEqual([True, True, True], [m.started for m in mcerds])
+
+        # Budget is always at least 1
+        budget = 0
+        self.assertEqual(1, scheduler.get_core_budget())
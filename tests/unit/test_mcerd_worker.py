@@ -0,0 +1,139 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import json
+import os
+import tempfile
+import time
+
+from pathlib import Path
+
+from modules.mcerd_executor import SpoolJob
+from modules.mcerd_worker import SpoolWorker
+
+
+def write_job(job_dir: Path, mtime: float, work_dir="/work") -> Path:
+    job_dir.mkdir()
+    (job_dir / "He").write_text(f"Target description file: {work_dir}/x")
+    SpoolJob.write_json(job_dir / SpoolJob.MANIFEST, {
+        SpoolJob.WORK_DIR: work_dir,
+        SpoolJob.COMMAND_FILE: "He",
+        SpoolJob.STREAMED: [],
+        SpoolJob.COPIED: []
+    })
+    os.utime(job_dir / SpoolJob.MANIFEST, (mtime, mtime))
+    return job_dir
+
+
+class TestSpoolWorker(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.spool_dir = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_pending_jobs(self):
+        worker = SpoolWorker(self.spool_dir, command=["true"])
+        now = time.time()
+        second = write_job(self.spool_dir / "b", now)
+        first = write_job(self.spool_dir / "c", now - 10)
+        claimed = write_job(self.spool_dir / "a", now - 20)
+        SpoolJob.claim(claimed, "test")
+        write_job(self.spool_dir / ".d", now - 30)
+        (self.spool_dir / "e").mkdir()
+
+        self.assertEqual([first, second], worker.get_pending_jobs())
+
+    def test_claim(self):
+        job_dir = write_job(self.spool_dir / "a", time.time())
+        self.assertTrue(SpoolJob.claim(job_dir, "foo"))
+        self.assertFalse(SpoolJob.claim(job_dir, "bar"))
+        self.assertEqual("foo", (job_dir / SpoolJob.CLAIM).read_text())
+
+    def test_remove(self):
+        job_dir = write_job(self.spool_dir / "a", time.time())
+        SpoolJob.remove(job_dir)
+        self.assertEqual([], list(self.spool_dir.iterdir()))
+        # Removing again does nothing
+        SpoolJob.remove(job_dir)
+
+    def test_rewrite_paths(self):
+        job_dir = write_job(self.spool_dir / "a", time.time())
+        SpoolWorker.rewrite_paths(job_dir, "/work", str(job_dir))
+        self.assertEqual(
+            f"Target description file: {job_dir}/x",
+            (job_dir / "He").read_text())
+        # Files used for communication are not changed
+        with (job_dir / SpoolJob.MANIFEST).open() as file:
+            self.assertEqual("/work", json.load(file)[SpoolJob.WORK_DIR])
+
+    def test_jobs_are_run(self):
+        worker = SpoolWorker(
+            self.spool_dir, command=["sh", "-c", "cat $0; exit 2"],
+            max_jobs=1)
+        first = write_job(self.spool_dir / "a", time.time() - 10)
+        second = write_job(self.spool_dir / "b", time.time())
+
+        worker.poll()
+        self.assertEqual(1, worker.get_running_count())
+        time.sleep(0.5)
+        worker.poll()
+        self.assertEqual(1, worker.get_running_count())
+        self.assertEqual(
+            f"Target description file: {first}/x",
+            (first / SpoolJob.OUTPUT).read_text())
+        with (first / SpoolJob.EXIT).open() as file:
+            self.assertEqual({SpoolJob.RETURNCODE: 2}, json.load(file))
+
+        time.sleep(0.5)
+        worker.poll()
+        self.assertEqual(0, worker.get_running_count())
+        self.assertTrue((second / SpoolJob.EXIT).exists())
+
+    def test_cancelled_job_is_killed_and_removed(self):
+        worker = SpoolWorker(self.spool_dir, command=["sleep", "10"])
+        write_job(self.spool_dir / "a", time.time())
+        worker.poll()
+        self.assertEqual(1, worker.get_running_count())
+
+        (self.spool_dir / "a" / SpoolJob.CANCEL).touch()
+        worker.poll()
+        time.sleep(0.5)
+        worker.poll()
+        self.assertEqual(0, worker.get_running_count())
+        self.assertEqual([], list(self.spool_dir.iterdir()))
+
+    def test_error_is_reported_if_mcerd_cannot_be_started(self):
+        worker = SpoolWorker(
+            self.spool_dir, command=[str(self.spool_dir / "mcerd")])
+        job_dir = write_job(self.spool_dir / "a", time.time())
+        worker.poll()
+        self.assertEqual(0, worker.get_running_count())
+        with (job_dir / SpoolJob.EXIT).open() as file:
+            self.assertIn("Could not start MCERD", json.load(file)[
+                SpoolJob.ERROR])
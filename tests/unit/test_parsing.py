@@ -29,11 +29,16 @@ __version__ = "2.0"
 import unittest
 import tempfile
 import os
+import random
+
+import numpy as np
 
 import tests.utils as utils
 
 from modules.parsing import CSVParser
 from modules.parsing import ToFListParser
+from modules.parsing import ArrayParser
+from modules.parsing import ToFListArrayParser
 
 
 class TestParsing(unittest.TestCase):
@@ -246,6 +251,69 @@ class TestParsing(unittest.TestCase):
         """
         utils.assert_has_slots(CSVParser())
         utils.assert_has_slots(ToFListParser())
+        utils.assert_has_slots(ArrayParser())
+        utils.assert_has_slots(ToFListArrayParser())
+
+
+class TestArrayParser(unittest.TestCase):
+    def setUp(self):
+        random.seed(3)
+        self.strs = [
+            f"{random.random()!r} {random.uniform(-1, 1) * 10:.5f} "
+            f"{random.random() * 20:.5f} {random.randint(0, 5)} 1.0078 "
+            f"{random.choice(['ERD', 'RBS'])} {random.random():.6g} "
+            f"{random.randint(0, 10**6)}\n"
+            for _ in range(1000)
+        ]
+
+    def test_results_match_csv_parser(self):
+        rows = list(ToFListParser().parse_strs(self.strs, method="row"))
+        parser = ToFListArrayParser()
+        columns = parser.parse_str("".join(self.strs))
+
+        self.assertEqual(rows, parser.to_rows(columns))
+        self.assertEqual(
+            [np.float64, np.float64, np.float64, np.int64, np.float64,
+             np.object_, np.float64, np.int64],
+            [column.dtype.type for column in columns])
+
+    def test_text_matches_parsed_values(self):
+        rows = ToFListParser().parse_strs(self.strs, method="row")
+        parser = ToFListArrayParser()
+        text = parser.to_text(parser.parse_str("".join(self.strs)))
+        self.assertEqual(
+            "".join(f"{' '.join(str(x) for x in row)}\n" for row in rows),
+            text)
+
+    def test_parse_blocks(self):
+        parser = ArrayParser((2, float), (0, str))
+        blocks = ["a 1 1.5\nb 2 2.5\n", "\n", "", "c 3 3.5"]
+        xs, names = parser.parse_blocks(blocks)
+        np.testing.assert_array_equal([1.5, 2.5, 3.5], xs)
+        self.assertEqual(["a", "b", "c"], names.tolist())
+
+    def test_empty_input(self):
+        parser = ArrayParser((0, float), (1, int))
+        for columns in (parser.parse_str(""), parser.parse_str(" \n"),
+                        parser.parse_blocks([])):
+            self.assertEqual(
+                [(0, np.float64), (0, np.int64)],
+                [(c.size, c.dtype.type) for c in columns])
+
+    def test_parse_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = os.path.join(tmp_dir, "test.txt")
+            with open(file, "w") as f:
+                f.write("1 2\n3 4\n")
+            xs, = ArrayParser((1, int)).parse_file(file)
+            self.assertEqual([2, 4], xs.tolist())
+
+    def test_bad_arguments(self):
+        self.assertRaises(TypeError, lambda: ArrayParser(("0", float)))
+        self.assertRaises(
+            ValueError, lambda: ArrayParser((0, float), (0, int)))
+        self.assertRaises(
+            ValueError, lambda: ArrayParser((0, float)).parse_str("a\n"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import subprocess
+import threading
+import time
+import platform
+
+from unittest.mock import patch
+
+from modules.concurrency import CancellationToken
+from modules.process_reactor import ProcessReactor
+from modules.process_reactor import Termination
+
+from tests.mock_objects import MockObserver
+
+
+FAILURE_MSG = "This test is based on timing and may fail because the " \
+              "code being tested ran faster or slower than expected. " \
+              "Run this test again to see if the problem persists and " \
+              "adjust the timing parameters if necessary."
+
+if platform.system() == "Windows":
+    # Add little extra to the sleep time on Windows as the TASKKILL call
+    # seems to block until the process is fully killed.
+    DEFAULT_SLEEP_TIME = 0.2
+else:
+    DEFAULT_SLEEP_TIME = 0.1
+
+
+def start(script: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        ["sh", "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+class TestProcessReactor(unittest.TestCase):
+    def setUp(self):
+        self.reactor = ProcessReactor(poll_interval=0.01)
+
+    def observe(self, proc, **kwargs) -> MockObserver:
+        obs = MockObserver()
+        self.reactor.observe(proc, **kwargs).subscribe(obs)
+        return obs
+
+    def test_output_is_emitted_line_by_line(self):
+        proc = start("printf 'foo\\r\\nbar\\n'; echo baz >&2; printf end")
+        obs = self.observe(proc)
+        proc.wait()
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertEqual(
+            ["bar", "baz", "end", "foo"], sorted(obs.nexts[:-1]),
+            msg=FAILURE_MSG)
+        self.assertEqual(Termination.EXITED, obs.nexts[-1])
+        self.assertEqual(["done"], obs.compl, msg=FAILURE_MSG)
+
+    def test_process_is_killed_after_timeout(self):
+        ct = CancellationToken()
+        proc = start("sleep 1")
+        obs = self.observe(proc, ct=ct, max_time=0.01)
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertNotEqual(0, int(proc.poll()), msg=FAILURE_MSG)
+        self.assertEqual([Termination.TIMED_OUT], obs.nexts, msg=FAILURE_MSG)
+        self.assertTrue(ct.is_cancellation_requested(), msg=FAILURE_MSG)
+
+    def test_process_is_not_killed_before_timeout(self):
+        ct = CancellationToken()
+        proc = start("sleep 1")
+        obs = self.observe(proc, ct=ct, max_time=0.5)
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertIsNone(proc.poll(), msg=FAILURE_MSG)
+        self.assertEqual([], obs.nexts, msg=FAILURE_MSG)
+        self.assertFalse(ct.is_cancellation_requested(), msg=FAILURE_MSG)
+        proc.kill()
+
+    def test_requesting_cancellation_kills_the_process(self):
+        ct = CancellationToken()
+        proc = start("sleep 1")
+        obs = self.observe(proc, ct=ct)
+        ct.request_cancellation()
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertNotEqual(0, int(proc.poll()), msg=FAILURE_MSG)
+        self.assertEqual([Termination.CANCELLED], obs.nexts, msg=FAILURE_MSG)
+        self.assertEqual(["done"], obs.compl, msg=FAILURE_MSG)
+
+    def test_not_requesting_cancellation_lets_the_process_finish(self):
+        ct = CancellationToken()
+        proc = start("sleep 0.05")
+        obs = self.observe(proc, ct=ct)
+        time.sleep(0.2)
+
+        self.assertEqual(0, proc.poll(), msg=FAILURE_MSG)
+        self.assertEqual([Termination.EXITED], obs.nexts, msg=FAILURE_MSG)
+
+    def test_cancelling_after_process_ends_does_not_change_outcome(self):
+        ct = CancellationToken()
+        proc = start("echo hello")
+        obs = self.observe(proc, ct=ct)
+        time.sleep(DEFAULT_SLEEP_TIME)
+        ct.request_cancellation()
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertEqual(0, proc.poll(), msg=FAILURE_MSG)
+        self.assertEqual(
+            ["hello", Termination.EXITED], obs.nexts, msg=FAILURE_MSG)
+
+    def test_disposing_keeps_reading_output(self):
+        proc = start("seq 100000")
+        obs = MockObserver()
+        self.reactor.observe(proc).subscribe(obs).dispose()
+        # Process would block if its output was no longer read
+        self.assertEqual(0, proc.wait(5))
+        self.assertEqual([], obs.nexts)
+
+    def test_errors_in_observer_are_passed_to_on_error(self):
+        proc = start("echo hello")
+        obs = MockObserver()
+        self.reactor.observe(proc).subscribe(
+            on_next=lambda _: 1 / 0, on_error=obs.on_error)
+        proc.wait()
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertEqual(1, len(obs.errs), msg=FAILURE_MSG)
+        self.assertIsInstance(obs.errs[0], ZeroDivisionError)
+
+    def test_processes_share_a_single_thread(self):
+        thread_count = threading.active_count()
+        procs = [start("sleep 0.2; echo hello") for _ in range(20)]
+        observers = [self.observe(proc) for proc in procs]
+        time.sleep(DEFAULT_SLEEP_TIME)
+
+        self.assertGreaterEqual(
+            thread_count + 1, threading.active_count(), msg=FAILURE_MSG)
+        for proc in procs:
+            proc.wait()
+        time.sleep(DEFAULT_SLEEP_TIME)
+        for obs in observers:
+            self.assertEqual(
+                ["hello", Termination.EXITED], obs.nexts, msg=FAILURE_MSG)
+
+
+class TestPolledProcessReactor(TestProcessReactor):
+    """Runs the same tests with pipes that are polled like on Windows.
+    """
+    def setUp(self):
+        with patch("modules.process_reactor._SELECTABLE_PIPES", False):
+            super().setUp()
+
@@ -0,0 +1,90 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import random
+
+import numpy as np
+
+import modules.math_functions as mf
+
+from modules.selection import SelectionGrid
+
+
+class TestSelectionGrid(unittest.TestCase):
+    def setUp(self):
+        self.points = [(10, 10), (40, 15), (30, 50), (12, 35)]
+
+    def test_grid_matches_point_inside_polygon(self):
+        grid = SelectionGrid(self.points)
+        self.assertIsNotNone(grid.mask)
+        x, y = np.mgrid[0:60, 0:60]
+        x, y = x.ravel(), y.ravel()
+        expected = [
+            mf.point_inside_polygon((a, b), self.points)
+            for a, b in zip(x, y)
+        ]
+        np.testing.assert_array_equal(expected, grid.get_inside_mask(x, y))
+
+    def test_random_polygons(self):
+        rand = random.Random(7)
+        for _ in range(20):
+            points = [(rand.uniform(-20, 20), rand.uniform(-20, 20))
+                      for _ in range(rand.randint(3, 8))]
+            grid = SelectionGrid(points)
+            x = np.array([rand.randint(-25, 25) for _ in range(300)])
+            y = np.array([rand.randint(-25, 25) for _ in range(300)])
+            expected = [
+                mf.point_inside_polygon((a, b), points) for a, b in zip(x, y)
+            ]
+            np.testing.assert_array_equal(
+                expected, grid.get_inside_mask(x, y))
+
+    def test_contains(self):
+        grid = SelectionGrid(self.points)
+        self.assertTrue(grid.contains((20, 20)))
+        self.assertFalse(grid.contains((5, 5)))
+        self.assertFalse(grid.contains((100, 100)))
+        # Float values are tested against the polygon
+        self.assertTrue(grid.contains((20.5, 20.5)))
+
+    def test_large_selection_is_not_rasterized(self):
+        points = [(0, 0), (10 ** 5, 0), (10 ** 5, 10 ** 5), (0, 10 ** 5)]
+        grid = SelectionGrid(points)
+        self.assertIsNone(grid.mask)
+        np.testing.assert_array_equal(
+            [True, False], grid.get_inside_mask([5, -5], [5, 5]))
+
+    def test_empty_selection(self):
+        grid = SelectionGrid([])
+        self.assertIsNone(grid.mask)
+        self.assertFalse(grid.contains((0, 0)))
+        self.assertEqual(
+            0, grid.get_inside_mask(np.array([], dtype=int), []).size)
+
+
+if __name__ == '__main__':
+    unittest.main()
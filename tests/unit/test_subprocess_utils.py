@@ -27,6 +27,8 @@ __version__ = "2.0"
 import unittest
 import tempfile
 import subprocess
+import io
+import itertools
 import time
 import platform
 from pathlib import Path
@@ -103,6 +105,35 @@ class TestStdoutStream(unittest.TestCase):
         with subprocess.Popen(["echo", "hello"], **kwargs) as proc:
             self.assertRaises(AttributeError, lambda: StdoutStream(proc))
 
+    def test_stream_in_blocks(self):
+        with subprocess.Popen(
+                ["printf", "1\\n22\\n333\\n4444"],
+                **self.default_kwargs) as proc:
+            stream = StdoutStream(proc, block_size=5)
+            self.assertEqual(["1\n22\n", "333\n", "4444"], list(stream))
+
+
+class TestReadBlocks(unittest.TestCase):
+    def test_blocks_contain_whole_lines(self):
+        text = "".join(f"{i}\n" for i in range(1000))
+        for block_size in (1, 2, 7, 100, 10000):
+            blocks = list(sutils.read_blocks(io.StringIO(text), block_size))
+            self.assertEqual(text, "".join(blocks))
+            self.assertTrue(all(block.endswith("\n") for block in blocks))
+
+    def test_last_line_without_newline(self):
+        self.assertEqual(
+            ["a\nb\n", "c"],
+            list(sutils.read_blocks(io.StringIO("a\nb\nc"), 4)))
+
+    def test_empty_file(self):
+        self.assertEqual([], list(sutils.read_blocks(io.StringIO(""), 4)))
+
+    def test_block_size_must_be_positive(self):
+        self.assertRaises(
+            ValueError,
+            lambda: list(sutils.read_blocks(io.StringIO("a"), 0)))
+
 
 class TestWriteToFile(unittest.TestCase):
     def test_file_is_not_written_until_iterable_is_processed(self):
@@ -310,6 +341,25 @@ class TestProcessOutput(unittest.TestCase):
                     f1_contents = f1.readlines()
                     utils.assert_all_equal(xs, f0_contents, f1_contents)
 
+    def test_output_in_blocks(self):
+        input_file = utils.get_resource_dir() / "foils_file.txt"
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir, "foo.bar")
+            with subprocess.Popen(
+                    ["cat", str(input_file)], **self.default_kwargs) as proc:
+                xs = sutils.process_output(
+                    proc, parse_func=str.splitlines, file=file,
+                    text_func=lambda x: "".join(f"{line}\n" for line in x),
+                    output_func=lambda blocks: [*itertools.chain(*blocks)],
+                    block_size=16)
+
+            with input_file.open("r") as f0, file.open("r") as f1:
+                f0_contents = f0.read().splitlines()
+                self.assertTrue(1 < len(xs))
+                utils.assert_all_equal(
+                    xs, f0_contents, f1.read().splitlines())
+
     def test_stdout_is_closed_in_case_parse_func_fails(self):
         with subprocess.Popen(
                 ["echo", "kissa"], **self.default_kwargs) as proc:
@@ -0,0 +1,99 @@
+# coding=utf-8
+"""
+Created on 17.10.2026
+
+Potku is a graphical user interface for analyzation and
+visualization of measurement data collected from a ToF-ERD
+telescope. For physics calculations Potku uses external
+analyzation components.
+Copyright (C) 2026 Potku contributors
+
+This program is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program (file named 'LICENCE').
+"""
+__author__ = "Potku contributors"
+__version__ = "2.0"
+
+import unittest
+import tempfile
+
+from unittest.mock import patch
+
+import numpy as np
+import tests.mock_objects as mo
+import tests.utils as utils
+
+from pathlib import Path
+
+import modules.tof_list as tl
+
+from modules.energy_spectrum import EnergySpectrum
+from modules.tof_list import ToFListConfig
+
+
+class TestWriteStoppingsFile(unittest.TestCase):
+    def test_relative_paths_are_resolved(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            data_dir = tmp_dir / "share"
+            bin_dir = tmp_dir / "bin"
+            data_dir.mkdir()
+            (data_dir / "stoppings.txt").write_text(
+                "#Name of the file tot Z1_min Z1_max\n"
+                "../share/srim.tot tot 1 83 1 83 ascii srim\n"
+                "/stopping/other.tot tot 84 92 1 92 ascii other\n")
+            output_file = tmp_dir / "stoppings.txt"
+            tl.write_stoppings_file(
+                output_file, bin_dir=bin_dir, data_dir=data_dir)
+
+            self.assertEqual([
+                "#Name of the file tot Z1_min Z1_max",
+                f"{data_dir.resolve() / 'srim.tot'} tot 1 83 1 83 ascii srim",
+                f"{Path('/stopping/other.tot').resolve()} tot 84 92 1 92 "
+                f"ascii other",
+            ], output_file.read_text().splitlines())
+
+
+class TestToFListConfig(unittest.TestCase):
+    def test_missing_library_is_not_loaded(self):
+        self.assertIsNone(tl.load_library(Path("missing", "libtof_list.so")))
+
+    def test_config_requires_library(self):
+        with patch("modules.tof_list.load_library", return_value=None):
+            self.assertRaises(ValueError, ToFListConfig, Path("tof.in"))
+
+    @unittest.skipUnless(tl.is_available(), "tof_list library not built")
+    def test_conversion_matches_tof_list(self):
+        cut_files = sorted(utils.get_resource_dir().glob("cuts.*.cut"))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mesu = mo.get_measurement(path=Path(tmp_dir, "mesu.info"))
+            tof_in = mesu.generate_tof_in()
+            try:
+                config = ToFListConfig(tof_in, verbose=False)
+            except ValueError:
+                self.skipTest("stopping data not available")
+            with config:
+                for cut_file in cut_files:
+                    expected = EnergySpectrum.tof_list(
+                        cut_file, tof_in=tof_in, verbose=False)
+                    columns = config.convert(cut_file)
+                    self.assertEqual(len(expected), len(columns))
+                    for x, y in zip(expected, columns):
+                        np.testing.assert_array_equal(x, y)
+                        self.assertEqual(x.dtype, y.dtype)
+
+            self.assertRaises(ValueError, config.convert, cut_files[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,7 @@ __author__ = "Jarkko Aalto \n Timo Konu \n Samuli Kärkkäinen \n " \
 __version__ = "2.0"
 
 import os
+import numpy as np
 from pathlib import Path
 import modules.math_functions as mf
 import modules.general_functions as gf
@@ -37,6 +38,7 @@ import modules.general_functions as gf
 import widgets.gui_utils as gutils
 
 from modules.enums import ToFEColorScheme
+from modules.event_store import EventHistogram
 from modules.measurement import Measurement
 from dialogs.energy_spectrum import EnergySpectrumWidget
 from dialogs.graph_settings import TofeGraphSettingsWidget
@@ -94,8 +96,7 @@ class MatplotlibHistogramWidget(MatplotlibWidget):
         self.__fork_toolbar_buttons()
 
         self.measurement = measurement
-        self.__x_data = [x[0] for x in self.measurement.data]
-        self.__y_data = [x[1] for x in self.measurement.data]
+        self.__histogram = None
 
         # Variables
         self.__inverted_Y = False
@@ -122,6 +123,15 @@ class MatplotlibHistogramWidget(MatplotlibWidget):
 
         self.on_draw()
 
+    def get_histogram(self) -> EventHistogram:
+        """Returns the histogram cache of the measurement's events. The cache
+        is rebuilt if the measurement data has been reloaded.
+        """
+        data = self.measurement.data
+        if self.__histogram is None or self.__histogram.store is not data:
+            self.__histogram = EventHistogram(data)
+        return self.__histogram
+
     def on_draw(self):
         """Draw method for matplotlib.
         """
@@ -129,12 +139,12 @@ class MatplotlibHistogramWidget(MatplotlibWidget):
         x_min, x_max = self.axes.get_xlim()
         y_min, y_max = self.axes.get_ylim()
 
-        x_data = self.__x_data
-        y_data = self.__y_data
+        histogram = self.get_histogram()
+        data_limits = histogram.get_data_limits()
 
         # Transpose
         if self.transpose_axes:
-            x_data, y_data = y_data, x_data  # Always transpose data if checked.
+            data_limits.reverse()  # Always transpose data if checked.
             if not self.__transposed:
                 self.__transposed = True
                 self.measurement.selector.transpose(True)
@@ -173,8 +183,9 @@ class MatplotlibHistogramWidget(MatplotlibWidget):
         else:
             # Automatic mode
             bin_counts, msg = mf.calculate_bin_counts(
-                [x_data, y_data], self.compression_x, self.compression_y,
-                max_count=MatplotlibHistogramWidget.MAX_BIN_COUNT)
+                data_limits, self.compression_x, self.compression_y,
+                max_count=MatplotlibHistogramWidget.MAX_BIN_COUNT,
+                data_sorted=True)
             axes_range = None
 
         if msg is not None:
@@ -187,11 +198,25 @@ class MatplotlibHistogramWidget(MatplotlibWidget):
 
         colormap = cm.get_cmap(self.color_scheme.value)
 
-        self.axes.hist2d(x_data,
-                         y_data,
-                         bins=bin_counts,
+        # Histogram is cached in ToF-E orientation so transposing only swaps
+        # the axes of the cached counts.
+        if self.transpose_axes:
+            counts, y_edges, x_edges = histogram.get_histogram(
+                bin_counts[::-1],
+                axes_range[::-1] if axes_range is not None else None)
+        else:
+            counts, x_edges, y_edges = histogram.get_histogram(
+                bin_counts, axes_range)
+            counts = counts.T
+
+        # Empty bins are left blank like in hist2d
+        self.axes.imshow(np.ma.masked_equal(counts, 0),
+                         extent=(x_edges[0], x_edges[-1],
+                                 y_edges[0], y_edges[-1]),
+                         origin="lower",
+                         aspect="auto",
+                         interpolation="nearest",
                          norm=LogNorm(),
-                         range=axes_range,
                          cmap=colormap)
 
         self.__on_draw_legend()
@@ -796,16 +821,10 @@ class MatplotlibHistogramWidget(MatplotlibWidget):
         if event.xdata is None and event.ydata is None:
             return
 
-        in_selection = False
-        points = 0
         point = [int(event.xdata), int(event.ydata)]
-        if self.measurement.selector.axes_limits.is_inside(point):
-            for selection in self.measurement.selector.selections:
-                if selection.point_inside(point):
-                    points = selection.get_event_count()
-                    in_selection = True
-                    break
-        if in_selection:
+        selection = self.measurement.selector.get_selection_at(point)
+        if selection is not None:
+            points = selection.get_event_count()
             if self.mpl_toolbar.mode_tool:
                 str_tool = self.tool_modes[self.mpl_toolbar.mode_tool]
                 str_text = str_tool + "; points in selection: {0}".format(
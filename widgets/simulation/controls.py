@@ -38,6 +38,7 @@ from rx import operators as ops
 from modules.element_simulation import SimulationState
 from modules.element_simulation import ElementSimulation
 from modules.mcerd import MCERD
+from modules.mcerd_scheduler import MCERDScheduler
 from modules.global_settings import GlobalSettings
 from modules.enums import IonDivision
 from widgets.gui_utils import GUIObserver
@@ -85,6 +86,11 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
             background: #0ec95c;
         }
     """
+    QUEUED_PROGRESS_STYLE = """
+        QProgressBar {
+            color: gray;
+        }
+    """
 
     def __init__(self, element_simulation: ElementSimulation,
                  recoil_dist_widget, recoil_name_changed=None,
@@ -108,6 +114,7 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
         self.element_simulation.subscribe(self)
         self.recoil_dist_widget = recoil_dist_widget
         self.progress_bars = {}
+        self.__queued_seeds = set()
 
         self.recoil_name = \
             self.element_simulation.get_main_recoil().get_full_name()
@@ -231,7 +238,9 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
             self.__unsub = observable.pipe(
                 ops.scan(lambda acc, x: {
                     **x,
-                    "started":  x[MCERD.IS_RUNNING] and not acc["started"]
+                    "started":  x[MCERD.IS_RUNNING] and
+                                x[MCERD.MSG] != MCERDScheduler.QUEUED and
+                                not acc["started"]
                 }, seed={"started": False})
             ).subscribe(self)
         else:
@@ -291,17 +300,38 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
         Args:
             status: status update sent by ElementSimulation or observable stream
         """
-        if status[MCERD.MSG] == MCERD.PRESIM_FINISHED:
-            style = SimulationControlsWidget.SIM_PROGRESS_STYLE
+        seed = status[MCERD.SEED]
+        queued = status[MCERD.MSG] == MCERDScheduler.QUEUED
+        if queued:
+            self.__queued_seeds.add(seed)
+            self.update_progress_bar(
+                seed, 0,
+                stylesheet=SimulationControlsWidget.QUEUED_PROGRESS_STYLE,
+                text="Queued")
+            self.progress_bars[seed].setToolTip(
+                f"{MCERDScheduler.QUEUED}. "
+                f"{status.get(MCERDScheduler.QUEUE_DEPTH, 0)} process(es) "
+                f"in the queue.")
         else:
-            style = None
-        self.update_progress_bar(
-            status[MCERD.SEED], status[MCERD.PERCENTAGE], stylesheet=style)
+            if status[MCERD.MSG] == MCERD.PRESIM_FINISHED:
+                style = SimulationControlsWidget.SIM_PROGRESS_STYLE
+            elif seed in self.__queued_seeds:
+                style = SimulationControlsWidget.PRESIM_PROGRESS_STYLE
+            else:
+                style = None
+            self.update_progress_bar(
+                seed, status[MCERD.PERCENTAGE], stylesheet=style)
+            if seed in self.__queued_seeds:
+                self.__queued_seeds.discard(seed)
+                self.progress_bars[seed].setToolTip(
+                    f"Waited {status.get(MCERDScheduler.WAIT_TIME, 0):.1f} s "
+                    f"for a free core.")
 
         self.finished_processes = (
             status[ElementSimulation.FINISHED], status[ElementSimulation.TOTAL])
 
-        if status["started"]:
+        # Queued processes are not started yet but they can be stopped
+        if status["started"] or queued:
             self.enable_buttons(starting=True)
 
         self.show_status(status)
@@ -342,10 +372,12 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
         """Removes all progress bars and seed labels.
         """
         self.progress_bars = {}
+        self.__queued_seeds.clear()
         for i in reversed(range(self.process_layout.count())):
             self.process_layout.itemAt(i).widget().deleteLater()
 
-    def update_progress_bar(self, seed: int, value: int, stylesheet=None):
+    def update_progress_bar(self, seed: int, value: int, stylesheet=None,
+                            text: str = "%p%"):
         """Updates or adds a progress bar for a simulation process that uses
         the given seed.
 
@@ -353,6 +385,7 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
             seed: seed of the simulation process
             value: value to be shown in the progress bar.
             stylesheet: stylesheet given to to the progress bar.
+            text: text shown in the progress bar.
         """
         if seed not in self.progress_bars:
             if stylesheet is None:
@@ -377,4 +410,5 @@ class SimulationControlsWidget(QtWidgets.QWidget, GUIObserver):
             progress_bar = self.progress_bars[seed]
             if stylesheet is not None:
                 progress_bar.setStyleSheet(stylesheet)
+        progress_bar.setFormat(text)
         progress_bar.setValue(value)